@@ -0,0 +1,116 @@
+import time
+import logging
+import functools
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from iposhala_test.scripts.mongo_async import cache_epoch
+from iposhala_test.scripts.cache_epoch import EPOCH_ID
+
+# How often (seconds) a process re-reads the pipelines' cache_epoch document
+EPOCH_POLL_INTERVAL = 5.0
+
+
+class ResponseCache:
+    """
+    In-process TTL + LRU cache for route results, keyed by route and params.
+    Entries are dropped as a whole when the pipelines bump cache_epoch.
+    """
+
+    def __init__(self, maxsize: int = 512, default_ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+        self._epoch: Optional[int] = None
+        self._epoch_checked_at = 0.0
+        self._listeners: list = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: tuple, value: Any, ttl: Optional[float] = None):
+        self._entries[key] = (time.monotonic() + (ttl or self.default_ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def size(self) -> int:
+        """Entries currently held (expired ones included until they are looked up)."""
+        return len(self._entries)
+
+    async def get_or_compute(self, key: tuple, compute: Callable[[], Awaitable[Any]], ttl: Optional[float] = None):
+        """
+        Cached value for `key`, else `await compute()` stored under it. The
+        counted lookup behind @cached, and the one routes caching
+        intermediate results should use so /metrics sees their hits too.
+        """
+        await self.sync_epoch()
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = await compute()
+        self.set(key, value, ttl)
+        return value
+
+    @property
+    def epoch(self) -> Optional[int]:
+        """Last cache_epoch value seen, or None before the first successful poll."""
+        return self._epoch
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Registers an in-process structure to be invalidated with the cache."""
+        self._listeners.append(callback)
+
+    async def sync_epoch(self):
+        """Clears the cache if a pipeline has written since the last poll."""
+        now = time.monotonic()
+        if now - self._epoch_checked_at < EPOCH_POLL_INTERVAL:
+            return
+        self._epoch_checked_at = now
+        try:
+            doc = await cache_epoch.find_one({"_id": EPOCH_ID}, {"epoch": 1})
+        except Exception as e:
+            logging.warning(f"[CACHE] Could not read cache epoch: {e}")
+            return
+        epoch = (doc or {}).get("epoch", 0)
+        if self._epoch is not None and epoch != self._epoch:
+            self.clear()
+            for callback in self._listeners:
+                callback()
+        self._epoch = epoch
+
+
+response_cache = ResponseCache()
+
+
+def cached(ttl: Optional[float] = None):
+    """
+    Caches an async route's return value per route + query/path params.
+    Only use on routes whose data is written by the pipelines.
+    """
+    def decorator(func: Callable):
+        route_key = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (route_key, tuple(sorted(kwargs.items())))
+            return await response_cache.get_or_compute(key, lambda: func(*args, **kwargs), ttl)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,73 @@
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from iposhala_test.api.cache import response_cache
+
+# Read endpoints whose data only changes when a pipeline bumps cache_epoch
+VALIDATED_PREFIXES = ("/api/ipos", "/api/company", "/api/gmp", "/api/analytics", "/api/search")
+
+# Live or side-effecting paths under those prefixes
+UNVALIDATED_PREFIXES = ("/api/gmp/fetch", "/api/ipos/debug")
+
+# Browsers may keep the body but must revalidate before reusing it
+CACHE_CONTROL = "no-cache"
+
+
+def is_validated(path: str) -> bool:
+    return path.startswith(VALIDATED_PREFIXES) and not path.startswith(UNVALIDATED_PREFIXES)
+
+
+def make_etag(epoch: int, scope: Scope) -> str:
+    resource = scope["path"].encode("utf-8") + b"?" + scope.get("query_string", b"")
+    return f'W/"{epoch}-{hashlib.sha1(resource).hexdigest()[:16]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison: W/"x" and "x" name the same version
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+class ConditionalGetMiddleware:
+    """
+    Emits a weak ETag (cache epoch + path + query) and Cache-Control on JSON read
+    endpoints. The ETag is known before the route runs, so a matching
+    If-None-Match gets a 304 without querying Mongo or serializing the body.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or not is_validated(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        await response_cache.sync_epoch()
+        if response_cache.epoch is None:
+            # Epoch unknown (Mongo unreachable): no validators rather than wrong ones
+            await self.app(scope, receive, send)
+            return
+
+        etag = make_etag(response_cache.epoch, scope)
+        if etag_matches(Headers(scope=scope).get("if-none-match"), etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode("latin-1")), (b"cache-control", CACHE_CONTROL.encode("latin-1"))],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message: Message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers.setdefault("etag", etag)
+                headers.setdefault("cache-control", CACHE_CONTROL)
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
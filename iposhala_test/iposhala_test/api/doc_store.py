@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from email.utils import formatdate
+from typing import Iterable, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DOC_CACHE_DIR = os.getenv("DOC_CACHE_DIR") or os.path.join(BASE_DIR, "downloads", "doc_cache")
+DOC_CACHE_MAX_BYTES = int(os.getenv("DOC_CACHE_MAX_BYTES") or 2 * 1024 ** 3)
+# Documents served or written this recently are never evicted: get() hands out
+# a path that FileResponse only opens a moment later
+EVICT_GRACE_SECONDS = 60
+
+
+class DocumentWriter:
+    """Streams one document into the store; nothing is visible until commit()."""
+
+    def __init__(self, store: "DocumentStore", url: str):
+        self.store = store
+        self.url = url
+        self.data_path, self.meta_path = store._paths(store.key(url))
+        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        self.tmp_path = f"{self.data_path}.{os.getpid()}-{id(self)}.tmp"
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self._file = open(self.tmp_path, "wb")
+
+    def write(self, chunk: bytes):
+        if chunk:
+            self._file.write(chunk)
+            self.digest.update(chunk)
+            self.size += len(chunk)
+
+    def commit(self, content_type: str, last_modified: str = None) -> dict:
+        self._file.close()
+        # Counted before the replace so a first scan cannot see this file twice
+        self.store.total_bytes()
+        try:
+            replaced = os.stat(self.data_path).st_size
+        except OSError:
+            replaced = 0
+        os.replace(self.tmp_path, self.data_path)
+        meta = {
+            "source_url": self.url,
+            "content_type": content_type,
+            "size": self.size,
+            "etag": f'"{self.digest.hexdigest()[:32]}"',
+            "last_modified": last_modified or formatdate(time.time(), usegmt=True),
+            "fetched_at": time.time(),
+        }
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        self.store.added(self.size - replaced, keep=self.store.key(self.url))
+        meta["path"] = self.data_path
+        return meta
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+class DocumentStore:
+    """
+    On-disk cache of upstream documents, content-addressed by the SHA-256 of the
+    source URL. Each entry is `<hash>.bin` plus a `<hash>.json` sidecar holding
+    content type, ETag and Last-Modified. File mtime doubles as the LRU clock.
+    The store's size is scanned once and then tracked per commit; when it
+    exceeds max_bytes a background thread evicts the least recently served
+    files, sparing the one just committed and anything used in the last
+    EVICT_GRACE_SECONDS.
+    """
+
+    def __init__(self, root: str = DOC_CACHE_DIR, max_bytes: int = DOC_CACHE_MAX_BYTES,
+                 grace_seconds: float = EVICT_GRACE_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        self._evict_guard = threading.Lock()
+        self._size_lock = threading.Lock()
+        self._total: Optional[int] = None
+        self._evict_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        folder = os.path.join(self.root, key[:2])
+        return os.path.join(folder, f"{key}.bin"), os.path.join(folder, f"{key}.json")
+
+    def get(self, url: str) -> Optional[dict]:
+        """Metadata (with `path`) of a stored document, or None. Marks it recently used."""
+        data_path, meta_path = self._paths(self.key(url))
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            os.utime(data_path)
+        except (OSError, ValueError):
+            return None
+        meta["path"] = data_path
+        return meta
+
+    def writer(self, url: str) -> DocumentWriter:
+        return DocumentWriter(self, url)
+
+    def put(self, url: str, chunks: Iterable[bytes], content_type: str, last_modified: str = None) -> dict:
+        """Writes a whole document and returns its metadata."""
+        writer = self.writer(url)
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.commit(content_type, last_modified)
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every stored document."""
+        files = []
+        for folder, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def total_bytes(self) -> int:
+        """Bytes held by the store: walked once, then kept up to date by added()."""
+        with self._size_lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._scan())
+            return self._total
+
+    def added(self, delta: int, keep: str = None):
+        """Accounts a committed document; schedules eviction once over max_bytes."""
+        with self._size_lock:
+            self._total = (self._total or 0) + delta
+            over = self._total > self.max_bytes
+        if over:
+            self.evict_in_background(keep)
+
+    def evict_in_background(self, keep: str = None):
+        with self._size_lock:
+            if self._evict_thread and self._evict_thread.is_alive():
+                return
+            self._evict_thread = threading.Thread(target=self.evict, args=({keep} if keep else (),), daemon=True)
+            self._evict_thread.start()
+
+    def evict(self, keep: Iterable[str] = ()) -> int:
+        """
+        Drops least recently used documents until the store fits in max_bytes.
+        Keys in `keep` and documents used within grace_seconds are never removed.
+        Returns the bytes freed.
+        """
+        with self._evict_guard:
+            files = self._scan()
+            total = sum(size for _, size, _ in files)
+            spared = {self._paths(k)[0] for k in keep}
+            cutoff = time.time() - self.grace_seconds
+            freed = 0
+
+            for mtime, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path in spared or mtime > cutoff:
+                    continue
+                for p in (path, path[:-4] + ".json"):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                total -= size
+                freed += size
+                logging.info(f"[DOC STORE] Evicted {os.path.basename(path)} ({size} bytes)")
+
+            # Resync the tracked size with what is actually on disk
+            with self._size_lock:
+                self._total = total
+            return freed
+
+
+doc_store = DocumentStore()
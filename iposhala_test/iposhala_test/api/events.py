@@ -0,0 +1,133 @@
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+import orjson
+
+from iposhala_test.scripts.mongo_async import ipo_live_events
+from .responses import orjson_default
+
+# How often (seconds) the tailer looks for new pipeline events
+POLL_INTERVAL = 1.0
+# Events buffered per connection before it is considered too slow and dropped
+SUBSCRIBER_QUEUE_SIZE = 256
+# How long a hole in the seq range may stay open before it is skipped: two
+# pipelines can reserve seqs in one order and insert them in the other
+GAP_WAIT = 3.0
+TAIL_BATCH = 500
+
+
+class Subscriber:
+    """One SSE connection: a bounded queue and an optional ipo_id/symbol filter."""
+
+    def __init__(self, keys: Optional[Set[str]] = None):
+        self.keys = keys
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.lagged = False
+
+    def wants(self, event: dict) -> bool:
+        return not self.keys or event.get("ipo_id") in self.keys or event.get("symbol") in self.keys
+
+
+class LiveEventBroker:
+    """
+    In-process pub/sub for live IPO deltas. A single task per process tails
+    ipo_live_events (written by the pipelines via scripts/live_events.py) and
+    fans each event out to every subscribed connection, so the database sees
+    one poll per interval however many clients are listening.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._last_seq: Optional[int] = None
+        self._gap_since: Optional[float] = None
+        self.published = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(self, keys: Optional[Set[str]] = None) -> Subscriber:
+        sub = Subscriber(keys)
+        self._subscribers.add(sub)
+        # Started without awaiting anything first, so concurrent subscribes share one tailer
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._tail())
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self._subscribers.discard(sub)
+
+    def publish(self, event: dict):
+        """Fans one event out; connections whose queue is full are cut loose."""
+        self.published += 1
+        for sub in list(self._subscribers):
+            if not sub.wants(event):
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # The client reconnects with Last-Event-ID and replays from Mongo
+                sub.lagged = True
+                self.unsubscribe(sub)
+
+    async def latest_seq(self) -> int:
+        doc = await ipo_live_events.find_one({}, {"seq": 1}, sort=[("seq", -1)])
+        return (doc or {}).get("seq", 0)
+
+    async def replay(self, after: int, keys: Optional[Set[str]] = None) -> List[Dict]:
+        """Events after `after` still held by the capped collection (for Last-Event-ID)."""
+        query = {"seq": {"$gt": after}}
+        if keys:
+            query["$or"] = [{"ipo_id": {"$in": list(keys)}}, {"symbol": {"$in": list(keys)}}]
+        return await ipo_live_events.find(query, {"_id": 0}).sort("seq", 1).to_list(TAIL_BATCH)
+
+    async def poll(self):
+        """Publishes new events in seq order, waiting briefly on holes in the range."""
+        docs = await ipo_live_events.find(
+            {"seq": {"$gt": self._last_seq}}, {"_id": 0}
+        ).sort("seq", 1).to_list(TAIL_BATCH)
+        for doc in docs:
+            if doc["seq"] != self._last_seq + 1:
+                now = time.monotonic()
+                self._gap_since = self._gap_since or now
+                if now - self._gap_since < GAP_WAIT:
+                    return
+            self._gap_since = None
+            self._last_seq = doc["seq"]
+            self.publish(doc)
+
+    async def _tail(self):
+        while self._subscribers:
+            try:
+                if self._last_seq is None:
+                    # Fresh start: only events written from now on are pushed
+                    self._last_seq = await self.latest_seq()
+                else:
+                    await self.poll()
+            except Exception as e:
+                logging.warning(f"[LIVE EVENTS] Tailing ipo_live_events failed: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
+        # Idle: resume from the then-current seq when someone subscribes again
+        self._last_seq = None
+
+    async def close(self):
+        self._subscribers.clear()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+def format_sse(event: dict) -> bytes:
+    """One SSE frame: id = seq (for Last-Event-ID), event = type, data = JSON delta."""
+    data = {k: event.get(k) for k in ("ipo_id", "symbol", "changes", "source", "at")}
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+        event["seq"],
+        event.get("type", "live").encode(),
+        orjson.dumps(data, default=orjson_default),
+    )
+
+
+live_events = LiveEventBroker()
@@ -0,0 +1,309 @@
+import os
+import time
+import random
+import logging
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import orjson
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets (seconds) shared by the request, Mongo and upstream histograms
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Not timed: the scrape itself, health probes and long-lived SSE streams
+UNTIMED_PREFIXES = ("/metrics", "/health", "/api/events")
+
+# Fraction of requests written to the structured request log; slow requests
+# and 5xx responses are always logged
+LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "1.0"))
+
+request_logger = logging.getLogger("iposhala.requests")
+
+LabelValues = Tuple[str, ...]
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{n}="{escape_label(v)}"' for n, v in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self.key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self.key(labels), 0.0)
+
+    def items(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{format_labels(self.labelnames, k)} {v}" for k, v in items]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames + ('le',), key + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """Values read at scrape time from live objects (cache counters, queue sizes)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...],
+                 collect: Callable[[], Dict[LabelValues, float]], kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def render(self) -> list:
+        try:
+            values = self.collect()
+        except Exception as e:
+            logging.warning(f"[METRICS] Collecting {self.name} failed: {e}")
+            values = {}
+        return self.header() + [f"{self.name}{format_labels(self.labelnames, k)} {v}" for k, v in sorted(values.items())]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "iposhala_http_request_duration_seconds", "API request latency by route template",
+    ("method", "route", "status"),
+))
+request_mongo_commands = registry.register(Histogram(
+    "iposhala_http_request_mongo_commands", "Mongo commands issued per API request",
+    ("route",), buckets=COUNT_BUCKETS,
+))
+request_mongo_duration = registry.register(Histogram(
+    "iposhala_http_request_mongo_seconds", "Time spent in Mongo commands per API request",
+    ("route",),
+))
+mongo_command_duration = registry.register(Histogram(
+    "iposhala_mongo_command_duration_seconds", "Mongo command latency (pymongo command monitoring)",
+    ("command", "outcome"),
+))
+upstream_request_duration = registry.register(Histogram(
+    "iposhala_upstream_request_duration_seconds", "NSE upstream latency until response headers",
+    ("upstream", "status"),
+))
+# Lookups in caches without their own counters; exported through
+# iposhala_cache_requests_total together with the caches that have them
+cache_lookups = Counter(
+    "iposhala_cache_lookups_total", "Lookups in caches without their own counters",
+    ("cache", "result"),
+)
+
+
+# ---------------------------
+# Per-request Mongo accounting
+# ---------------------------
+class RequestStats:
+    __slots__ = ("mongo_commands", "mongo_seconds")
+
+    def __init__(self):
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Times every command on the API's Mongo client. Events are published in
+    the awaiting task, so the request's RequestStats is reachable via the
+    context var.
+    """
+
+    def started(self, event):
+        pass
+
+    def _record(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        mongo_command_duration.observe(seconds, command=event.command_name, outcome=outcome)
+        stats = current_request.get()
+        if stats is not None:
+            stats.mongo_commands += 1
+            stats.mongo_seconds += seconds
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+# ---------------------------
+# NSE upstream timings (httpx event hooks on the shared client)
+# ---------------------------
+def upstream_label(path: str) -> str:
+    if path in ("", "/"):
+        return "warm_up"
+    if path.startswith("/api/"):
+        return path
+    # Archive document URLs: one label, not one per file
+    return "document"
+
+
+async def on_upstream_request(request):
+    request.extensions["iposhala_started"] = time.perf_counter()
+
+
+async def on_upstream_response(response):
+    started = response.request.extensions.get("iposhala_started")
+    if started is not None:
+        upstream_request_duration.observe(
+            time.perf_counter() - started,
+            upstream=upstream_label(response.request.url.path),
+            status=str(response.status_code),
+        )
+
+
+UPSTREAM_EVENT_HOOKS = {"request": [on_upstream_request], "response": [on_upstream_response]}
+
+
+# ---------------------------
+# Structured, sampled logging
+# ---------------------------
+def log_event(event: str, sample_rate: float = None, force: bool = False, level: int = logging.INFO, **fields):
+    """One JSON log line, written for a `sample_rate` fraction of calls unless forced."""
+    rate = LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    if not force and random.random() >= rate:
+        return
+    if request_logger.isEnabledFor(level):
+        request_logger.log(level, orjson.dumps({"event": event, **fields}, default=str).decode())
+
+
+def route_template(scope: Scope, status: int) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # ConditionalGetMiddleware answers 304s before routing; unmatched paths
+    # share one label to keep the series count bounded
+    return "not_modified" if status == 304 else "unmatched"
+
+
+class MetricsMiddleware:
+    """Per-route latency histograms, per-request Mongo totals and the sampled request log."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(UNTIMED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request.reset(token)
+            elapsed = time.perf_counter() - started
+            route = route_template(scope, status)
+            http_request_duration.observe(elapsed, method=scope["method"], route=route, status=str(status))
+            request_mongo_commands.observe(stats.mongo_commands, route=route)
+            request_mongo_duration.observe(stats.mongo_seconds, route=route)
+            log_event(
+                "request",
+                force=elapsed >= SLOW_REQUEST_SECONDS or status >= 500,
+                method=scope["method"],
+                route=route,
+                path=scope["path"],
+                status=status,
+                duration_ms=round(elapsed * 1000, 2),
+                mongo_commands=stats.mongo_commands,
+                mongo_ms=round(stats.mongo_seconds * 1000, 2),
+            )
@@ -0,0 +1,139 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .metrics import UPSTREAM_EVENT_HOOKS
+
+NSE_BASE_URL = "https://www.nseindia.com"
+
+NSE_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json,text/plain,*/*",
+    "Referer": "https://www.nseindia.com/",
+}
+
+# Re-run the homepage warm-up after this long (seconds); NSE cookies expire quickly
+COOKIE_MAX_AGE = 300
+
+# Quotes younger than this are served as-is; older ones up to QUOTE_STALE_TTL are
+# served immediately while one background request refreshes them
+QUOTE_TTL = 5.0
+QUOTE_STALE_TTL = 60.0
+
+
+class NSEClient:
+    """
+    Long-lived NSE session: one pooled keep-alive connection set and one cookie jar
+    shared by every request, instead of a new session + warm-up per call.
+    """
+
+    def __init__(self, base_url: str = NSE_BASE_URL, timeout: float = 10.0):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._warmed_at = 0.0
+        self._warm_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=NSE_HEADERS,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                follow_redirects=True,
+                # Upstream timings for /metrics (quotes, warm-ups, document downloads)
+                event_hooks=UPSTREAM_EVENT_HOOKS,
+            )
+        return self._client
+
+    async def warm_up(self, force: bool = False):
+        """Fetches the homepage for session cookies, at most once per COOKIE_MAX_AGE."""
+        if not force and time.monotonic() - self._warmed_at < COOKIE_MAX_AGE:
+            return
+        async with self._warm_lock:
+            if not force and time.monotonic() - self._warmed_at < COOKIE_MAX_AGE:
+                return
+            await self.client.get("/")
+            self._warmed_at = time.monotonic()
+
+    async def get_json(self, path: str, params: Dict[str, Any] = None):
+        await self.warm_up()
+        res = await self.client.get(path, params=params)
+        if res.status_code in (401, 403):
+            # Cookies expired early: refresh them once and retry
+            await self.warm_up(force=True)
+            res = await self.client.get(path, params=params)
+        res.raise_for_status()
+        return res.json()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class QuoteCache:
+    """
+    Short-TTL quote cache with single-flight fetches and stale-while-revalidate:
+    a burst of requests for one symbol shares a single upstream call.
+    """
+
+    def __init__(self, client: NSEClient, maxsize: int = 1024):
+        self.client = client
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def _fetch(self, symbol: str):
+        data = await self.client.get_json("/api/quote-equity", {"symbol": symbol})
+        self._entries[symbol] = (time.monotonic(), data)
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return data
+
+    def _refresh(self, symbol: str) -> asyncio.Task:
+        task = self._inflight.get(symbol)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(symbol))
+            task.add_done_callback(lambda t: self._inflight.pop(symbol, None))
+            # Attached once per fetch, however many callers share it
+            task.add_done_callback(self._log_failure)
+            self._inflight[symbol] = task
+        return task
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logging.warning(f"[NSE QUOTE] Refresh failed: {task.exception()}")
+
+    async def get(self, symbol: str):
+        entry = self._entries.get(symbol)
+        age = time.monotonic() - entry[0] if entry else None
+
+        if age is not None and age < QUOTE_TTL:
+            self.hits += 1
+            return entry[1]
+
+        if age is not None and age < QUOTE_STALE_TTL:
+            self.stale_hits += 1
+            # Background refresh: a failure keeps the stale quote and is only logged
+            self._refresh(symbol)
+            return entry[1]
+
+        self.misses += 1
+        # shield: one caller disconnecting must not cancel the shared fetch
+        return await asyncio.shield(self._refresh(symbol))
+
+
+nse_client = NSEClient()
+quote_cache = QuoteCache(nse_client)
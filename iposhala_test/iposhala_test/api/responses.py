@@ -0,0 +1,73 @@
+import inspect
+import functools
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable
+
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def orjson_default(obj: Any):
+    """Types orjson does not serialize natively but Mongo documents contain."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", "replace")
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-rendered JSON; datetimes, numpy values and ObjectIds go straight to bytes."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+def as_fast_response(content: Any, response: Response = None, status_code: int = None):
+    """Wraps a route's return value, carrying over headers the route set on `response`."""
+    if isinstance(content, Response):
+        return content
+    out = FastJSONResponse(content, status_code=status_code or 200)
+    if response is not None:
+        out.status_code = response.status_code or out.status_code
+        out.headers.raw.extend(h for h in response.headers.raw if h[0] != b"content-length")
+    return out
+
+
+def fast_json(endpoint: Callable, status_code: int = None) -> Callable:
+    """
+    Returns route results as FastJSONResponse so FastAPI skips its jsonable_encoder
+    pass, which dominates encode time for the multi-MB company documents.
+    """
+    params = inspect.signature(endpoint).parameters
+    response_arg = next((name for name, p in params.items() if p.annotation is Response), None)
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return as_fast_response(await endpoint(*args, **kwargs), kwargs.get(response_arg), status_code)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            return as_fast_response(endpoint(*args, **kwargs), kwargs.get(response_arg), status_code)
+    return wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """Route class that renders every endpoint's result with orjson (see fast_json)."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # The decorator's status_code (e.g. 202) applies to the prebuilt response too
+        super().__init__(path, fast_json(endpoint, kwargs.get("status_code")), **kwargs)
@@ -1,110 +1,19 @@
 from fastapi import APIRouter
-from iposhala_test.scripts.mongo import ipo_past_master
-from datetime import datetime
+from iposhala_test.scripts.mongo_async import ipo_past_master, ipo_analytics
+from iposhala_test.scripts.ipo_analytics import ROLLUP_PIPELINE, rollup_docs, format_overview
+from iposhala_test.api.cache import cached
+from iposhala_test.api.responses import FastJSONRoute
 
-router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+router = APIRouter(prefix="/api/analytics", tags=["analytics"], route_class=FastJSONRoute)
 
 @router.get("/overview")
-def get_analytics_overview():
-    # Gather past IPOs for listing gains & SME vs Mainboard performance
-    past_ipos = list(ipo_past_master.find({}, {"_id": 0}))
-    
-    total_ipos = len(past_ipos)
-    if total_ipos == 0:
-        return {"msg": "No data"}
-        
-    sme_count = 0
-    main_count = 0
-    total_listing_gain = 0.0
-    positive_listings = 0
-    
-    # Yearly data array for charts
-    yearly_stats = {}
-    
-    for ipo in past_ipos:
-        sec_type = ipo.get("security_type", "Equity")
-        if sec_type == "SME":
-            sme_count += 1
-        else:
-            main_count += 1
-            
-        import re
-        import hashlib
-        # Parse issue price using regex to catch numbers like "Rs. 10 to Rs. 15"
-        raw_price_range = ipo.get("price_range") or ipo.get("issue_information", {}).get("issue_price") or ipo.get("issue_price")
-        ip = 0
-        if raw_price_range and str(raw_price_range).strip() != "-":
-            matches = re.findall(r'\d+\.?\d*', str(raw_price_range))
-            if matches:
-                 # Standard practice: Take the upper band of the issue price
-                ip = max(float(m) for m in matches)
-                
-        # Parse open price from nse_quote or use deterministic mock data if missing
-        raw_open = ipo.get("nse_quote", {}).get("price_info", {}).get("open")
-        op = 0
-        if raw_open:
-            try:
-                op = float(raw_open)
-            except:
-                pass
-                
-        # If open price still 0, we'll assign a realistic deterministic gain based on symbol hash
-        gain_pct = 0
-        if ip > 0 and op > 0:
-            gain_pct = ((op - ip) / ip) * 100
-        elif ip > 0 and op == 0:
-            # Deterministic mock calculation based on symbol string
-            sym_hash = int(hashlib.md5(str(ipo.get("symbol", "unknown")).encode('utf-8')).hexdigest(), 16)
-            # 70% chance of positive listing, 30% chance negative
-            if sym_hash % 100 < 70:
-                gain_pct = float(sym_hash % 60 + 5) # 5% to 64% gain
-            else:
-                gain_pct = float(-(sym_hash % 20 + 2)) # -2% to -21% loss
-                
-        if gain_pct != 0:
-            total_listing_gain += gain_pct
-            if gain_pct > 0:
-                positive_listings += 1
-
-        # Parse listing date year
-        listing_date_str = str(ipo.get("listing_date") or ipo.get("nse_quote", {}).get("metadata", {}).get("listingDate") or "")
-        
-        # For Yearly Charts
-        year = None
-        if "20" in listing_date_str: # Naive but effective year extraction from 20-Feb-2024 or 2024-02-20
-            matches = re.findall(r'20\d{2}', listing_date_str)
-            if matches:
-                year = matches[0]
-
-        if year:
-            if year not in yearly_stats:
-                yearly_stats[year] = {"total": 0, "gains": 0, "count_positive": 0}
-            yearly_stats[year]["total"] += 1
-            if gain_pct != 0:
-                yearly_stats[year]["gains"] += gain_pct
-                if gain_pct > 0:
-                    yearly_stats[year]["count_positive"] += 1
-            
-    avg_listing_gain = total_listing_gain / total_ipos if total_ipos > 0 else 0
-    win_rate = (positive_listings / total_ipos) * 100 if total_ipos > 0 else 0
-    
-    # Format Yearly Stats for Charts
-    formatted_yearly = []
-    for yr, data in sorted(yearly_stats.items()):
-        formatted_yearly.append({
-            "year": yr,
-            "ipos": data["total"],
-            "avg_gain": round(data["gains"] / data["total"], 2) if data["total"] > 0 else 0,
-            "win_rate": round((data["count_positive"] / data["total"]) * 100, 1) if data["total"] > 0 else 0
-        })
-
-    return {
-        "metrics": {
-            "total_listed": total_ipos,
-            "sme_count": sme_count,
-            "mainboard_count": main_count,
-            "avg_listing_gain": round(avg_listing_gain, 2),
-            "win_rate": round(win_rate, 1)
-        },
-        "yearly": formatted_yearly
-    }
+@cached(ttl=900)
+async def get_analytics_overview():
+    # Rollups are materialized by the pipelines (scripts/ipo_analytics.py)
+    docs = await ipo_analytics.find({}).to_list(None)
+    if not docs:
+        # Not built yet: roll up the per-IPO metrics on the fly
+        cursor = await ipo_past_master.aggregate(ROLLUP_PIPELINE)
+        rows = await cursor.to_list(None)
+        docs = rollup_docs(rows[0] if rows else {})
+    return format_overview(docs)
@@ -1,8 +1,21 @@
-from typing import Any, Dict, List
-from fastapi import APIRouter, HTTPException, Query
-from iposhala_test.scripts.mongo import ipo_past_master
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Body, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from pymongo.errors import OperationFailure
+from iposhala_test.scripts.mongo_async import ipo_past_master, ipo_price_bars
+from iposhala_test.scripts.company_sections import normalize_section
+from iposhala_test.scripts.price_bars import BAR_PROJECTION, resample_bars
+from iposhala_test.api.cache import response_cache
+from iposhala_test.api.responses import FastJSONRoute
 
-router = APIRouter(prefix="/api/company", tags=["company"])
+router = APIRouter(prefix="/api/company", tags=["company"], route_class=FastJSONRoute)
+
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+# Most symbols one batch request may ask for
+MAX_BATCH = 50
 
 
 # ---------------------------
@@ -12,58 +25,215 @@ def normalize_symbol(symbol: str) -> str:
     return (symbol or "").upper().strip()
 
 
-def fetch(symbol: str, projection: dict):
+async def fetch(symbol: str, projection: dict):
     symbol = normalize_symbol(symbol)
-    doc = ipo_past_master.find_one({"symbol": symbol}, projection)
+    doc = await ipo_past_master.find_one({"symbol": symbol}, projection)
     if not doc:
         raise HTTPException(status_code=404, detail="Company symbol not found")
     doc.pop("_id", None)
     return doc
 
 
-def as_list(v) -> List[Any]:
-    return v if isinstance(v, list) else []
-
-
 def paginate(items: List[Any], limit: int, offset: int) -> List[Any]:
     return items[offset: offset + limit]
 
 
-def sort_by_latest(items: List[Dict], keys: List[str]) -> List[Dict]:
-    def k(x):
-        for kk in keys:
-            val = x.get(kk)
-            if val:
-                return val
-        return ""
-    return sorted(items, key=k, reverse=True)
-
-
-def unwrap_section(section) -> List[Dict]:
+def section_pages_projection(pages: Dict[str, int], offset: int = 0, extra: List[str] = None) -> dict:
     """
-    Supports multiple formats:
-    1) List: [ {...}, {...} ]
-    2) Selenim/New dict: { available: bool, payload: [...], source_url: str } or { data: [...] }
+    $project reading `limit` items from `offset` for each nse_company section in
+    `pages`, plus the `extra` fields. Sections the pipelines stored pre-sorted
+    (scripts/company_sections.py) are $slice'd server-side; older unsorted ones
+    come back whole and are sorted by unpack_section_pages. A `sort_key` left on
+    items by older writes is dropped from the page.
     """
-    if not section:
-        return []
-    if isinstance(section, dict):
-        if "payload" in section:
-            return section.get("payload") or []
-        if "data" in section:
-            return section.get("data") or []
-        # Support selenium style __available__ or available flags
-        if "__available__" in section:
-            return section.get("data") or []
-    return section if isinstance(section, list) else []
+    project = {"_id": 0, "symbol": 1, **{k: 1 for k in (extra or [])}, "sections": {}}
+    for name, limit in pages.items():
+        section = f"$nse_company.{name}"
+        project["sections"][name] = {"$cond": [
+            {"$eq": [f"{section}.sorted", True]},
+            {
+                "sorted": {"$literal": True},
+                "items": {"$map": {
+                    "input": {"$slice": [{"$ifNull": [f"{section}.payload", []]}, offset, limit]},
+                    "as": "item",
+                    "in": {"$arrayToObject": {"$filter": {
+                        "input": {"$objectToArray": "$$item"},
+                        "cond": {"$ne": ["$$this.k", "sort_key"]},
+                    }}},
+                }},
+                "count": {"$ifNull": [f"{section}.count", 0]},
+            },
+            {"sorted": {"$literal": False}, "raw": section},
+        ]}
+    return project
+
+
+def unpack_section_pages(doc: dict, pages: Dict[str, int], offset: int = 0):
+    """Splits a section_pages_projection row into (doc, {section: (items, total_count)})."""
+    sections = doc.pop("sections", None) or {}
+    result = {}
+    for name, limit in pages.items():
+        sec = sections.get(name) or {}
+        if sec.get("sorted"):
+            result[name] = (sec.get("items") or [], sec.get("count") or 0)
+        else:
+            items = normalize_section(sec.get("raw"), name, doc.get("symbol"))["payload"]
+            result[name] = (paginate(items, limit, offset), len(items))
+    return doc, result
+
+
+async def fetch_section_pages(symbol: str, pages: Dict[str, int], offset: int = 0, extra: List[str] = None):
+    """Section pages for one company in one aggregation; see section_pages_projection."""
+    symbol = normalize_symbol(symbol)
+    cursor = await ipo_past_master.aggregate([
+        {"$match": {"symbol": symbol}},
+        {"$limit": 1},
+        {"$project": section_pages_projection(pages, offset, extra)},
+    ])
+    rows = await cursor.to_list(None)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Company symbol not found")
+    return unpack_section_pages(rows[0], pages, offset)
+
+
+def parse_query_date(value: Optional[str], name: str) -> Optional[datetime]:
+    """YYYY-MM-DD query value as a datetime; 400 for impossible dates like 2024-02-30."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} date: {value}")
+
+
+def batch_symbols(symbols: List[str]) -> List[str]:
+    return list(dict.fromkeys(normalize_symbol(s) for s in symbols if normalize_symbol(s)))
+
+
+async def fetch_daily_bars(symbol: str, from_date: datetime = None, to_date: datetime = None) -> List[Dict]:
+    """Daily bars from ipo_price_bars (newest first), optionally limited to [from_date, to_date]."""
+    query: Dict[str, Any] = {"symbol": symbol}
+    ts = {}
+    if from_date:
+        ts["$gte"] = from_date
+    if to_date:
+        ts["$lte"] = to_date
+    if ts:
+        query["ts"] = ts
+
+    rows = await ipo_price_bars.find(query, BAR_PROJECTION).sort("ts", -1).to_list(None)
+    if not rows and not await ipo_past_master.find_one({"symbol": symbol}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Company not found")
+    return rows
+
+
+async def section_page(symbol: str, name: str, limit: int, offset: int, response: Response) -> List[Dict]:
+    _, pages = await fetch_section_pages(symbol, {name: limit}, offset)
+    items, total = pages[name]
+    response.headers["X-Total-Count"] = str(total)
+    return items
+
+
+# ---------------------------
+# Batch lookups (declared before the /{symbol} routes)
+# ---------------------------
+@router.post("/batch/quote")
+async def company_quote_batch(symbols: List[str] = Body(..., embed=True, min_length=1, max_length=MAX_BATCH)):
+    """Normalized quotes keyed by symbol (null when unknown), from one $in query."""
+    wanted = batch_symbols(symbols)
+    docs = await ipo_past_master.find({"symbol": {"$in": wanted}}, {"_id": 0, "symbol": 1, "nse_quote": 1}).to_list(None)
+    by_symbol = {}
+    for d in docs:
+        by_symbol.setdefault(d["symbol"], normalize_quote(d.get("nse_quote") or {}))
+    return {s: by_symbol.get(s) for s in wanted}
+
+
+@router.post("/batch/tabs")
+async def company_tabs_batch(symbols: List[str] = Body(..., embed=True, min_length=1, max_length=MAX_BATCH)):
+    """Tabs summaries keyed by symbol (null when unknown), from one aggregation."""
+    wanted = batch_symbols(symbols)
+    cursor = await ipo_past_master.aggregate([
+        {"$match": {"symbol": {"$in": wanted}}},
+        {"$project": section_pages_projection(TABS_PREVIEWS, extra=TABS_FIELDS)},
+    ])
+    by_symbol = {}
+    async for row in cursor:
+        if row.get("symbol") not in by_symbol:
+            by_symbol[row["symbol"]] = shape_tabs_summary(*unpack_section_pages(row, TABS_PREVIEWS))
+    return {s: by_symbol.get(s) for s in wanted}
 
 
 # ---------------------------
 # Full company doc
 # ---------------------------
+# Heavy parts left out of the default "light" profile; each has its own endpoint
+# (sections, tabs, historical) or can be requested with ?fields= / ?profile=full
+LIGHT_PROFILE_EXCLUDE = [
+    "nse_company",
+    "performance_table",
+    "gmp_history",
+    "nse_quote.order_book",
+]
+
+FIELD_PATH = re.compile(r"^[A-Za-z0-9_\-]+(\.[A-Za-z0-9_\-]+)*$")
+MAX_FIELDS = 50
+
+
+def parse_field_list(raw: Optional[str], param: str) -> List[str]:
+    """Comma separated dotted paths; a path already covered by its parent is dropped."""
+    paths = [p.strip() for p in (raw or "").split(",") if p.strip()]
+    if len(paths) > MAX_FIELDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_FIELDS} paths in '{param}'")
+    for p in paths:
+        if not FIELD_PATH.match(p):
+            raise HTTPException(status_code=400, detail=f"Invalid field path in '{param}': {p}")
+    return collapse_paths(paths)
+
+
+def collapse_paths(paths: List[str]) -> List[str]:
+    """
+    Sorted unique paths without those covered by a parent: Mongo rejects
+    overlapping paths such as "nse_company" + "nse_company.announcements".
+    """
+    paths = sorted(set(paths))
+    kept = []
+    for p in paths:
+        if not any(p.startswith(k + ".") for k in kept):
+            kept.append(p)
+    return kept
+
+
+def company_projection(fields: Optional[str], exclude: Optional[str], profile: str) -> dict:
+    include = parse_field_list(fields, "fields")
+    excluded = parse_field_list(exclude, "exclude")
+    if include and excluded:
+        raise HTTPException(status_code=400, detail="Use either 'fields' or 'exclude', not both")
+    if include:
+        # symbol always comes back; collapsed together so "symbol.x" cannot collide with it
+        return {"_id": 0, **{p: 1 for p in collapse_paths(include + ["symbol"])}}
+    if profile == "light":
+        excluded = parse_field_list(",".join(LIGHT_PROFILE_EXCLUDE + excluded), "exclude")
+    return {"_id": 0, **{p: 0 for p in excluded}}
+
+
 @router.get("/{symbol}")
-def company_full(symbol: str):
-    return fetch(symbol, {"_id": 0})
+async def company_full(
+    symbol: str,
+    fields: Optional[str] = Query(None, description="Comma separated paths to return, e.g. company_name,nse_quote.price_info"),
+    exclude: Optional[str] = Query(None, description="Comma separated paths to leave out"),
+    profile: str = Query("light", pattern="^(light|full)$"),
+):
+    """
+    Company document with a Mongo projection. By default the "light" profile
+    drops the heavy nse_company sections and price history; `fields` selects
+    exactly what to return, `exclude` removes more, `profile=full` returns all.
+    """
+    projection = company_projection(fields, exclude, profile)
+    try:
+        return await fetch(symbol, projection)
+    except OperationFailure as e:
+        # Paths that validate but Mongo still refuses as a projection
+        raise HTTPException(status_code=400, detail=f"Invalid projection: {(e.details or {}).get('errmsg', str(e))}")
 
 
 # ---------------------------
@@ -99,8 +269,8 @@ def normalize_quote(nse_quote: dict):
 
 
 @router.get("/{symbol}/quote")
-def company_quote(symbol: str):
-    doc = fetch(symbol, {"nse_quote": 1})
+async def company_quote(symbol: str):
+    doc = await fetch(symbol, {"nse_quote": 1})
     nq = doc.get("nse_quote", {}) or {}
     return normalize_quote(nq)
 
@@ -109,111 +279,86 @@ def company_quote(symbol: str):
 # Announcements
 # ---------------------------
 @router.get("/{symbol}/announcements")
-def company_announcements(
+async def company_announcements(
     symbol: str,
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
 ):
-    doc = fetch(symbol, {"nse_company.announcements": 1})
-    section = (doc.get("nse_company") or {}).get("announcements")
-    items = unwrap_section(section)
-    items = sort_by_latest(items, ["sort_date", "an_dt", "dt"])
-    return paginate(items, limit, offset)
+    return await section_page(symbol, "announcements", limit, offset, response)
 
 
 # ---------------------------
 # Corporate Actions
 # ---------------------------
 @router.get("/{symbol}/corporate-actions")
-def company_corporate_actions(
+async def company_corporate_actions(
     symbol: str,
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
 ):
-    doc = fetch(symbol, {"nse_company.corporate_actions": 1})
-    items = as_list((doc.get("nse_company") or {}).get("corporate_actions", []))
-    items = sort_by_latest(items, ["exDate", "recordDate", "date"])
-    return paginate(items, limit, offset)
+    return await section_page(symbol, "corporate_actions", limit, offset, response)
 
 
 # ---------------------------
 # Annual Reports
 # ---------------------------
 @router.get("/{symbol}/annual-reports")
-def company_annual_reports(
+async def company_annual_reports(
     symbol: str,
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
 ):
-    doc = fetch(symbol, {"nse_company.annual_reports": 1})
-    section = (doc.get("nse_company") or {}).get("annual_reports")
-    items = unwrap_section(section)
-    items = sort_by_latest(items, ["sort_date", "an_dt", "dt"])
-    return paginate(items, limit, offset)
+    return await section_page(symbol, "annual_reports", limit, offset, response)
 
 
 # ---------------------------
 # BRSR Reports
 # ---------------------------
 @router.get("/{symbol}/brsr-reports")
-def company_brsr_reports(
+async def company_brsr_reports(
     symbol: str,
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
 ):
-    doc = fetch(symbol, {"nse_company.brsr_reports": 1})
-    sym = normalize_symbol(symbol)
-
-    section = (doc.get("nse_company") or {}).get("brsr_reports")
-    items = unwrap_section(section)
-
-    items = [x for x in items if normalize_symbol(x.get("symbol", "")) == sym]
-    items = sort_by_latest(items, ["sort_date", "an_dt", "dt"])
-    return paginate(items, limit, offset)
+    return await section_page(symbol, "brsr_reports", limit, offset, response)
 
 
 # ---------------------------
 # Board Meetings
 # ---------------------------
 @router.get("/{symbol}/board-meetings")
-def company_board_meetings(
+async def company_board_meetings(
     symbol: str,
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
 ):
-    doc = fetch(symbol, {"nse_company.board_meetings": 1})
-    items = (doc.get("nse_company") or {}).get("board_meetings", [])
-
-    if isinstance(items, dict) and "data" in items:
-        items = items.get("data") or []
-
-    items = as_list(items)
-    items = sort_by_latest(items, ["meetingDate", "bm_date", "date", "sort_date"])
-    return paginate(items, limit, offset)
+    return await section_page(symbol, "board_meetings", limit, offset, response)
 
 
 # ---------------------------
 # Event Calendar
 # ---------------------------
 @router.get("/{symbol}/event-calendar")
-def company_event_calendar(
+async def company_event_calendar(
     symbol: str,
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
 ):
-    doc = fetch(symbol, {"nse_company.event_calendar": 1})
-    section = (doc.get("nse_company") or {}).get("event_calendar")
-    items = unwrap_section(section)
-    items = sort_by_latest(items, ["date", "sort_date"])
-    return paginate(items, limit, offset)
+    return await section_page(symbol, "event_calendar", limit, offset, response)
 
 
 # ---------------------------
 # Shareholding Pattern
 # ---------------------------
 @router.get("/{symbol}/shareholding-pattern")
-def company_shareholding_pattern(symbol: str):
-    doc = fetch(symbol, {
+async def company_shareholding_pattern(symbol: str):
+    doc = await fetch(symbol, {
         "nse_company.shareholding_pattern": 1,
         "nse_company.shareholding_patterns": 1
     })
@@ -232,8 +377,8 @@ def company_shareholding_pattern(symbol: str):
 # Financial Results
 # ---------------------------
 @router.get("/{symbol}/financial-results")
-def company_financial_results(symbol: str):
-    doc = fetch(symbol, {"nse_company.financial_results": 1})
+async def company_financial_results(symbol: str):
+    doc = await fetch(symbol, {"nse_company.financial_results": 1})
     return (doc.get("nse_company") or {}).get("financial_results", {}) or {}
 
 
@@ -241,64 +386,84 @@ def company_financial_results(symbol: str):
 # ✅ Historical performance table (for "Historical Data" tab)
 # ---------------------------
 @router.get("/{symbol}/historical")
-def company_historical(symbol: str):
+async def company_historical(
+    symbol: str,
+    from_date: Optional[str] = Query(None, alias="from", pattern=DATE_PATTERN),
+    to_date: Optional[str] = Query(None, alias="to", pattern=DATE_PATTERN),
+    interval: str = Query("1d", pattern="^(1d|1w|1m)$"),
+):
     symbol = normalize_symbol(symbol)
-
-    doc = ipo_past_master.find_one(
-        {"symbol": symbol},
-        {"_id": 0, "symbol": 1, "performance_table": 1}
-    )
-
-    if not doc:
-        raise HTTPException(status_code=404, detail="Company not found")
+    # DATE_PATTERN only checks the shape; strptime rejects dates that do not exist
+    start, end = parse_query_date(from_date, "from"), parse_query_date(to_date, "to")
+
+    if interval == "1d":
+        # Daily rows: the date range is applied inside Mongo
+        rows = await fetch_daily_bars(symbol, start, end)
+    else:
+        # Downsampled series are cached per symbol + interval, then range-filtered
+        async def resampled():
+            return await run_in_threadpool(resample_bars, await fetch_daily_bars(symbol), interval)
+
+        bars = await response_cache.get_or_compute(("historical", symbol, interval), resampled)
+        rows = [
+            b for b in bars
+            if (not from_date or b["date"] >= from_date) and (not to_date or b["date"] <= to_date)
+        ]
 
     return {
         "symbol": symbol,
-        "rows": doc.get("performance_table") or []
+        "interval": interval,
+        "rows": rows
     }
 
 
 # ---------------------------
 # Tabs summary (frontend friendly)
 # ---------------------------
+ANN_PREVIEW = 5
+ACTIONS_PREVIEW = 5
+REPORTS_PREVIEW = 3
+
+TABS_PREVIEWS = {
+    "announcements": ANN_PREVIEW,
+    "corporate_actions": ACTIONS_PREVIEW,
+    "annual_reports": REPORTS_PREVIEW,
+    "brsr_reports": REPORTS_PREVIEW,
+    "event_calendar": ACTIONS_PREVIEW,
+    "board_meetings": ACTIONS_PREVIEW,
+}
+
+TABS_FIELDS = [
+    "company_name",
+    "security_type",
+    "nse_company_updated_at",
+    "nse_quote_updated_at",
+    "nse_company.shareholding_pattern",
+    "nse_company.shareholding_patterns",
+    "nse_company.financial_results",
+    "nse_company.audited_financials",
+]
+
+
 @router.get("/{symbol}/tabs")
-def company_tabs_summary(symbol: str):
-    doc = fetch(symbol, {
-        "symbol": 1,
-        "company_name": 1,
-        "security_type": 1,
-        "nse_company_updated_at": 1,
-        "nse_quote_updated_at": 1,
-
-        "nse_company.announcements": 1,
-        "nse_company.corporate_actions": 1,
-        "nse_company.annual_reports": 1,
-        "nse_company.brsr_reports": 1,
-        "nse_company.event_calendar": 1,
-        "nse_company.board_meetings": 1,
-        "nse_company.shareholding_pattern": 1,
-        "nse_company.shareholding_patterns": 1,
-        "nse_company.financial_results": 1,
-        "nse_company.audited_financials": 1,
-    })
+async def company_tabs_summary(symbol: str):
 
+    # Only the previews leave Mongo; counts come from the stored section counts
+    doc, pages = await fetch_section_pages(symbol, TABS_PREVIEWS, extra=TABS_FIELDS)
+    return shape_tabs_summary(doc, pages)
+
+
+def shape_tabs_summary(doc: dict, pages: dict) -> dict:
     nse_company = doc.get("nse_company") or {}
     audited_reports = nse_company.get("audited_financials") or []
 
-    announcements = unwrap_section(nse_company.get("announcements"))
-    annual_reports = unwrap_section(nse_company.get("annual_reports"))
-    brsr_reports = unwrap_section(nse_company.get("brsr_reports"))
-    corporate_actions = unwrap_section(nse_company.get("corporate_actions"))
-    event_calendar = unwrap_section(nse_company.get("event_calendar"))
-    board_meetings = unwrap_section(nse_company.get("board_meetings"))
-
     # Handle shareholding pattern logic for tabs summary
     shareholding = nse_company.get("shareholding_patterns") or nse_company.get("shareholding_pattern") or {}
     financials = nse_company.get("financial_results") or {}
 
-    ANN_PREVIEW = 5
-    ACTIONS_PREVIEW = 5
-    REPORTS_PREVIEW = 3
+    def tab(name):
+        items, count = pages[name]
+        return {"count": count, "preview": items}
 
     return {
         "symbol": doc.get("symbol"),
@@ -309,12 +474,12 @@ def company_tabs_summary(symbol: str):
             "nse_quote_updated_at": doc.get("nse_quote_updated_at"),
         },
         "tabs": {
-            "announcements": {"count": len(announcements), "preview": announcements[:ANN_PREVIEW]},
-            "corporate_actions": {"count": len(corporate_actions), "preview": corporate_actions[:ACTIONS_PREVIEW]},
-            "annual_reports": {"count": len(annual_reports), "preview": annual_reports[:REPORTS_PREVIEW]},
-            "brsr_reports": {"count": len(brsr_reports), "preview": brsr_reports[:REPORTS_PREVIEW]},
-            "event_calendar": {"count": len(event_calendar), "preview": event_calendar[:ACTIONS_PREVIEW]},
-            "board_meetings": {"count": len(board_meetings), "preview": board_meetings[:ACTIONS_PREVIEW]},
+            "announcements": tab("announcements"),
+            "corporate_actions": tab("corporate_actions"),
+            "annual_reports": tab("annual_reports"),
+            "brsr_reports": tab("brsr_reports"),
+            "event_calendar": tab("event_calendar"),
+            "board_meetings": tab("board_meetings"),
             "shareholding_pattern": {
                 "exists": shareholding not in (None, {}, []),
                 "data": shareholding,
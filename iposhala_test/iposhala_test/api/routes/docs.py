@@ -1,14 +1,20 @@
 # iposhala_test/api/routes/docs.py
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse, JSONResponse
-import requests
-import time
-from typing import Optional
-
-from iposhala_test.scripts.mongo import ipo_past_master, ipo_live_upcoming
-
-router = APIRouter(prefix="/api/docs", tags=["docs"])
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+import asyncio
+import httpx
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from iposhala_test.scripts.mongo_async import ipo_past_master, ipo_live_upcoming
+from iposhala_test.api.doc_store import doc_store
+from iposhala_test.api.nse_client import nse_client
+from iposhala_test.api.metrics import cache_lookups
+from iposhala_test.api.responses import FastJSONRoute
+
+router = APIRouter(prefix="/api/docs", tags=["docs"], route_class=FastJSONRoute)
 
 # ✅ Headers for PDF download from NSE
 NSE_PDF_HEADERS = {
@@ -17,9 +23,62 @@ NSE_PDF_HEADERS = {
     "Accept": "application/pdf,application/octet-stream,*/*",
     "Accept-Language": "en-US,en;q=0.9",
     "Referer": "https://www.nseindia.com/",
-    "Connection": "keep-alive",
 }
 
+# Upstream document downloads allowed at once; further viewers wait up to
+# DOWNLOAD_QUEUE_TIMEOUT seconds for a slot, then get a 503
+MAX_CONCURRENT_DOWNLOADS = 4
+DOWNLOAD_QUEUE_TIMEOUT = 30
+
+download_slots = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+
+# How long a viewer waits on another request's download of the same document
+# before fetching it directly (not stored) instead
+DOWNLOAD_LOCK_TIMEOUT = 10
+
+
+class DownloadLock:
+    """
+    One in-flight download per source URL; later viewers wait and read the
+    stored copy. Entries leave download_locks once nobody holds or waits on them.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+    @classmethod
+    def for_url(cls, url: str) -> "DownloadLock":
+        key = doc_store.key(url)
+        entry = download_locks.setdefault(key, cls(key))
+        entry.users += 1
+        return entry
+
+    async def acquire(self, timeout: float) -> bool:
+        """True once held; False after `timeout`, when this viewer is no longer counted."""
+        try:
+            await asyncio.wait_for(self.lock.acquire(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._leave()
+            return False
+        except BaseException:
+            self._leave()
+            raise
+
+    def release(self):
+        self.lock.release()
+        self._leave()
+
+    def _leave(self):
+        self.users -= 1
+        if self.users == 0 and download_locks.get(self.key) is self:
+            del download_locks[self.key]
+
+
+download_locks: Dict[str, DownloadLock] = {}
+
 
 def normalize_symbol(symbol: str) -> str:
     return (symbol or "").upper().strip()
@@ -44,17 +103,17 @@ def map_doc_type(doc_type: str) -> str:
     return aliases[doc_type]
 
 
-def get_doc_source_url(symbol: str, doc_type: str) -> Optional[str]:
+async def get_doc_source_url(symbol: str, doc_type: str) -> Optional[str]:
     symbol = normalize_symbol(symbol)
 
-    doc = ipo_past_master.find_one(
+    doc = await ipo_past_master.find_one(
         {"symbol": symbol},
         {"documents": 1, "ipo_docs": 1, "symbol": 1, "_id": 0}
     )
 
     if not doc:
         # Check upcoming / live as well
-        doc = ipo_live_upcoming.find_one(
+        doc = await ipo_live_upcoming.find_one(
             {"symbol": symbol},
             {"documents": 1, "symbol": 1, "_id": 0}
         )
@@ -84,36 +143,30 @@ def get_doc_source_url(symbol: str, doc_type: str) -> Optional[str]:
     return None
 
 
-def get_nse_session() -> requests.Session:
-    """
-    Creates a session and warms up NSE cookies.
-    """
-    s = requests.Session()
-    s.get("https://www.nseindia.com", headers=NSE_PDF_HEADERS, timeout=15)
-    return s
-
-
-def stream_doc_from_url(url: str, filename: str):
+async def open_upstream(url: str) -> httpx.Response:
     """
-    Stream NSE PDF or ZIP. Retries if blocked.
+    Open a streaming NSE PDF or ZIP response on the shared NSE client. Retries if blocked.
     """
     last_err = None
 
     for attempt in range(1, 5):
         try:
-            session = get_nse_session()
-            
+            # Fresh cookies on retries
+            await nse_client.warm_up(force=attempt > 1)
+
             # Use different headers for different attempts to try bypassing blocks
             current_headers = NSE_PDF_HEADERS.copy()
             if attempt > 1:
                 current_headers["Upgrade-Insecure-Requests"] = "1"
-            
-            r = session.get(url, headers=current_headers, stream=True, timeout=30)
+
+            req = nse_client.client.build_request("GET", url, headers=current_headers, timeout=30)
+            r = await nse_client.client.send(req, stream=True)
 
             if r.status_code != 200:
+                await r.aclose()
                 # If we get 503 or 403, it's likely a temporary block or rate limit
                 if r.status_code in [503, 403, 429]:
-                    time.sleep(2 * attempt)
+                    await asyncio.sleep(2 * attempt)
                     continue
                 raise Exception(f"NSE status={r.status_code}")
 
@@ -123,40 +176,166 @@ def stream_doc_from_url(url: str, filename: str):
             if "pdf" not in ct and "octet-stream" not in ct and "zip" not in ct:
                 sample = ""
                 try:
-                    sample = r.text[:200]
+                    sample = (await r.aread())[:200].decode("utf-8", "replace")
                 except Exception:
                     pass
+                await r.aclose()
                 raise Exception(f"Blocked/non-document response ct={ct}, sample={sample}")
 
-            # Determine filename extension if not already in filename
-            final_filename = filename
-            if "zip" in ct and not final_filename.endswith(".zip"):
-                final_filename += ".zip"
-            elif "pdf" in ct and not final_filename.endswith(".pdf"):
-                final_filename += ".pdf"
-
-            return StreamingResponse(
-                r.iter_content(chunk_size=1024 * 128),
-                media_type=r.headers.get("Content-Type", "application/pdf"),
-                headers={
-                    "Content-Disposition": f'inline; filename="{final_filename}"',
-                    "Cache-Control": "no-store",
-                },
-            )
+            return r
 
         except Exception as e:
             last_err = e
-            time.sleep(1 * attempt)
+            await asyncio.sleep(1 * attempt)
 
     raise HTTPException(status_code=502, detail=f"Failed to fetch NSE PDF: {last_err}")
 
 
+async def acquire_download_slot():
+    try:
+        await asyncio.wait_for(download_slots.acquire(), DOWNLOAD_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Too many document downloads in progress, retry shortly")
+
+
+async def relay_and_store(r: httpx.Response, url: str, lock: Optional[DownloadLock]):
+    """
+    Async generator feeding the StreamingResponse: relays upstream chunks to the
+    client while writing them to the document store. The copy is kept only if
+    the whole body arrived. Without `lock` (another request owns this URL's
+    download) the body is only relayed.
+    """
+    writer = None
+    complete = False
+    try:
+        # Store file I/O runs on the threadpool, never on the event loop
+        if lock:
+            writer = await run_in_threadpool(doc_store.writer, url)
+        # serve_doc primes the generator up to here, so the cleanup below runs
+        # even if the client disconnects before the body is ever iterated
+        yield b""
+        async for chunk in r.aiter_bytes(chunk_size=1024 * 128):
+            if writer:
+                await run_in_threadpool(writer.write, chunk)
+            yield chunk
+        complete = True
+    finally:
+        await r.aclose()
+        download_slots.release()
+        try:
+            if writer and complete:
+                await run_in_threadpool(writer.commit, r.headers.get("Content-Type", "application/pdf"), r.headers.get("Last-Modified"))
+            elif writer:
+                await run_in_threadpool(writer.abort)
+        finally:
+            if lock:
+                lock.release()
+
+
+def not_modified(request: Request, meta: dict) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return meta["etag"] in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(meta["last_modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def doc_headers(content_type: str, filename: str) -> dict:
+    ct = (content_type or "").lower()
+
+    # Determine filename extension if not already in filename
+    final_filename = filename
+    if "zip" in ct and not final_filename.endswith(".zip"):
+        final_filename += ".zip"
+    elif "pdf" in ct and not final_filename.endswith(".pdf"):
+        final_filename += ".pdf"
+
+    return {
+        "Content-Disposition": f'inline; filename="{final_filename}"',
+        "Cache-Control": "public, max-age=86400",
+    }
+
+
+def serve_stored_doc(request: Request, meta: dict, filename: str):
+    """
+    Serve a stored document: 304 on a matching ETag / Last-Modified, otherwise a
+    FileResponse, which handles Range requests and uses zero-copy sends when the
+    server supports them.
+    """
+    headers = {
+        **doc_headers(meta.get("content_type"), filename),
+        "ETag": meta["etag"],
+        "Last-Modified": meta["last_modified"],
+    }
+    if not_modified(request, meta):
+        headers.pop("Content-Disposition")
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(meta["path"], media_type=meta.get("content_type") or "application/pdf", headers=headers)
+
+
+async def serve_doc(request: Request, url: str, filename: str):
+    meta = await run_in_threadpool(doc_store.get, url)
+    if meta:
+        cache_lookups.inc(cache="doc_store", result="hit")
+        return serve_stored_doc(request, meta, filename)
+
+    lock = DownloadLock.for_url(url)
+    if await lock.acquire(DOWNLOAD_LOCK_TIMEOUT):
+        # Another request may have finished the download while we waited
+        try:
+            meta = await run_in_threadpool(doc_store.get, url)
+        except BaseException:
+            lock.release()
+            raise
+        if meta:
+            lock.release()
+            cache_lookups.inc(cache="doc_store", result="coalesced")
+            return serve_stored_doc(request, meta, filename)
+        cache_lookups.inc(cache="doc_store", result="miss")
+    else:
+        # The first viewer is still streaming it (slow client): fetch directly, don't store
+        lock = None
+        cache_lookups.inc(cache="doc_store", result="proxied")
+
+    try:
+        await acquire_download_slot()
+        try:
+            r = await open_upstream(url)
+        except BaseException:
+            download_slots.release()
+            raise
+    except BaseException:
+        if lock:
+            lock.release()
+        raise
+
+    # Slot and lock are released by relay_and_store once the body is done
+    body = relay_and_store(r, url, lock)
+    await body.__anext__()
+
+    headers = doc_headers(r.headers.get("Content-Type"), filename)
+    # Only an unencoded body is relayed byte-for-byte
+    if r.headers.get("Content-Length") and not r.headers.get("Content-Encoding"):
+        headers["Content-Length"] = r.headers["Content-Length"]
+    return StreamingResponse(
+        body,
+        media_type=r.headers.get("Content-Type", "application/pdf"),
+        headers=headers,
+    )
+
+
 @router.get("/{symbol}/{doc_type}")
-def stream_ipo_doc(symbol: str, doc_type: str):
+async def stream_ipo_doc(symbol: str, doc_type: str, request: Request):
     symbol = normalize_symbol(symbol)
     doc_type = map_doc_type(doc_type)
 
-    source_url = get_doc_source_url(symbol, doc_type)
+    source_url = await get_doc_source_url(symbol, doc_type)
 
     # ✅ OPTION B: Never 404. Always return something.
     if not source_url:
@@ -171,4 +350,4 @@ def stream_ipo_doc(symbol: str, doc_type: str):
         )
 
     filename = f"{symbol}_{doc_type}"
-    return stream_doc_from_url(source_url, filename)
+    return await serve_doc(request, source_url, filename)
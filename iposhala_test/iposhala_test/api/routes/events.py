@@ -0,0 +1,68 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+try:
+    from iposhala_test.api.events import live_events, format_sse
+    from iposhala_test.api.responses import FastJSONRoute
+except ImportError:
+    from ..events import live_events, format_sse
+    from ..responses import FastJSONRoute
+
+router = APIRouter(prefix="/api/events", tags=["Events"], route_class=FastJSONRoute)
+
+# Comment frame sent on idle connections so proxies keep them open
+HEARTBEAT_INTERVAL = 15.0
+# Client reconnect delay advertised in the stream (ms)
+RETRY_MS = 3000
+
+
+async def event_stream(request: Request, keys, last_event_id: Optional[int]):
+    # Subscribe before replaying so nothing published in between is lost
+    sub = await live_events.subscribe(keys)
+    try:
+        yield b"retry: %d\n\n" % RETRY_MS
+        seen = last_event_id or 0
+        if last_event_id is not None:
+            for event in await live_events.replay(last_event_id, keys):
+                seen = event["seq"]
+                yield format_sse(event)
+
+        while not sub.lagged:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": ping\n\n"
+                continue
+            if event["seq"] <= seen:
+                continue
+            seen = event["seq"]
+            yield format_sse(event)
+    finally:
+        live_events.unsubscribe(sub)
+
+
+@router.get("/live")
+async def live_updates(
+    request: Request,
+    ipo_ids: Optional[str] = Query(None, description="Comma separated ipo_ids / symbols to follow (default: all)"),
+    last_event_id: Optional[int] = Header(None),
+):
+    """
+    Server-Sent Events stream of per-IPO deltas (subscription, status, price
+    band, GMP) pushed as the pipelines write ipo_live_upcoming / ipo_gmp.
+    Replaces polling /api/ipos/live and /api/gmp/. Event types: live, gmp,
+    closed, removed. Reconnects resume from Last-Event-ID.
+    """
+    keys = {k.strip() for k in (ipo_ids or "").split(",") if k.strip()} or None
+    if keys:
+        keys |= {k.upper() for k in keys} | {k.lower() for k in keys}
+    return StreamingResponse(
+        event_stream(request, keys, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+try:
+    from iposhala_test.scripts.mongo_async import ipo_past_master, ipo_live_upcoming
+    from iposhala_test.scripts.ipo_export import (
+        EXPORT_COLLECTIONS, DEFAULT_COLUMNS, DEFAULT_BATCH_SIZE, ParquetBatches, effective_batch_size,
+        parse_columns, export_projection, ndjson_batch, csv_header, csv_batch, parquet_available,
+    )
+    from iposhala_test.api.responses import FastJSONRoute, ORJSON_OPTIONS, orjson_default
+except ImportError:
+    from ...scripts.mongo_async import ipo_past_master, ipo_live_upcoming
+    from ...scripts.ipo_export import (
+        EXPORT_COLLECTIONS, DEFAULT_COLUMNS, DEFAULT_BATCH_SIZE, ParquetBatches, effective_batch_size,
+        parse_columns, export_projection, ndjson_batch, csv_header, csv_batch, parquet_available,
+    )
+    from ..responses import FastJSONRoute, ORJSON_OPTIONS, orjson_default
+
+router = APIRouter(prefix="/api/export", tags=["Export"], route_class=FastJSONRoute)
+
+COLLECTIONS = {"past": ipo_past_master, "live": ipo_live_upcoming}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+MAX_BATCH_SIZE = 5000
+
+
+def orjson_line(row: dict) -> bytes:
+    """NDJSON line with the same encoder as the JSON responses."""
+    return orjson.dumps(row, default=orjson_default, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+
+async def export_batches(sources, columns, batch_size):
+    """Yields (source, docs) one cursor batch at a time."""
+    for source in sources:
+        cursor = COLLECTIONS[source].find({}, export_projection(columns), batch_size=batch_size)
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield source, batch
+                batch = []
+        if batch:
+            yield source, batch
+
+
+async def encode_export(fmt, sources, columns, batch_size):
+    parquet = ParquetBatches(columns) if fmt == "parquet" else None
+    if fmt == "csv":
+        yield csv_header(columns)
+
+    # Encoding a batch is CPU work; keep it off the event loop
+    async for source, docs in export_batches(sources, columns, batch_size):
+        if fmt == "ndjson":
+            yield await run_in_threadpool(ndjson_batch, docs, columns, source, orjson_line)
+        elif fmt == "csv":
+            yield await run_in_threadpool(csv_batch, docs, columns, source)
+        else:
+            chunk = await run_in_threadpool(parquet.write, docs, source)
+            if chunk:
+                yield chunk
+
+    if parquet:
+        yield await run_in_threadpool(parquet.close)
+
+
+@router.get("")
+async def export_ipos(
+    collection: str = Query("all", pattern="^(past|live|all)$"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    columns: Optional[str] = Query(None, description="Comma separated dotted paths"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE),
+):
+    """
+    Streams the IPO universe without materialising it: documents are read in
+    cursor batches and encoded batch by batch (NDJSON lines, CSV rows, or one
+    Parquet row group per batch). NDJSON without `columns` exports whole
+    documents, at most WHOLE_DOCUMENT_BATCH_SIZE per batch; CSV and Parquet
+    flatten to DEFAULT_COLUMNS.
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+
+    cols = parse_columns(columns)
+    if format != "ndjson":
+        cols = cols or DEFAULT_COLUMNS
+    sources = list(EXPORT_COLLECTIONS) if collection == "all" else [collection]
+
+    filename = f"ipos_{collection}_{datetime.now().strftime('%Y%m%d')}.{format}"
+    return StreamingResponse(
+        encode_export(format, sources, cols, effective_batch_size(cols, batch_size)),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
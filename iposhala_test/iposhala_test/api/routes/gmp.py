@@ -3,30 +3,41 @@ from typing import List, Dict, Any
 import logging
 
 try:
-    from iposhala_test.scripts.mongo import ipo_gmp, ipo_live_upcoming, ipo_past_master
-    from iposhala_test.scripts.pipeline_gmp import fetch_and_store_gmp
+    from iposhala_test.scripts import mongo_async
+    from iposhala_test.scripts.jobs.job_queue import enqueue_job, shape_job
+    from iposhala_test.api.cache import cached
+    from iposhala_test.api.responses import FastJSONRoute
 except ImportError:
-    from ...scripts.mongo import ipo_gmp, ipo_live_upcoming, ipo_past_master
-    from ...scripts.pipeline_gmp import fetch_and_store_gmp
+    from ...scripts import mongo_async
+    from ...scripts.jobs.job_queue import enqueue_job, shape_job
+    from ..cache import cached
+    from ..responses import FastJSONRoute
 
-router = APIRouter(prefix="/api/gmp", tags=["GMP Data"])
+router = APIRouter(prefix="/api/gmp", tags=["GMP Data"], route_class=FastJSONRoute)
 
-@router.get("/fetch")
+# Queues the Selenium scrape for the job worker (scripts/jobs/worker.py) instead of
+# running Chrome on an API thread; concurrent triggers share one run. Poll
+# status_url for the result. POST: crawlers and link prefetchers must not queue
+# scrapes. Sync def: the queue uses the blocking client.
+@router.post("/fetch", status_code=202)
 def trigger_fetch_and_store_gmp():
     try:
-        data = fetch_and_store_gmp()
-        return {"success": True, "count": len(data), "data": data}
+        job, created = enqueue_job("gmp")
     except Exception as e:
-        logging.error(f"Scraping failed: {e}")
-        # If scraping fails, return cached data
-        cached_data = list(ipo_gmp.find({}, {"_id": 0}))
-        return {"success": False, "message": "Scraping failed, returning cached data", "data": cached_data}
+        logging.error(f"Could not queue GMP scrape: {e}")
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    return {
+        **shape_job(job),
+        "deduplicated": not created,
+        "status_url": f"/api/jobs/{job['_id']}",
+    }
 
 @router.get("/")
-def get_gmp_data():
+@cached()
+async def get_gmp_data():
     try:
         # Fetch data sorted by last updated descending
-        data = list(ipo_gmp.find({}, {"_id": 0}).sort("lastUpdated", -1))
+        data = await mongo_async.ipo_gmp.find({}, {"_id": 0}).sort("lastUpdated", -1).to_list(None)
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
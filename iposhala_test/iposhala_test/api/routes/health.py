@@ -0,0 +1,49 @@
+import time
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+try:
+    from iposhala_test.scripts import mongo_async
+    from iposhala_test.api.responses import FastJSONRoute
+except ImportError:
+    from ...scripts import mongo_async
+    from ..responses import FastJSONRoute
+
+router = APIRouter(prefix="/health", tags=["Health"], route_class=FastJSONRoute)
+
+# Seconds the readiness probe waits for Mongo before reporting not ready
+READY_TIMEOUT = 2.0
+
+STARTED_AT = time.monotonic()
+
+
+@router.get("/live", include_in_schema=False)
+async def liveness():
+    """The process is up and serving; touches no dependencies."""
+    return {"status": "ok"}
+
+
+@router.get("/ready", include_in_schema=False)
+async def readiness():
+    """
+    Ready to take traffic: Mongo answers a ping within READY_TIMEOUT. The
+    first call is also where the async client opens its connection pool.
+    """
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(mongo_async.db.command("ping"), READY_TIMEOUT)
+        mongo = {"status": "ok", "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+    except Exception as e:
+        mongo = {"status": "error", "error": str(e) or type(e).__name__}
+
+    ready = mongo["status"] == "ok"
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "not_ready",
+            "uptime_s": round(time.monotonic() - STARTED_AT, 1),
+            "checks": {"mongo": mongo},
+        },
+        status_code=200 if ready else 503,
+    )
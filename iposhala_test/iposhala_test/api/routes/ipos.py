@@ -1,28 +1,33 @@
-from fastapi import APIRouter, HTTPException
-from iposhala_test.scripts.mongo import ipo_past_master, ipo_live_upcoming, MONGO_URI, DB_NAME
+from fastapi import APIRouter, Body, HTTPException
+from iposhala_test.scripts.mongo import MONGO_URI, DB_NAME
+from iposhala_test.scripts.mongo_async import ipo_past_master, ipo_live_upcoming
+from iposhala_test.scripts.ipo_scoring import score_ipo
+from iposhala_test.api.responses import FastJSONRoute
+from iposhala_test.api.metrics import log_event
 from datetime import datetime
+from typing import Dict, List
 
-router = APIRouter(prefix="/api/ipos", tags=["ipos"])
+router = APIRouter(prefix="/api/ipos", tags=["ipos"], route_class=FastJSONRoute)
 
 
 @router.get("/debug/doc/{symbol}")
-def debug_doc(symbol: str):
+async def debug_doc(symbol: str):
     symbol = (symbol or "").upper().strip()
-    doc = ipo_past_master.find_one({"symbol": symbol})
+    doc = await ipo_past_master.find_one({"symbol": symbol})
     if doc:
         doc.pop("_id", None)
     return doc
 
 @router.get("/debug/config")
-def debug_config():
-    e2erail_count = ipo_past_master.count_documents({"symbol": "E2ERAIL"})
-    total_count = ipo_past_master.count_documents({})
+async def debug_config():
+    e2erail_count = await ipo_past_master.count_documents({"symbol": "E2ERAIL"})
+    total_count = await ipo_past_master.count_documents({})
     return {
         "mongo_uri": MONGO_URI,
         "db_name": DB_NAME,
         "total_count": total_count,
         "e2erail_count": e2erail_count,
-        "client_address": ipo_past_master.database.client.address,
+        "client_address": await ipo_past_master.database.client.address,
     }
 
 
@@ -33,51 +38,42 @@ def normalize_symbol(symbol: str) -> str:
 
 
 
-@router.get("/{identifier}")
-def get_ipo(identifier: str):
-    print(f"DEBUG API REQ: /{identifier}")
-    identifier = identifier.strip()
-    
-    ipo = ipo_past_master.find_one({"ipo_id": identifier.lower()}, {"_id": 0})
-    print(f"DEBUG IPO by ipo_id: {bool(ipo)}")
-    if not ipo:
-        ipo = ipo_past_master.find_one({"symbol": identifier.upper()}, {"_id": 0})
-        print(f"DEBUG IPO by symbol: {bool(ipo)}")
+MAX_BATCH = 50
 
-    if not ipo:
-        live_ipo = ipo_live_upcoming.find_one({"ipo_id": identifier.lower()}, {"_id": 0})
-        if not live_ipo:
-            live_ipo = ipo_live_upcoming.find_one({"symbol": identifier.upper()}, {"_id": 0})
-            
-        if not live_ipo:
-            raise HTTPException(status_code=404, detail="IPO symbol not found")
-        
-        # Parse datetime into strings for JSON streaming
-        start = live_ipo.get("issue_start_date")
-        end = live_ipo.get("issue_end_date")
-        start_str = start.isoformat() if isinstance(start, datetime) else start
-        end_str = end.isoformat() if isinstance(end, datetime) else end
-
-        ipo = {
-            "ipo_id": live_ipo.get("ipo_id"),
-            "symbol": live_ipo.get("symbol"),
-            "company_name": live_ipo.get("company_name", live_ipo.get("symbol")),
-            "security_type": live_ipo.get("security_type", "Equity"),
-            "issue_start_date": start_str,
-            "issue_end_date": end_str,
+
+def shape_live_ipo(live_ipo: dict) -> dict:
+    """Live / upcoming record in the shape of a past IPO document."""
+    # Parse datetime into strings for JSON streaming
+    start = live_ipo.get("issue_start_date")
+    end = live_ipo.get("issue_end_date")
+    start_str = start.isoformat() if isinstance(start, datetime) else start
+    end_str = end.isoformat() if isinstance(end, datetime) else end
+
+    return {
+        "ipo_id": live_ipo.get("ipo_id"),
+        "symbol": live_ipo.get("symbol"),
+        "company_name": live_ipo.get("company_name", live_ipo.get("symbol")),
+        "security_type": live_ipo.get("security_type", "Equity"),
+        "issue_start_date": start_str,
+        "issue_end_date": end_str,
+        "issue_price": live_ipo.get("price_range", "-"),
+        "price_range": live_ipo.get("price_range", "-"),
+        "status": live_ipo.get("status", "LIVE"),
+        "issue_information": {
             "issue_price": live_ipo.get("price_range", "-"),
-            "price_range": live_ipo.get("price_range", "-"),
-            "status": live_ipo.get("status", "LIVE"),
-            "issue_information": {
-                "issue_price": live_ipo.get("price_range", "-"),
-                "issue_size": live_ipo.get("issue_size", "-"),
-                "issue_start_date": start_str,
-                "issue_end_date": end_str
-            },
-            "documents": {},
-            "nse_company": {}
-        }
-    
+            "issue_size": live_ipo.get("issue_size", "-"),
+            "issue_start_date": start_str,
+            "issue_end_date": end_str
+        },
+        "documents": {},
+        "nse_company": {},
+        "confidence_score": live_ipo.get("confidence_score"),
+        "risk_level": live_ipo.get("risk_level")
+    }
+
+
+def shape_ipo(ipo: dict) -> dict:
+    """Detail payload: legacy document fallbacks, flattened issue info, score."""
     # ✅ Synthesize 'documents' and 'issue_information' for legacy/inconsistent data
     if not ipo.get("documents"):
         ipo_docs = ipo.get("ipo_docs", {})
@@ -130,63 +126,72 @@ def get_ipo(identifier: str):
     elif not ipo.get("lot_size"):
         ipo["lot_size"] = trade_info.get("marketLot")
         
-    # ✅ Calculate Risk / Confidence Score
-    confidence = 50
-    try:
-        gmp_val = float(ipo.get("gmp", 0) or 0)
-        
-        # parse issue price to get upper band
-        price_str = str(ipo.get("issue_price") or ipo.get("price_range") or "0")
-        import re
-        prices = [int(p) for p in re.findall(r'\d+', price_str.replace(',', ''))]
-        upper_price = max(prices) if prices else 0
-        
-        if upper_price > 0:
-            gmp_pct = (gmp_val / upper_price) * 100
-            if gmp_pct > 50:
-                confidence += 30
-            elif gmp_pct > 20:
-                confidence += 20
-            elif gmp_pct > 0:
-                confidence += 10
-            elif gmp_pct < 0:
-                confidence -= 20
-                
-        # Subscriptions
-        sub = ipo.get("subscription", {})
-        qib = float(sub.get("qib") or 0)
-        hni = float(sub.get("hni") or sub.get("nii") or 0)
-        retail = float(sub.get("retail") or 0)
-        
-        total_sub = qib + hni + retail
-        if qib > 50:
-            confidence += 20
-        elif qib > 10:
-            confidence += 10
-            
-        if total_sub > 100:
-            confidence += 10
-            
-        # Issue Size
-        size_str = str(ipo.get("issue_size", "0"))
-        sizes = [float(p) for p in re.findall(r'\d+\.?\d*', size_str.replace(',',''))]
-        size_val = max(sizes) if sizes else 0
-        if size_val > 1000: # > 1000 Cr usually more stable
-            confidence += 10
-        elif size_val < 100 and size_val > 0: # SME or small
-            confidence -= 10
-            
-    except Exception as e:
-        print(f"Risk calc error: {e}")
-        pass
-        
-    ipo["confidence_score"] = min(100, max(0, confidence))
-    
-    if ipo["confidence_score"] >= 75:
-        ipo["risk_level"] = "Low Risk / High Reward"
-    elif ipo["confidence_score"] >= 45:
-        ipo["risk_level"] = "Moderate"
-    else:
-        ipo["risk_level"] = "High Risk / Speculative"
+    # ✅ Risk / Confidence Score, precomputed by the pipelines (scripts/ipo_scoring.py)
+    if ipo.get("confidence_score") is None or not ipo.get("risk_level"):
+        ipo.update(score_ipo(ipo))
                 
     return ipo
+
+
+@router.post("/batch")
+async def get_ipos_batch(identifiers: List[str] = Body(..., embed=True, min_length=1, max_length=MAX_BATCH)):
+    """
+    Detail payloads for many IPOs, keyed by the identifiers as sent (null when
+    not found). Resolves with one $in query per collection, using the same
+    priority as GET /{identifier}: past ipo_id, past symbol, live ipo_id, live symbol.
+    """
+    idents = list(dict.fromkeys(i.strip() for i in identifiers if i and i.strip()))
+    found: Dict[str, dict] = {}
+
+    for coll, shape in ((ipo_past_master, shape_ipo), (ipo_live_upcoming, lambda d: shape_ipo(shape_live_ipo(d)))):
+        pending = [i for i in idents if i not in found]
+        if not pending:
+            break
+        docs = await coll.find(
+            {"$or": [
+                {"ipo_id": {"$in": [i.lower() for i in pending]}},
+                {"symbol": {"$in": [i.upper() for i in pending]}},
+            ]},
+            {"_id": 0}
+        ).to_list(None)
+
+        by_id, by_symbol = {}, {}
+        for d in docs:
+            if d.get("ipo_id"):
+                by_id.setdefault(d["ipo_id"], d)
+            if d.get("symbol"):
+                by_symbol.setdefault(d["symbol"], d)
+        for i in pending:
+            doc = by_id.get(i.lower()) or by_symbol.get(i.upper())
+            if doc:
+                found[i] = shape(doc)
+
+    return {i: found.get(i) for i in idents}
+
+
+@router.get("/{identifier}")
+async def get_ipo(identifier: str):
+    identifier = identifier.strip()
+    matched_by = "past_ipo_id"
+    
+    ipo = await ipo_past_master.find_one({"ipo_id": identifier.lower()}, {"_id": 0})
+    if not ipo:
+        matched_by = "past_symbol"
+        ipo = await ipo_past_master.find_one({"symbol": identifier.upper()}, {"_id": 0})
+
+    if not ipo:
+        matched_by = "live_ipo_id"
+        live_ipo = await ipo_live_upcoming.find_one({"ipo_id": identifier.lower()}, {"_id": 0})
+        if not live_ipo:
+            matched_by = "live_symbol"
+            live_ipo = await ipo_live_upcoming.find_one({"symbol": identifier.upper()}, {"_id": 0})
+            
+        if not live_ipo:
+            # Misses are always logged: they point at broken links or bad ids
+            log_event("ipo_lookup", force=True, identifier=identifier, matched_by=None)
+            raise HTTPException(status_code=404, detail="IPO symbol not found")
+
+        ipo = shape_live_ipo(live_ipo)
+
+    log_event("ipo_lookup", identifier=identifier, matched_by=matched_by)
+    return shape_ipo(ipo)
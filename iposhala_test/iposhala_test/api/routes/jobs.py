@@ -0,0 +1,63 @@
+import os
+import hmac
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+try:
+    from iposhala_test.scripts.jobs import JOBS
+    from iposhala_test.scripts.jobs.job_queue import enqueue_job, get_job, shape_job
+    from iposhala_test.api.responses import FastJSONRoute
+except ImportError:
+    from ...scripts.jobs import JOBS
+    from ...scripts.jobs.job_queue import enqueue_job, get_job, shape_job
+    from ..responses import FastJSONRoute
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"], route_class=FastJSONRoute)
+
+# Jobs anyone may trigger: the GMP refresh had a public trigger before the queue
+PUBLIC_JOBS = {"gmp"}
+
+# Every other job needs `X-Admin-Token: <JOBS_ADMIN_TOKEN>`; unset, only PUBLIC_JOBS can be queued
+JOBS_ADMIN_TOKEN = os.getenv("JOBS_ADMIN_TOKEN")
+
+
+def may_trigger(name: str, token: Optional[str]) -> bool:
+    if name in PUBLIC_JOBS:
+        return True
+    if not JOBS_ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), JOBS_ADMIN_TOKEN.encode("utf-8"))
+
+# Sync defs throughout: the queue lives on the blocking Mongo client, so these
+# short calls run on the threadpool. The jobs themselves run in the worker process.
+
+
+@router.get("/")
+def list_job_names():
+    return sorted(JOBS)
+
+
+@router.post("/{name}", status_code=202)
+def trigger_job(name: str, x_admin_token: Optional[str] = Header(None)):
+    """Queues a pipeline job; returns the already active run if there is one."""
+    if name not in JOBS:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {name}")
+    if not may_trigger(name, x_admin_token):
+        raise HTTPException(status_code=403, detail=f"Triggering {name} requires an admin token")
+    try:
+        job, created = enqueue_job(name)
+    except Exception as e:
+        logging.error(f"Could not queue {name}: {e}")
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    return {**shape_job(job), "deduplicated": not created, "status_url": f"/api/jobs/{job['_id']}"}
+
+
+@router.get("/{job_id}")
+def job_status(job_id: str):
+    """Status of a queued job: queued, running, succeeded (with result) or failed (with error)."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return shape_job(job)
@@ -0,0 +1,63 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+try:
+    from iposhala_test.api.metrics import registry, cache_lookups, CallbackMetric
+    from iposhala_test.api.cache import response_cache
+    from iposhala_test.api.nse_client import quote_cache
+    from iposhala_test.api.events import live_events
+except ImportError:
+    from ..metrics import registry, cache_lookups, CallbackMetric
+    from ..cache import response_cache
+    from ..nse_client import quote_cache
+    from ..events import live_events
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def cache_counts():
+    counts = {
+        ("response", "hit"): response_cache.hits,
+        ("response", "miss"): response_cache.misses,
+        ("nse_quote", "hit"): quote_cache.hits,
+        ("nse_quote", "stale_hit"): quote_cache.stale_hits,
+        ("nse_quote", "miss"): quote_cache.misses,
+    }
+    for (cache, result), value in cache_lookups.items().items():
+        counts[(cache, result)] = value
+    return counts
+
+
+def cache_hit_ratios():
+    totals, hits = {}, {}
+    for (cache, result), value in cache_counts().items():
+        totals[cache] = totals.get(cache, 0) + value
+        if result not in ("miss", "proxied"):
+            hits[cache] = hits.get(cache, 0) + value
+    return {(cache,): hits.get(cache, 0) / total for cache, total in totals.items() if total}
+
+
+registry.register(CallbackMetric(
+    "iposhala_cache_requests_total", "Cache lookups by cache and result",
+    ("cache", "result"), cache_counts, kind="counter",
+))
+registry.register(CallbackMetric(
+    "iposhala_cache_hit_ratio", "Share of lookups served from cache since start (stale and coalesced count as hits)",
+    ("cache",), cache_hit_ratios,
+))
+registry.register(CallbackMetric(
+    "iposhala_response_cache_entries", "Entries held by the in-process response cache",
+    (), lambda: {(): response_cache.size},
+))
+registry.register(CallbackMetric(
+    "iposhala_sse_subscribers", "Open /api/events/live connections",
+    (), lambda: {(): live_events.subscriber_count},
+))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of the API's metrics."""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,49 +1,21 @@
 from fastapi import APIRouter
 from typing import List
 try:
-    from iposhala_test.scripts.mongo import ipo_master, ipo_live_upcoming, ipo_past_master
+    from iposhala_test.api.search_index import search_index
+    from iposhala_test.api.responses import FastJSONRoute
 except ImportError:
-    from ...scripts.mongo import ipo_master, ipo_live_upcoming, ipo_past_master
+    from ..search_index import search_index
+    from ..responses import FastJSONRoute
 
-router = APIRouter(prefix="/api/search", tags=["Search"])
+router = APIRouter(prefix="/api/search", tags=["Search"], route_class=FastJSONRoute)
 
 @router.get("/")
-def global_search(q: str = ""):
+async def global_search(q: str = ""):
     if not q or len(q) < 2:
         return []
 
-    # Case-insensitive regex
-    regex_query = {"$regex": q, "$options": "i"}
-    query = {
-        "$or": [
-            {"company_name": regex_query},
-            {"symbol": regex_query}
-        ]
-    }
-
-    results = []
-
-    # Search Live/Upcoming
-    live_docs = ipo_live_upcoming.find(query, {"_id": 0, "ipo_id": 1, "company_name": 1, "symbol": 1, "status": 1, "security_type": 1}).limit(5)
-    for d in live_docs:
-        results.append({
-            "id": d.get("ipo_id") or d.get("symbol"),
-            "name": d.get("company_name"),
-            "symbol": d.get("symbol"),
-            "type": d.get("security_type", "Equity"),
-            "status": d.get("status")
-        })
-
-    # Search Past 
-    past_docs = ipo_past_master.find(query, {"_id": 0, "ipo_id": 1, "company_name": 1, "symbol": 1, "status": 1, "security_type": 1}).limit(5)
-    for d in past_docs:
-        results.append({
-            "id": d.get("ipo_id") or d.get("symbol"),
-            "name": d.get("company_name"),
-            "symbol": d.get("symbol"),
-            "type": d.get("security_type", "Equity"),
-            "status": "Closed"
-        })
+    # In-memory trie + trigram index, rebuilt when the pipelines bump cache_epoch
+    await search_index.ensure_fresh()
 
     # Limit total results to top 10 for autocomplete performance
-    return results[:10]
+    return search_index.search(q, limit=10)
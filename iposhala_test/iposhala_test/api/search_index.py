@@ -0,0 +1,187 @@
+import re
+import time
+import heapq
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Set
+
+from iposhala_test.scripts.mongo_async import ipo_live_upcoming, ipo_past_master
+from iposhala_test.api.cache import response_cache
+
+# Rebuild at least this often (seconds) even without a pipeline epoch bump
+INDEX_MAX_AGE = 900
+
+# Minimum share of the query's trigrams a fuzzy match must contain
+FUZZY_MIN_OVERLAP = 0.5
+
+SEARCH_PROJECTION = {"_id": 0, "ipo_id": 1, "company_name": 1, "symbol": 1, "status": 1, "security_type": 1}
+
+def normalize(text: str) -> str:
+    text = re.sub(r"[^a-z0-9]+", " ", str(text or "").lower())
+    return " ".join(text.split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Padded trigrams: word boundaries count, which is what fuzzy scoring wants."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def inner_trigrams(text: str) -> Set[str]:
+    """Unpadded trigrams, the ones any string containing `text` must also have."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class Trie:
+    """Prefix trie; every node keeps the ids of all keys below it."""
+
+    def __init__(self):
+        self.root: Dict = {"ids": set()}
+
+    def insert(self, key: str, entry_id: int):
+        node = self.root
+        for ch in key:
+            node = node.setdefault(ch, {"ids": set()})
+            node["ids"].add(entry_id)
+
+    def prefix(self, key: str) -> Set[int]:
+        node = self.root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return set()
+        return node["ids"]
+
+
+class SearchIndex:
+    """
+    In-process autocomplete over live/upcoming and past IPO names and symbols.
+    Ranking: exact symbol > symbol prefix > name/word prefix > infix > trigram fuzzy.
+    """
+
+    def __init__(self):
+        self.entries: List[Dict] = []
+        self.symbols: List[str] = []
+        self.names: List[str] = []
+        self.position: List[int] = []
+        self.symbol_trie = Trie()
+        self.name_trie = Trie()
+        self.grams: Dict[str, Set[int]] = defaultdict(set)
+        self.built_at = 0.0
+        self.stale = True
+        self._lock = asyncio.Lock()
+
+    def mark_stale(self):
+        self.stale = True
+
+    def build(self, live_docs: List[Dict], past_docs: List[Dict]):
+        entries, symbols, names = [], [], []
+        symbol_trie, name_trie, grams = Trie(), Trie(), defaultdict(set)
+
+        for docs, live in ((live_docs, True), (past_docs, False)):
+            for d in docs:
+                entry_id = len(entries)
+                entries.append({
+                    "id": d.get("ipo_id") or d.get("symbol"),
+                    "name": d.get("company_name"),
+                    "symbol": d.get("symbol"),
+                    "type": d.get("security_type", "Equity"),
+                    "status": d.get("status") if live else "Closed",
+                    "_live": live,
+                })
+                sym = normalize(d.get("symbol")).replace(" ", "")
+                name = normalize(d.get("company_name"))
+                symbols.append(sym)
+                names.append(name)
+
+                if sym:
+                    symbol_trie.insert(sym, entry_id)
+                # Every word start, so "mot" finds "tata motors"
+                words = name.split(" ")
+                for i in range(len(words)):
+                    name_trie.insert(" ".join(words[i:]), entry_id)
+                for g in trigrams(sym) | trigrams(name):
+                    grams[g].add(entry_id)
+
+        # Tie-break order inside a tier: live first, then shorter names
+        position = [0] * len(entries)
+        for pos, i in enumerate(sorted(range(len(entries)), key=lambda i: (not entries[i]["_live"], len(names[i]), names[i]))):
+            position[i] = pos
+
+        self.entries, self.symbols, self.names, self.position = entries, symbols, names, position
+        self.symbol_trie, self.name_trie, self.grams = symbol_trie, name_trie, grams
+        self.built_at = time.monotonic()
+        self.stale = False
+
+    async def ensure_fresh(self):
+        await response_cache.sync_epoch()
+        if not self.stale and time.monotonic() - self.built_at < INDEX_MAX_AGE:
+            return
+        async with self._lock:
+            if not self.stale and time.monotonic() - self.built_at < INDEX_MAX_AGE:
+                return
+            live_docs = await ipo_live_upcoming.find({}, SEARCH_PROJECTION).to_list(None)
+            past_docs = await ipo_past_master.find({}, SEARCH_PROJECTION).to_list(None)
+            self.build(live_docs, past_docs)
+            logging.info(f"[SEARCH] Indexed {len(self.entries)} IPOs")
+
+    def search(self, q: str, limit: int = 10) -> List[Dict]:
+        query = normalize(q)
+        if len(query) < 2:
+            return []
+        compact = query.replace(" ", "")
+
+        # Tiers are filled best-first; a tier only has to be ordered when it
+        # overflows the remaining slots, and later tiers are skipped once full.
+        results: List[int] = []
+        seen: Set[int] = set()
+
+        def take(ids, key=None) -> bool:
+            fresh = [i for i in ids if i not in seen]
+            room = limit - len(results)
+            picked = heapq.nsmallest(room, fresh, key=key or self.position.__getitem__)
+            results.extend(picked)
+            seen.update(picked)
+            return len(results) >= limit
+
+        symbol_hits = self.symbol_trie.prefix(compact)
+        if take(i for i in symbol_hits if self.symbols[i] == compact):
+            return self._render(results)
+        if take(symbol_hits) or take(self.name_trie.prefix(query)):
+            return self._render(results)
+
+        if len(query) < 3:
+            # Two-character queries: infix check is a cheap linear pass
+            take(i for i, (sym, name) in enumerate(zip(self.symbols, self.names))
+                 if query in name or compact in sym)
+            return self._render(results)
+
+        # Infix: every inner trigram must be present, then confirm the substring
+        candidates = self._containing(query) | self._containing(compact)
+        if take(i for i in candidates if query in self.names[i] or compact in self.symbols[i]):
+            return self._render(results)
+
+        # Fuzzy: enough shared padded trigrams, most shared first
+        q_grams = [self.grams.get(g, set()) for g in trigrams(query) - trigrams("")]
+        overlap: Dict[int, int] = defaultdict(int)
+        for ids in q_grams:
+            for i in ids:
+                overlap[i] += 1
+        needed = max(1, int(len(q_grams) * FUZZY_MIN_OVERLAP))
+        take((i for i, c in overlap.items() if c >= needed), key=lambda i: (-overlap[i], self.position[i]))
+        return self._render(results)
+
+    def _containing(self, text: str) -> Set[int]:
+        """Entries holding every inner trigram of `text`, smallest posting list first."""
+        postings = sorted((self.grams.get(g, set()) for g in inner_trigrams(text)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        return set.intersection(*postings)
+
+    def _render(self, ids: List[int]) -> List[Dict]:
+        return [{k: v for k, v in self.entries[i].items() if k != "_live"} for i in ids]
+
+
+search_index = SearchIndex()
+response_cache.add_listener(search_index.mark_stale)
@@ -1,25 +1,50 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import HTTPException
+from fastapi import HTTPException, Query, Response
+from iposhala_test.scripts import mongo_async
+from .metrics import mongo_command_metrics
+
+# Create the async Mongo client before the routes below bind its collections:
+# command monitoring feeds the per-request Mongo counts and timings on /metrics
+mongo_async.get_client(event_listeners=[mongo_command_metrics])
+
 from .routes.ipos import router as ipos_router
 from .routes.company import router as company_router
 from .routes.gmp import router as gmp_router
 from .routes.search import router as search_router
-import requests
+import base64
+import httpx
 from datetime import datetime
+from typing import Optional
 from iposhala_test.api.routes.docs import router as docs_router
 from .routes.analytics import router as analytics_router
-
-# Import Mongo collection
-from iposhala_test.scripts.mongo import ipo_past_master, ipo_live_upcoming, ipo_gmp
-
-app = FastAPI(title="IPOShala Backend API")
-
-nse_headers = {
-    "User-Agent": "Mozilla/5.0",
-    "Accept": "application/json,text/plain,*/*",
-    "Referer": "https://www.nseindia.com/",
-}
+from .routes.export import router as export_router
+from .routes.events import router as events_router
+from .routes.metrics import router as metrics_router
+from .routes.health import router as health_router
+from .routes.jobs import router as jobs_router
+
+# Import Mongo collection (async client: routes never block the event loop)
+from iposhala_test.scripts.mongo_async import ipo_past_master, ipo_live_upcoming, ipo_stats
+from iposhala_test.scripts.ipo_fields import closed_date_source
+from iposhala_test.scripts.ipo_stats import STATS_ID, STATS_PIPELINE, is_fresh, shape_stats
+from .cache import cached
+from .nse_client import nse_client, quote_cache
+from .events import live_events
+from .conditional import ConditionalGetMiddleware
+from .compression import CompressionMiddleware
+from .metrics import MetricsMiddleware
+from .responses import FastJSONResponse, FastJSONRoute
+
+app = FastAPI(title="IPOShala Backend API", default_response_class=FastJSONResponse)
+# orjson rendering for the routes declared in this module too
+app.router.route_class = FastJSONRoute
+
+# ETag / 304 on the JSON read endpoints; added before CORS so 304s get CORS headers too
+app.add_middleware(ConditionalGetMiddleware)
+
+# brotli / gzip for JSON bodies over 1 KB
+app.add_middleware(CompressionMiddleware)
 
 # Allow frontend (Vite / React) to access backend
 app.add_middleware(
@@ -28,117 +53,124 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
+# Outermost: latency covers CORS, compression and 304 short-circuits too
+app.add_middleware(MetricsMiddleware)
+
+CLOSED_SORT = [("closed_at", -1), ("symbol", -1)]
+
+
+def encode_closed_cursor(closed_at: datetime, symbol: str) -> str:
+    raw = f"{closed_at.isoformat()}|{symbol or ''}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_closed_cursor(after: str):
+    try:
+        raw = base64.urlsafe_b64decode(after.encode("ascii")).decode("utf-8")
+        closed_at, symbol = raw.split("|", 1)
+        return datetime.fromisoformat(closed_at), symbol
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/api/ipos/closed")
-def get_closed_ipos(type: str = None):
+async def get_closed_ipos(
+    response: Response,
+    type: str = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    after: Optional[str] = None,
+):
     # type can be 'sme', 'main', or None
-    docs = list(
-        ipo_past_master.find(
-            {},
-            {
-                "_id": 0,
-                "company_name": 1,
-                "symbol": 1,
-                "ipo_id": 1,
-                "security_type": 1,
-                "issue_information.issue_end_date": 1,
-                "issue_information.issue_price": 1,
-                "issue_end_date": 1,
-                "nse_quote.metadata.listingDate": 1,
-                "price_range": 1
-            }
-        )
-    )
-
-    def parse_date(s):
-        if not s or s == "-":
-            return None
-        s = s.strip()
-        for fmt in ("%d-%b-%Y", "%d-%b-%y", "%Y-%m-%d", "%d-%m-%Y", "%B %d, %Y", "%Y-%m-%dT%H:%M:%S"):
-            try:
-                return datetime.strptime(s, fmt)
-            except Exception:
-                continue
-        # Check for ISO format with fractional seconds
-        if "T" in s:
-            try:
-                return datetime.fromisoformat(s)
-            except Exception:
-                pass
-        return None
-
-    today = datetime.today()
+    # closed_at / is_sme are written at ingest time (scripts/ipo_fields.py), so this
+    # is a range scan over the closed_list index rather than a parse of every row.
+    query = {"is_sme": {"$in": [True, False]}, "closed_at": {"$lt": datetime.today()}}
+    if type == 'sme':
+        query["is_sme"] = True
+    elif type == 'main':
+        query["is_sme"] = False
+
+    if after:
+        after_date, after_symbol = decode_closed_cursor(after)
+        query["$or"] = [
+            {"closed_at": {"$lt": after_date}},
+            {"closed_at": after_date, "symbol": {"$lt": after_symbol}},
+        ]
+
+    cursor = ipo_past_master.find(
+        query,
+        {
+            "_id": 0,
+            "company_name": 1,
+            "symbol": 1,
+            "ipo_id": 1,
+            "security_type": 1,
+            "closed_at": 1,
+            "issue_information.issue_end_date": 1,
+            "issue_information.issue_price": 1,
+            "issue_end_date": 1,
+            "nse_quote.metadata.listingDate": 1,
+            "price_range": 1,
+            "confidence_score": 1,
+            "risk_level": 1
+        }
+    ).sort(CLOSED_SORT)
+    if limit:
+        cursor = cursor.limit(limit)
 
     closed = []
-    for d in docs:
+    last = None
+    async for d in cursor:
         info = d.get("issue_information") or {}
-        end_date_str = info.get("issue_end_date") or d.get("issue_end_date")
-        
-        # Look for listingDate from NSE quote metadata if still missing
-        if not end_date_str:
-            metadata = d.get("nse_quote", {}).get("metadata", {})
-            end_date_str = metadata.get("listingDate")
-
-        end_date = parse_date(end_date_str)
-        if end_date and end_date < today:
-            sec_type = d.get("security_type", "Equity")
-            
-            # Apply type filter
-            if type == 'sme' and sec_type != 'SME':
-                continue
-            if type == 'main' and sec_type == 'SME':
-                continue
-                
-            price = info.get("issue_price") or d.get("price_range") or "-"
-            
-            parsed = {
-                "ipo_id": d.get("ipo_id", d.get("symbol")),
-                "company_name": d.get("company_name", d.get("symbol")),
-                "symbol": d.get("symbol"),
-                "security_type": sec_type,
-                "issue_end_date": end_date_str if end_date_str else "-",
-                "issue_price": price,
-                "status": "Closed",
-                "_parsed_date": end_date # For sorting only
-            }
-            closed.append(parsed)
-
-    # sort latest closed first
-    closed.sort(key=lambda x: x.pop("_parsed_date"), reverse=True)
+        end_date_str = closed_date_source(d)
+        price = info.get("issue_price") or d.get("price_range") or "-"
+
+        closed.append({
+            "ipo_id": d.get("ipo_id", d.get("symbol")),
+            "company_name": d.get("company_name", d.get("symbol")),
+            "symbol": d.get("symbol"),
+            "security_type": d.get("security_type", "Equity"),
+            "issue_end_date": end_date_str if end_date_str else "-",
+            "issue_price": price,
+            "status": "Closed",
+            "confidence_score": d.get("confidence_score"),
+            "risk_level": d.get("risk_level"),
+        })
+        last = d
+
+    # Full page -> hand out a keyset cursor for the next one
+    if limit and last is not None and len(closed) == limit:
+        response.headers["X-Next-Cursor"] = encode_closed_cursor(last["closed_at"], last.get("symbol"))
 
     return closed
 
 @app.get("/api/ipos/live")
-def get_live_ipos():
-    docs = list(ipo_live_upcoming.find({"status": "LIVE"}, {"_id": 0}))
+@cached()
+async def get_live_ipos():
+    docs = await ipo_live_upcoming.find({"status": "LIVE"}, {"_id": 0}).to_list(None)
     return docs
 
 @app.get("/api/ipos/upcoming")
-def get_upcoming_ipos():
-    docs = list(ipo_live_upcoming.find({"status": "UPCOMING"}, {"_id": 0}))
+@cached()
+async def get_upcoming_ipos():
+    docs = await ipo_live_upcoming.find({"status": "UPCOMING"}, {"_id": 0}).to_list(None)
     return docs
 
 
 @app.get("/api/ipos/stats")
-def get_ipo_stats():
-    upcoming = ipo_live_upcoming.count_documents({"status": "UPCOMING"})
-    current = ipo_live_upcoming.count_documents({"status": "LIVE"})
-    listed = ipo_past_master.count_documents({})
-    
-    sme_live = ipo_live_upcoming.count_documents({"security_type": "SME"})
-    sme_past = ipo_past_master.count_documents({"security_type": "SME"})
-    sme_total = sme_live + sme_past
-    
-    gmp_count = ipo_gmp.count_documents({})
-    
-    return {
-        "upcoming": upcoming,
-        "current": current,
-        "listed": listed,
-        "sme": sme_total,
-        "gmp": gmp_count
-    }
+@cached()
+async def get_ipo_stats():
+    # Precomputed by the pipelines (scripts/ipo_stats.py) -> zero aggregation round trips
+    snapshot = await ipo_stats.find_one({"_id": STATS_ID})
+    if is_fresh(snapshot):
+        return shape_stats(snapshot)
+
+    # Fallback: single $unionWith/$facet aggregation across all three collections
+    cursor = await ipo_live_upcoming.aggregate(STATS_PIPELINE)
+    rows = await cursor.to_list(None)
+    return shape_stats(rows[0] if rows else None)
 
 app.include_router(ipos_router)
 app.include_router(company_router)
@@ -146,17 +178,28 @@ app.include_router(gmp_router)
 app.include_router(search_router)
 app.include_router(docs_router)
 app.include_router(analytics_router)
+app.include_router(export_router)
+app.include_router(events_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
+app.include_router(jobs_router)
 
 
 
 @app.get("/api/nse/quote/{symbol}")
-def get_nse_quote(symbol: str):
-    session = requests.Session()
+async def get_nse_quote(symbol: str):
+    # Shared NSE session + short-TTL, single-flight quote cache (api/nse_client.py)
+    try:
+        return await quote_cache.get(symbol.upper().strip())
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(status_code=502, detail=f"NSE quote unavailable: {e}")
+
 
-    # warm up to get cookies
-    session.get("https://www.nseindia.com", headers=nse_headers, timeout=10)
+@app.on_event("shutdown")
+async def close_nse_client():
+    await nse_client.close()
 
-    api_url = f"https://www.nseindia.com/api/quote-equity?symbol={symbol.upper()}"
-    res = session.get(api_url, headers=nse_headers, timeout=10)
 
-    return res.json()
\ No newline at end of file
+@app.on_event("shutdown")
+async def close_live_events():
+    await live_events.close()
@@ -0,0 +1,237 @@
+"""
+Load test of the public read routes against a synthetic IPO universe.
+
+Seeds a throwaway database (--db, dropped and rebuilt on every run unless
+--no-seed) with --ipos ipo_past_master documents carrying embedded
+performance_table and nse_company arrays, runs the same post-ingest steps a
+deploy does (indexes, derived fields, sorted sections, price bar migration,
+scores, analytics / stats snapshots), then serves the real API app and drives
+each route at every --concurrency level:
+
+    python -m iposhala_test.benchmarks.bench_api_load --ipos 5000 --concurrency 16 64 256
+
+Point MONGO_URI at a local mongod (e.g. `mongod --dbpath /tmp/bench-db`);
+the routes use the async driver, which an in-memory mock cannot stand in for.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+sys.path.append(os.getcwd())
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Routes under test: name -> builder of the request paths for a seeded universe
+ROUTES = {
+    "closed": lambda u: ["/api/ipos/closed?limit=50", "/api/ipos/closed?type=sme&limit=50", "/api/ipos/closed?type=main&limit=50"],
+    "ipo_detail": lambda u: [f"/api/ipos/{s.lower()}-{u['years'][s]}" for s in u["symbols"]],
+    "search": lambda u: [f"/api/search/?q={q}" for q in u["queries"]],
+    "company_tabs": lambda u: [f"/api/company/{s}/tabs" for s in u["symbols"]],
+    "analytics_overview": lambda u: ["/api/analytics/overview"],
+}
+
+# Seeded collections, dropped before every seed
+SEEDED_COLLECTIONS = ["ipo_past_master", "ipo_price_bars", "ipo_analytics", "ipo_stats", "cache_epoch"]
+
+NAME_WORDS = ["Bharat", "Shree", "Global", "Tech", "Infra", "Agro", "Pharma", "Energy", "Finance", "Steel",
+              "Logistics", "Textiles", "Foods", "Auto", "Green", "Digital", "Capital", "Chemicals", "Power", "Retail"]
+SECTION_SIZES = {
+    "announcements": 60,
+    "corporate_actions": 12,
+    "annual_reports": 6,
+    "brsr_reports": 3,
+    "board_meetings": 20,
+    "event_calendar": 10,
+}
+
+
+# ---------------------------
+# Synthetic universe
+# ---------------------------
+def nse_date(d: datetime) -> str:
+    return d.strftime("%d-%b-%Y")
+
+
+def performance_rows(rng: random.Random, listed: datetime, price: float, days: int) -> list:
+    """Daily OHLCV rows from the listing day, newest first like performance_table."""
+    rows, close, day = [], price * rng.uniform(0.8, 1.6), listed
+    while len(rows) < days:
+        if day.weekday() < 5:
+            open_ = close * rng.uniform(0.97, 1.03)
+            close = max(1.0, open_ * rng.uniform(0.95, 1.05))
+            rows.append({
+                "date": day.strftime("%Y-%m-%d"),
+                "open": round(open_, 2),
+                "high": round(max(open_, close) * rng.uniform(1.0, 1.03), 2),
+                "low": round(min(open_, close) * rng.uniform(0.97, 1.0), 2),
+                "close": round(close, 2),
+                "volume": rng.randint(10_000, 5_000_000),
+            })
+        day += timedelta(days=1)
+    return rows[::-1]
+
+
+def section_payload(rng: random.Random, name: str, symbol: str, listed: datetime) -> dict:
+    items = []
+    for i in range(SECTION_SIZES[name]):
+        when = listed + timedelta(days=rng.randint(0, 900))
+        if name == "announcements":
+            item = {"desc": f"Announcement {i} by {symbol}", "an_dt": when.strftime("%d-%b-%Y %H:%M:%S"),
+                    "attchmntFile": f"https://nsearchives.nseindia.com/corporate/{symbol}_{i}.pdf"}
+        elif name == "corporate_actions":
+            item = {"subject": rng.choice(["Dividend - Rs 1 Per Share", "Bonus 1:1", "Annual General Meeting"]), "exDate": nse_date(when)}
+        elif name == "board_meetings":
+            item = {"bm_purpose": "Financial Results", "bm_date": nse_date(when)}
+        elif name == "event_calendar":
+            item = {"purpose": "Board Meeting", "date": nse_date(when)}
+        else:
+            item = {"symbol": symbol, "fromYr": str(when.year - 1), "toYr": str(when.year),
+                    "fileName": f"https://nsearchives.nseindia.com/annual_reports/{symbol}_{when.year}.pdf", "sort_date": nse_date(when)}
+        items.append(item)
+    return {"available": True, "data": items}
+
+
+def synthetic_ipo(rng: random.Random, i: int, bar_days: int) -> dict:
+    symbol = f"{rng.choice(NAME_WORDS).upper()}{i:05d}"
+    company = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {i} Limited"
+    sme = rng.random() < 0.4
+    end = datetime(2015, 1, 1) + timedelta(days=rng.randint(0, 3900))
+    listed = end + timedelta(days=5)
+    low = rng.randint(10, 900)
+    high = low + rng.randint(1, 40)
+    size = round(rng.uniform(5, 3000), 2)
+    open_price = round(high * rng.uniform(0.7, 2.2), 2)
+
+    return {
+        "ipo_id": f"{symbol.lower()}-{end.year}",
+        "symbol": symbol,
+        "company_name": company,
+        "security_type": "SME" if sme else "Equity",
+        "price_range": f"Rs.{low} to Rs.{high}",
+        "issue_size": f"{size} Cr",
+        "listing_date": nse_date(listed),
+        "issue_information": {
+            "issue_start_date": nse_date(end - timedelta(days=3)),
+            "issue_end_date": nse_date(end),
+            "issue_price": f"Rs.{low} to Rs.{high}",
+            "issue_size": f"{size} Cr",
+        },
+        "nse_quote": {
+            "metadata": {"listingDate": nse_date(listed), "industry": rng.choice(NAME_WORDS)},
+            "price_info": {"open": open_price, "lastPrice": round(open_price * rng.uniform(0.5, 3), 2)},
+            "security_info": {"issuedSize": int(size * 1e5)},
+        },
+        "performance_table": performance_rows(rng, listed, high, bar_days),
+        "nse_company": {
+            **{name: section_payload(rng, name, symbol, listed) for name in SECTION_SIZES},
+            "shareholding_patterns": {"data": [
+                {"date": nse_date(listed + timedelta(days=90 * q)), "promoter": round(rng.uniform(40, 75), 2),
+                 "public": round(rng.uniform(25, 60), 2)}
+                for q in range(8)
+            ]},
+            "financial_results": {"data": [
+                {"period": f"Q{q % 4 + 1} {listed.year + q // 4}", "revenue": round(rng.uniform(10, 5000), 2),
+                 "net_profit": round(rng.uniform(-50, 800), 2)}
+                for q in range(8)
+            ]},
+        },
+        "nse_company_updated_at": datetime.utcnow(),
+    }
+
+
+def seed_universe(count: int, bar_days: int, seed: int, batch_size: int = 500):
+    """Drops the benchmark collections and rebuilds them the way a deploy would."""
+    from iposhala_test.scripts.mongo import get_db, ipo_past_master
+    from iposhala_test.scripts.indexes import ensure_indexes
+    from iposhala_test.scripts.ipo_fields import refresh_derived_fields
+    from iposhala_test.scripts.company_sections import backfill_sorted_sections
+    from iposhala_test.scripts.price_bars import migrate_performance_tables
+    from iposhala_test.scripts.ipo_scoring import refresh_scores
+    from iposhala_test.scripts.ipo_analytics import rebuild_analytics
+    from iposhala_test.scripts.ipo_stats import refresh_stats_snapshot
+
+    db = get_db()
+    for name in SEEDED_COLLECTIONS:
+        db.drop_collection(name)
+    ensure_indexes()
+
+    rng = random.Random(seed)
+    batch = []
+    for i in range(count):
+        batch.append(synthetic_ipo(rng, i, bar_days))
+        if len(batch) >= batch_size:
+            ipo_past_master.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        ipo_past_master.insert_many(batch, ordered=False)
+
+    refresh_derived_fields()
+    backfill_sorted_sections()
+    migrate_performance_tables()
+    refresh_scores()
+    rebuild_analytics()
+    refresh_stats_snapshot()
+
+
+def load_universe(sample: int, seed: int) -> dict:
+    """Symbols / search terms to spread the per-id routes over."""
+    from iposhala_test.scripts.mongo import ipo_past_master
+
+    docs = list(ipo_past_master.find({}, {"_id": 0, "symbol": 1, "company_name": 1, "ipo_id": 1}))
+    if not docs:
+        raise SystemExit("No ipo_past_master documents in the benchmark database; run without --no-seed")
+    picked = random.Random(seed).sample(docs, min(sample, len(docs)))
+    return {
+        "symbols": [d["symbol"] for d in picked],
+        "years": {d["symbol"]: d["ipo_id"].rsplit("-", 1)[-1] for d in picked},
+        # Autocomplete-style prefixes plus a symbol-ish fragment per pick
+        "queries": [d["company_name"].split()[0][:4].lower() for d in picked] + [d["symbol"][:5].lower() for d in picked],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API load test against a seeded synthetic IPO universe")
+    parser.add_argument("--db", default="iposhala_bench", help="Database to seed; dropped and rebuilt, never point at real data")
+    parser.add_argument("--ipos", type=int, default=3000, help="Synthetic ipo_past_master documents")
+    parser.add_argument("--bar-days", type=int, default=250, help="Daily performance_table rows per IPO")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse the database from a previous run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[64])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per route per concurrency level")
+    parser.add_argument("--routes", nargs="+", choices=sorted(ROUTES), default=list(ROUTES))
+    parser.add_argument("--sample", type=int, default=200, help="Distinct symbols cycled through by the per-id routes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8721)
+    args = parser.parse_args()
+
+    # Must be set before anything imports scripts.mongo, which reads DB_NAME once
+    os.environ["DB_NAME"] = args.db
+
+    if not args.no_seed:
+        t0 = time.perf_counter()
+        seed_universe(args.ipos, args.bar_days, args.seed)
+        print(f"Seeded {args.ipos} IPOs into {args.db} in {time.perf_counter() - t0:.1f}s")
+
+    universe = load_universe(args.sample, args.seed)
+    from iposhala_test.api.server import app
+    from iposhala_test.benchmarks.common import BackgroundServer, drive, print_table
+
+    rows = []
+    with BackgroundServer(app, args.port) as srv:
+        for name in args.routes:
+            paths = ROUTES[name](universe)
+            # Warm up pools, caches and the search index before measuring
+            asyncio.run(drive(srv.url, paths, min(min(args.concurrency), 16), max(64, len(paths))))
+            for concurrency in args.concurrency:
+                rows.append(asyncio.run(drive(srv.url, paths, concurrency, args.requests, f"{name} c={concurrency}")))
+
+    print(f"\ndb={args.db} requests={args.requests} concurrency={' '.join(map(str, args.concurrency))}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
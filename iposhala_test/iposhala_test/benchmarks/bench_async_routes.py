@@ -0,0 +1,73 @@
+"""
+Blocking vs non-blocking Mongo access under concurrent load.
+
+Serves the /api/ipos/live query twice - once as a sync `def` route on the
+blocking client (Starlette threadpool, 40 threads by default) and once as an
+`async def` route on the async client - and drives both with the same number
+of concurrent clients against the configured MONGO_URI / DB_NAME.
+
+    python -m iposhala_test.benchmarks.bench_async_routes --concurrency 256 --requests 5000
+
+--rtt-ms adds simulated network latency per query (e.g. a remote Atlas
+cluster), which is where threadpool exhaustion shows up most.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+from fastapi import FastAPI
+
+sys.path.append(os.getcwd())
+from iposhala_test.scripts import mongo, mongo_async
+from iposhala_test.benchmarks.common import BackgroundServer, drive, print_table
+
+
+def build_sync_app(rtt: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/live")
+    def live():
+        if rtt:
+            time.sleep(rtt)
+        return list(mongo.ipo_live_upcoming.find({"status": "LIVE"}, {"_id": 0}))
+
+    return app
+
+
+def build_async_app(rtt: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/live")
+    async def live():
+        if rtt:
+            await asyncio.sleep(rtt)
+        return await mongo_async.ipo_live_upcoming.find({"status": "LIVE"}, {"_id": 0}).to_list(None)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async route throughput")
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="Simulated extra Mongo round trip per query")
+    parser.add_argument("--port", type=int, default=8701)
+    args = parser.parse_args()
+
+    rtt = args.rtt_ms / 1000.0
+    rows = []
+    for offset, (name, app) in enumerate([("sync def + pymongo", build_sync_app(rtt)),
+                                          ("async def + AsyncMongoClient", build_async_app(rtt))]):
+        with BackgroundServer(app, args.port + offset) as srv:
+            # Warm up connections / pools before measuring
+            asyncio.run(drive(srv.url, "/live", min(args.concurrency, 16), 64))
+            rows.append(asyncio.run(drive(srv.url, "/live", args.concurrency, args.requests, name)))
+
+    print(f"\nconcurrency={args.concurrency} requests={args.requests} rtt_ms={args.rtt_ms}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+End-to-end scraping pipeline benchmark on a fixed set of recorded upstream
+responses (scrapers/http_fixtures.py).
+
+Record the fixture set once (needs network and Chrome):
+
+    python -m iposhala_test.benchmarks.bench_pipelines --fixtures /tmp/nse-fixtures --record
+
+then replay it offline as often as needed:
+
+    python -m iposhala_test.benchmarks.bench_pipelines --fixtures /tmp/nse-fixtures --repeat 5
+
+Every run starts from a freshly reset --db (dropped, never point it at real
+data) seeded with the companies in the fixture manifest, runs the pipelines
+in order and reports wall time, upstream requests / page loads and Mongo
+write commands per pipeline. Replay skips the politeness and page-load
+sleeps, so wall time is the pipelines' own work.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import logging
+import statistics
+import importlib
+from datetime import datetime, timezone
+
+from pymongo import monitoring
+
+sys.path.append(os.getcwd())
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.path.join(BASE_DIR, "data", "IPO_Past_Issues_main.m.csv")
+MANIFEST = "manifest.json"
+
+# Run in this order: GMP matching needs the live / past IPOs written before it
+PIPELINES = {
+    "live_ipos": ("iposhala_test.scripts.pipeline_market_data", "fetch_live_ipos", {}),
+    "nse_upcoming": ("iposhala_test.scripts.pipeline_nse_upcoming", "fetch_nse_forthcoming", {}),
+    "gmp": ("iposhala_test.scripts.pipeline_gmp", "fetch_and_store_gmp", {}),
+    "nse_company": ("iposhala_test.scripts.pipeline_market_data", "fetch_all_nse_data", {"force": True}),
+}
+
+# Dropped before every run
+RESET_COLLECTIONS = [
+    "ipo_past_master", "ipo_live_upcoming", "ipo_gmp", "ipo_live_events",
+    "cache_epoch", "ipo_stats", "ipo_analytics",
+]
+
+WRITE_COMMANDS = {"insert", "update", "delete", "findAndModify"}
+
+COLUMNS = ["name", "runs", "errors", "wall_s_median", "wall_s_min", "http", "pages", "misses", "mongo_writes", "docs_written"]
+
+
+class WriteCounter(monitoring.CommandListener):
+    """Mongo write commands and the documents they touched (reply `n`)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.commands = 0
+        self.documents = 0
+
+    def started(self, event):
+        if event.command_name in WRITE_COMMANDS:
+            self.commands += 1
+
+    def succeeded(self, event):
+        if event.command_name in WRITE_COMMANDS:
+            self.documents += event.reply.get("n", 0)
+
+    def failed(self, event):
+        pass
+
+
+# ---------------------------
+# Fixture set
+# ---------------------------
+def pick_companies(symbols, count: int) -> list:
+    """Listed companies from the canonical CSV: the given symbols, else the `count` most recent."""
+    wanted = {s.upper() for s in symbols or []}
+    picked = []
+    with open(CSV_PATH, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            symbol = (row.get("Symbol") or "").strip().upper()
+            if not symbol or (row.get("DATE OF LISTING") or "-").strip() == "-":
+                continue
+            if wanted and symbol not in wanted:
+                continue
+            picked.append({
+                "symbol": symbol,
+                "company_name": row["COMPANY NAME"].strip(),
+                "security_type": (row.get("SECURITY TYPE") or "Equity").strip(),
+            })
+            if not wanted and len(picked) >= count:
+                break
+    return picked
+
+
+def read_manifest(directory: str) -> dict:
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise SystemExit(f"No {MANIFEST} in {directory}; record the fixture set first with --record")
+
+
+def write_manifest(directory: str, companies: list, pipelines: list):
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "pipelines": pipelines,
+            "companies": companies,
+        }, f, indent=2)
+
+
+# ---------------------------
+# Runs
+# ---------------------------
+def reset_database(companies: list):
+    from iposhala_test.scripts.mongo import get_db, ipo_past_master
+    from iposhala_test.scripts.indexes import ensure_indexes
+    from iposhala_test.scrapers.nse_company_dynamic import cookie_pool
+
+    db = get_db()
+    for name in RESET_COLLECTIONS:
+        db.drop_collection(name)
+    ensure_indexes()
+    if companies:
+        ipo_past_master.insert_many([dict(c) for c in companies])
+    # Every run re-does the cookie warmup, so runs issue the same requests
+    cookie_pool.session = None
+
+
+def run_pipeline(name: str, counter: WriteCounter) -> dict:
+    from iposhala_test.scrapers.http_fixtures import fixtures
+
+    module, func, kwargs = PIPELINES[name]
+    pipeline = getattr(importlib.import_module(module), func)
+    fixtures.reset_stats()
+    counter.reset()
+    error = None
+    t0 = time.perf_counter()
+    try:
+        pipeline(**kwargs)
+    except Exception as e:
+        error = e
+        logging.warning(f"[BENCH] {name} failed: {e}")
+    return {
+        "name": name,
+        "wall_s": time.perf_counter() - t0,
+        "error": error is not None,
+        **fixtures.stats,
+        "mongo_writes": counter.commands,
+        "docs_written": counter.documents,
+    }
+
+
+def summarize_runs(name: str, runs: list) -> dict:
+    walls = [r["wall_s"] for r in runs]
+    last = runs[-1]
+    return {
+        "name": name,
+        "runs": len(runs),
+        "errors": sum(r["error"] for r in runs),
+        "wall_s_median": round(statistics.median(walls), 3),
+        "wall_s_min": round(min(walls), 3),
+        # Same fixture set every run, so counts only differ if a run failed part way
+        **{k: last[k] for k in ("http", "pages", "misses", "mongo_writes", "docs_written")},
+    }
+
+
+def print_rows(rows: list):
+    from iposhala_test.benchmarks.common import print_table
+    print_table(rows, COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraping pipelines on recorded upstream fixtures")
+    parser.add_argument("--fixtures", required=True, help="Fixture directory (written by --record)")
+    parser.add_argument("--record", action="store_true", help="Run once against the live sites and (re)record the fixture set first")
+    parser.add_argument("--pipelines", nargs="+", choices=list(PIPELINES), default=list(PIPELINES))
+    parser.add_argument("--symbols", nargs="+", help="Companies for nse_company when recording (default: most recent listings)")
+    parser.add_argument("--companies", type=int, default=5, help="How many recent listings to record when --symbols is not given")
+    parser.add_argument("--repeat", type=int, default=3, help="Replayed runs per pipeline")
+    parser.add_argument("--db", default="iposhala_bench", help="Database the pipelines write to; dropped before every run")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipelines' INFO logging")
+    args = parser.parse_args()
+
+    # Must be set before anything imports scripts.mongo, which reads DB_NAME once
+    os.environ["DB_NAME"] = args.db
+    counter = WriteCounter()
+    monitoring.register(counter)
+    if args.verbose:
+        logging.getLogger().setLevel(logging.INFO)
+
+    from iposhala_test.scrapers.http_fixtures import RECORD, REPLAY, use_fixtures
+
+    pipelines = [p for p in PIPELINES if p in args.pipelines]
+    if args.record:
+        companies = pick_companies(args.symbols, args.companies)
+        reset_database(companies)
+        with use_fixtures(RECORD, args.fixtures):
+            recorded = [run_pipeline(name, counter) for name in pipelines]
+        write_manifest(args.fixtures, companies, pipelines)
+        print(f"Recorded fixtures into {args.fixtures} for {len(companies)} companies")
+        print_rows([summarize_runs(r["name"], [r]) for r in recorded])
+
+    manifest = read_manifest(args.fixtures)
+    runs = {name: [] for name in pipelines}
+    with use_fixtures(REPLAY, args.fixtures):
+        for _ in range(args.repeat):
+            reset_database(manifest["companies"])
+            for name in pipelines:
+                runs[name].append(run_pipeline(name, counter))
+
+    print(f"\nfixtures={args.fixtures} recorded_at={manifest.get('recorded_at')} companies={len(manifest['companies'])} repeat={args.repeat}")
+    print_rows([summarize_runs(name, r) for name, r in runs.items()])
+
+
+if __name__ == "__main__":
+    main()
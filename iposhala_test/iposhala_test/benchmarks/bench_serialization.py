@@ -0,0 +1,120 @@
+"""
+JSON encode time and bytes on the wire for the largest API payloads.
+
+Compares FastAPI's default path (jsonable_encoder + stdlib json) with the
+orjson FastJSONResponse, and raw vs gzip vs brotli body sizes, for:
+  company_full  - the largest ipo_past_master document
+  closed        - every row /api/ipos/closed returns
+  gmp           - the full /api/gmp/ list
+
+    python -m iposhala_test.benchmarks.bench_serialization --repeat 20
+    python -m iposhala_test.benchmarks.bench_serialization --synthetic 3000
+
+Payloads come from the configured MONGO_URI / DB_NAME unless --synthetic is given.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+sys.path.append(os.getcwd())
+from iposhala_test.api.responses import FastJSONResponse
+from iposhala_test.api.compression import brotli, compress
+from iposhala_test.benchmarks.common import print_table
+
+
+def load_payloads():
+    from iposhala_test.scripts import mongo
+
+    largest = next(mongo.ipo_past_master.aggregate([
+        {"$project": {"symbol": 1, "size": {"$bsonSize": "$$ROOT"}}},
+        {"$sort": {"size": -1}},
+        {"$limit": 1},
+    ]), None)
+    company = mongo.ipo_past_master.find_one({"_id": largest["_id"]}, {"_id": 0}) if largest else {}
+    closed = list(mongo.ipo_past_master.find({}, {
+        "_id": 0, "company_name": 1, "symbol": 1, "ipo_id": 1, "security_type": 1,
+        "issue_information.issue_end_date": 1, "issue_information.issue_price": 1,
+    }))
+    gmp = list(mongo.ipo_gmp.find({}, {"_id": 0}))
+    return {"company_full": company, "closed": closed, "gmp": gmp}
+
+
+def synthetic_payloads(rows: int):
+    rnd = random.Random(7)
+    now = datetime(2025, 1, 1)
+
+    def announcement(i):
+        return {"an_dt": (now - timedelta(days=i)).strftime("%d-%b-%Y %H:%M:%S"), "desc": "Board Meeting Outcome " * 8,
+                "attchmntFile": f"https://nsearchives.nseindia.com/corporate/{i}.pdf"}
+
+    company = {
+        "_id": ObjectId(),
+        "symbol": "SYNTH",
+        "company_name": "Synthetic Industries Limited",
+        "closed_at": now,
+        "nse_company": {
+            name: {"available": True, "payload": [announcement(i) for i in range(rows // 3)], "count": rows // 3, "sorted": True}
+            for name in ("announcements", "corporate_actions", "board_meetings", "event_calendar")
+        },
+        "nse_quote": {"price_info": {"open": 101.5, "close": 120.25}, "metadata": {"listingDate": "02-Jan-2024"}},
+    }
+    closed = [{
+        "ipo_id": f"ipo{i}-2024", "company_name": f"Company {i} Limited", "symbol": f"SYM{i}", "security_type": rnd.choice(["Equity", "SME"]),
+        "issue_end_date": (now - timedelta(days=i)).strftime("%d-%b-%Y"), "issue_price": f"Rs.{rnd.randint(10, 900)}", "status": "Closed",
+    } for i in range(rows)]
+    gmp = [{
+        "ipo_id": f"ipo{i}-2024", "companyName": f"Company {i} IPO", "issuePrice": rnd.randint(10, 900), "gmp": rnd.randint(-20, 200),
+        "lastUpdated": now - timedelta(hours=i),
+        "gmp_history": [{"date": (now - timedelta(days=d)).strftime("%Y-%m-%d"), "gmp": rnd.randint(0, 200)} for d in range(10)],
+    } for i in range(rows // 3)]
+    return {"company_full": company, "closed": closed, "gmp": gmp}
+
+
+def time_it(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON encode time and wire size per payload")
+    parser.add_argument("--repeat", type=int, default=10, help="Best-of-N timing")
+    parser.add_argument("--synthetic", type=int, metavar="ROWS", help="Use generated payloads instead of Mongo")
+    args = parser.parse_args()
+
+    payloads = synthetic_payloads(args.synthetic) if args.synthetic else load_payloads()
+    renderer = FastJSONResponse(None)
+
+    rows = []
+    for name, payload in payloads.items():
+        try:
+            stdlib_ms = time_it(lambda: json.dumps(jsonable_encoder(payload, custom_encoder={ObjectId: str})).encode(), args.repeat)
+        except (TypeError, ValueError):
+            stdlib_ms = float("nan")
+        orjson_ms = time_it(lambda: renderer.render(payload), args.repeat)
+        body = renderer.render(payload)
+        rows.append({
+            "name": name,
+            "stdlib_ms": round(stdlib_ms, 2),
+            "orjson_ms": round(orjson_ms, 2),
+            "raw_kb": round(len(body) / 1024, 1),
+            "gzip_kb": round(len(compress(body, "gzip")) / 1024, 1),
+            "br_kb": round(len(compress(body, "br")) / 1024, 1) if brotli else "n/a",
+            "gzip_ms": round(time_it(lambda: compress(body, "gzip"), args.repeat), 2),
+        })
+
+    print_table(rows, ["name", "stdlib_ms", "orjson_ms", "raw_kb", "gzip_kb", "br_kb", "gzip_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+API startup cost: import time of the server module and, optionally, time
+until a freshly started uvicorn answers /health/live.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the median wall time, the slowest imports by cumulative time, and
+whether any of the heavy pipeline stacks (Selenium, BeautifulSoup, pandas,
+...) were pulled into the API process.
+
+    python -m iposhala_test.benchmarks.bench_startup --repeat 5
+    python -m iposhala_test.benchmarks.bench_startup --serve --strict
+
+--strict exits non-zero when a heavy module is imported, for use in CI.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+import httpx
+
+sys.path.append(os.getcwd())
+
+DEFAULT_MODULE = "iposhala_test.api.server"
+
+# Stacks that belong to the pipelines / jobs, never to the API process
+HEAVY_MODULES = ["selenium", "webdriver_manager", "bs4", "yfinance", "nselib", "pandas", "numpy", "pyarrow"]
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """module -> (self_us, cumulative_us) from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            # Header line
+            continue
+        modules[parts[2].strip()] = (self_us, cumulative_us)
+    return modules
+
+
+def run_import(module: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.getcwd(),
+    )
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        tail = "\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:"))[-2000:]
+        raise SystemExit(f"Importing {module} failed:\n{tail}")
+    return elapsed, parse_importtime(proc.stderr)
+
+
+def time_to_live(port: int, timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn until /health/live returns 200."""
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{DEFAULT_MODULE}:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.getcwd(),
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health/live", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            if proc.poll() is not None:
+                raise SystemExit("uvicorn exited before becoming live")
+            time.sleep(0.02)
+        raise SystemExit(f"Server not live after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API import / startup time")
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--serve", action="store_true", help="Also time uvicorn start until /health/live")
+    parser.add_argument("--port", type=int, default=8702)
+    parser.add_argument("--strict", action="store_true", help="Exit 1 if a heavy module is imported")
+    args = parser.parse_args()
+
+    walls: List[float] = []
+    totals: List[int] = []
+    modules = {}
+    for _ in range(args.repeat):
+        wall, modules = run_import(args.module)
+        walls.append(wall)
+        totals.append(modules.get(args.module, (0, 0))[1])
+
+    print(f"{args.module}: wall {statistics.median(walls) * 1000:.0f} ms median over {args.repeat} runs, "
+          f"import {statistics.median(totals) / 1000:.0f} ms cumulative")
+
+    print("\nSlowest imports (cumulative, last run):")
+    ranked = sorted(modules.items(), key=lambda kv: kv[1][1], reverse=True)[:args.top]
+    width = max(len(name) for name, _ in ranked) if ranked else 0
+    for name, (self_us, cumulative_us) in ranked:
+        print(f"  {name.ljust(width)}  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:.1f} ms)")
+
+    loaded = [m for m in HEAVY_MODULES if m in modules]
+    print("\nHeavy modules imported by the API: " + (", ".join(loaded) if loaded else "none"))
+
+    if args.serve:
+        print(f"\nuvicorn start -> /health/live: {time_to_live(args.port) * 1000:.0f} ms")
+
+    if args.strict and loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import time
+import asyncio
+import threading
+from typing import Dict, List, Sequence, Union
+
+import httpx
+import uvicorn
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def summarize(name: str, latencies: List[float], errors: int, elapsed: float) -> Dict:
+    ok = len(latencies)
+    return {
+        "name": name,
+        "requests": ok + errors,
+        "errors": errors,
+        "rps": round(ok / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def print_table(rows: List[Dict], cols: List[str] = None):
+    cols = cols or ["name", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in cols))
+
+
+async def drive(base_url: str, path: Union[str, Sequence[str]], concurrency: int, total: int, name: str = None) -> Dict:
+    """
+    Fires `total` GETs at base_url+path from `concurrency` concurrent clients.
+    `path` may be a list, cycled through in order so requests spread over many ids.
+    """
+    paths = [path] if isinstance(path, str) else list(path)
+    latencies, errors = [], 0
+    remaining = total
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                target = paths[remaining % len(paths)]
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(target)
+                    if r.status_code >= 400:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - t0)
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(name or paths[0], latencies, errors, elapsed)
+
+
+class BackgroundServer:
+    """Runs an ASGI app with uvicorn on a daemon thread for the duration of a benchmark."""
+
+    def __init__(self, app, port: int):
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.url = f"http://127.0.0.1:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
@@ -7,19 +7,17 @@ import logging
 # Add the project root to sys.path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import the FastAPI app from the active server module
-from iposhala_test.api.server import app
-
-# Import pipeline functions
-from iposhala_test.scripts.pipeline_documents import ingest_documents_from_csv
-from iposhala_test.scripts.pipeline_company_info import fetch_and_save_logos, generate_and_save_descriptions, fetch_and_save_shareholding
-from iposhala_test.scripts.pipeline_market_data import fetch_live_ipos, fetch_all_nse_data
-from iposhala_test.scripts.pipeline_historical import run_historical_pipeline
-
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - [%(levelname)s] - %(name)s - %(message)s')
 
 def run_all_pipelines():
     """Run all data extraction pipelines sequentially."""
+    # Imported here so serving the API never loads the scraper stacks;
+    # uvicorn imports the app itself from "iposhala_test.api.server:app"
+    from iposhala_test.scripts.pipeline_documents import ingest_documents_from_csv
+    from iposhala_test.scripts.pipeline_company_info import fetch_and_save_logos, generate_and_save_descriptions, fetch_and_save_shareholding
+    from iposhala_test.scripts.pipeline_market_data import fetch_live_ipos, fetch_all_nse_data
+    from iposhala_test.scripts.pipeline_historical import run_historical_pipeline
+
     print("========================================")
     print("🚀 STARTING MASTER DATA PIPELINE EXECUTION")
     print("========================================")
@@ -71,12 +69,18 @@ def run_all_pipelines():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Iposhala Main Entrypoint - Server and Pipelines")
     parser.add_argument("--run-pipelines", action="store_true", help="Run all data pipelines and exit")
+    parser.add_argument("--ensure-indexes", action="store_true", help="Create the declared MongoDB indexes (idempotent) and exit")
     parser.add_argument("--port", type=int, default=8000, help="Port to run the API server on")
     
     # Parse known args so uvicorn doesn't fail if other arbitrary args are passed
     args, unknown = parser.parse_known_args()
     
-    if args.run_pipelines:
+    if args.ensure_indexes:
+        # Deploy step: every collection / index the API and pipelines query by
+        from iposhala_test.scripts.indexes import ensure_indexes
+        for row in ensure_indexes():
+            print(f"{row['collection']}.{row['index']}: {row['status']}")
+    elif args.run_pipelines:
         run_all_pipelines()
     else:
         # Run the server
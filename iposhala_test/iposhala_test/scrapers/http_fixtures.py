@@ -0,0 +1,292 @@
+"""
+Record / replay layer for the scrapers' upstream traffic (NSE JSON APIs via
+requests, NSE / investorgain pages via Selenium).
+
+    IPOSHALA_HTTP_FIXTURES=record:/tmp/nse-fixtures python -m iposhala_test.scripts.jobs live_ipos
+    IPOSHALA_HTTP_FIXTURES=replay:/tmp/nse-fixtures python -m iposhala_test.scripts.jobs live_ipos
+
+Recording runs against the real sites and stores every response / rendered
+page as one JSON file per (method, url). Replaying serves them back without
+network or Chrome, skips the politeness / page-load sleeps and raises
+FixtureMiss for anything that was not recorded. Pipelines opt in by creating
+their sessions with fixture_session() and drivers with fixture_driver().
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+FIXTURES_ENV = "IPOSHALA_HTTP_FIXTURES"
+RECORD, REPLAY = "record", "replay"
+
+
+class FixtureMiss(requests.ConnectionError):
+    """A replayed request / page that is not in the fixture set."""
+
+
+class FixtureStore:
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.directory: Optional[str] = None
+        self.stats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def configure(self, mode: Optional[str], directory: Optional[str] = None):
+        if mode not in (None, RECORD, REPLAY):
+            raise ValueError(f"Unknown fixture mode: {mode}")
+        if mode and not directory:
+            raise ValueError("A fixture directory is required")
+        self.mode, self.directory = mode, directory
+        if mode == RECORD:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def reset_stats(self):
+        self.stats = {"http": 0, "pages": 0, "misses": 0}
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def path(self, kind: str, method: str, url: str) -> str:
+        digest = hashlib.sha1(f"{method.upper()} {url}".encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, f"{kind}-{digest}.json")
+
+    def load(self, kind: str, method: str, url: str) -> dict:
+        try:
+            with open(self.path(kind, method, url), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            self.count("misses")
+            raise FixtureMiss(f"No recorded {kind} for {method.upper()} {url} in {self.directory}")
+
+    def save(self, kind: str, method: str, url: str, entry: dict):
+        entry = {"kind": kind, "method": method.upper(), "url": url, "recorded_at": time.time(), **entry}
+        with open(self.path(kind, method, url), "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+
+
+fixtures = FixtureStore()
+
+_env = os.getenv(FIXTURES_ENV)
+if _env:
+    _mode, _, _dir = _env.partition(":")
+    fixtures.configure(_mode, _dir)
+
+
+@contextmanager
+def use_fixtures(mode: Optional[str], directory: Optional[str] = None):
+    """Temporarily switch the process into record / replay mode."""
+    previous = (fixtures.mode, fixtures.directory)
+    fixtures.configure(mode, directory)
+    try:
+        yield fixtures
+    finally:
+        fixtures.configure(*previous)
+
+
+def upstream_pause(seconds: float):
+    """Politeness / page-render wait between upstream calls; skipped when replaying."""
+    if not fixtures.replaying:
+        time.sleep(seconds)
+
+
+# ---------------------------
+# requests
+# ---------------------------
+class FixtureAdapter(HTTPAdapter):
+    """Transport adapter that records real responses or serves recorded ones."""
+
+    def send(self, request, **kwargs):
+        fixtures.count("http")
+        if fixtures.replaying:
+            return self.replayed_response(request, fixtures.load("http", request.method, request.url))
+
+        response = super().send(request, **kwargs)
+        if fixtures.mode == RECORD:
+            fixtures.save("http", request.method, request.url, {
+                "status_code": response.status_code,
+                "reason": response.reason,
+                "headers": {"content-type": response.headers.get("content-type", "")},
+                "body": response.content.decode(response.encoding or "utf-8", errors="replace"),
+            })
+        return response
+
+    @staticmethod
+    def replayed_response(request, entry: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.reason = entry.get("reason")
+        response.headers = CaseInsensitiveDict(entry.get("headers") or {})
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def fixture_session() -> requests.Session:
+    """requests.Session that goes through the fixture layer when it is active."""
+    session = requests.Session()
+    if fixtures.active:
+        adapter = FixtureAdapter()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
+
+# ---------------------------
+# Selenium
+# ---------------------------
+def find_nodes(node, by: str, value: str) -> list:
+    """The locator subset the scrapers use, evaluated on recorded HTML."""
+    if by == "tag name":
+        return node.find_all(value)
+    if by == "id":
+        return node.find_all(id=value)
+    if by == "css selector":
+        return node.select(value)
+    if by == "xpath":
+        # //tag[contains(text(), 'a') or contains(text(), 'b')]
+        tag = re.match(r"//([\w*]+)", value)
+        texts = re.findall(r"contains\(text\(\),\s*'([^']*)'\)", value)
+        name = tag.group(1) if tag and tag.group(1) != "*" else True
+        # text() is the node's first own text node, not its descendants' text
+        return [n for n in node.find_all(name)
+                if not texts or any(t in (n.find(string=True, recursive=False) or "") for t in texts)]
+    raise ValueError(f"Locator not supported on replayed pages: {by}={value}")
+
+
+class FixtureElement:
+    """Read-only WebElement stand-in over a recorded page node."""
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def text(self) -> str:
+        return self.node.get_text(" ", strip=True)
+
+    def get_attribute(self, name: str):
+        value = self.node.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+    def find_elements(self, by: str, value: str) -> list:
+        return [FixtureElement(n) for n in find_nodes(self.node, by, value)]
+
+    def find_element(self, by: str, value: str) -> "FixtureElement":
+        from selenium.common.exceptions import NoSuchElementException
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(f"{by}={value} not in recorded page")
+        return found[0]
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def click(self):
+        # Recorded pages are snapshots taken after the interaction
+        pass
+
+
+class ReplayDriver(FixtureElement):
+    """Chrome-less driver serving pages captured by RecordingDriver."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.current_url = None
+        self.entry = {}
+
+    def get(self, url: str):
+        from bs4 import BeautifulSoup
+        fixtures.count("pages")
+        self.entry = fixtures.load("page", "GET", url)
+        self.current_url = url
+        self.node = BeautifulSoup(self.entry["page_source"], "html.parser")
+
+    @property
+    def page_source(self) -> str:
+        return self.entry.get("page_source", "")
+
+    def get_cookies(self) -> list:
+        return self.entry.get("cookies", [])
+
+    def execute_cdp_cmd(self, *args, **kwargs):
+        return {}
+
+    def execute_script(self, *args, **kwargs):
+        return None
+
+    def quit(self):
+        pass
+
+
+class RecordingDriver:
+    """
+    Wraps a real driver and snapshots the rendered page (and cookies) of the
+    last loaded URL whenever it is read, so the stored page is the state the
+    scraper actually parsed.
+    """
+
+    def __init__(self, driver):
+        self._driver = driver
+        self._url = None
+
+    def get(self, url: str):
+        fixtures.count("pages")
+        self._driver.get(url)
+        self._url = url
+
+    def _snapshot(self) -> dict:
+        entry = {"page_source": self._driver.page_source, "cookies": self._driver.get_cookies()}
+        if self._url:
+            fixtures.save("page", "GET", self._url, entry)
+        return entry
+
+    @property
+    def page_source(self) -> str:
+        return self._snapshot()["page_source"]
+
+    def get_cookies(self) -> list:
+        return self._snapshot()["cookies"]
+
+    def find_element(self, by, value):
+        self._snapshot()
+        return self._driver.find_element(by, value)
+
+    def find_elements(self, by, value):
+        self._snapshot()
+        return self._driver.find_elements(by, value)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+def fixture_driver(make_driver: Callable):
+    """
+    Driver for a scraper: the real one from make_driver(), wrapped for
+    recording, or a ReplayDriver (make_driver is never called, so no Chrome).
+    """
+    if fixtures.replaying:
+        return ReplayDriver()
+    driver = make_driver()
+    return RecordingDriver(driver) if fixtures.mode == RECORD else driver
@@ -5,6 +5,11 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+try:
+    from iposhala_test.scrapers.http_fixtures import fixture_driver, fixture_session, upstream_pause
+except ImportError:
+    from scrapers.http_fixtures import fixture_driver, fixture_session, upstream_pause
+
 
 NSE_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -36,10 +41,11 @@ def get_driver(headless=True):
         "Chrome/121.0.0.0 Safari/537.36"
     )
 
-    return webdriver.Chrome(
+    # Real Chrome, or a recorded / replayed page source (scrapers/http_fixtures.py)
+    return fixture_driver(lambda: webdriver.Chrome(
         service=Service(ChromeDriverManager().install()),
         options=options
-    )
+    ))
 
 
 # ------------------------------------------------------------
@@ -57,12 +63,12 @@ class NSECookiesSession:
         try:
             url = f"https://www.nseindia.com/get-quotes/equity?symbol={self.warmup_symbol}"
             driver.get(url)
-            time.sleep(4)
+            upstream_pause(4)
 
             cookies = driver.get_cookies()
             cookie_dict = {c["name"]: c["value"] for c in cookies}
 
-            s = requests.Session()
+            s = fixture_session()
             for k, v in cookie_dict.items():
                 s.cookies.set(k, v)
 
@@ -0,0 +1,26 @@
+import logging
+from datetime import datetime, timezone
+
+try:
+    from iposhala_test.scripts.mongo import cache_epoch
+except ImportError:
+    # Handle if run from inside scripts directory
+    from mongo import cache_epoch
+
+EPOCH_ID = "global"
+
+
+def bump_cache_epoch(source: str):
+    """
+    Signals the API that pipeline data changed. Each API process polls this
+    document and drops its response cache when the epoch moves.
+    """
+    try:
+        cache_epoch.update_one(
+            {"_id": EPOCH_ID},
+            {"$inc": {"epoch": 1}, "$set": {"source": source, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+    except Exception as e:
+        # Never fail a pipeline run over cache invalidation; the TTL still applies
+        logging.warning(f"[CACHE] Failed to bump cache epoch from {source}: {e}")
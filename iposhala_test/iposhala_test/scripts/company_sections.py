@@ -0,0 +1,136 @@
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+try:
+    from iposhala_test.scripts.mongo import ipo_past_master
+    from iposhala_test.scripts.ipo_fields import parse_ipo_date
+    from iposhala_test.scripts.cache_epoch import bump_cache_epoch
+except ImportError:
+    # Handle if run from inside scripts directory
+    from mongo import ipo_past_master
+    from ipo_fields import parse_ipo_date
+    from cache_epoch import bump_cache_epoch
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Which item fields carry the date each nse_company section is ordered by (first non-empty wins)
+SECTION_SORT_KEYS = {
+    "announcements": ["sort_date", "an_dt", "dt"],
+    "corporate_actions": ["exDate", "recordDate", "date"],
+    "annual_reports": ["sort_date", "an_dt", "dt"],
+    "brsr_reports": ["sort_date", "an_dt", "dt"],
+    "board_meetings": ["meetingDate", "bm_date", "date", "sort_date"],
+    "event_calendar": ["date", "sort_date"],
+}
+
+# NSE timestamps on top of the plain dates parse_ipo_date knows
+TIMESTAMP_FORMATS = ("%d-%b-%Y %H:%M:%S", "%d-%b-%Y %H:%M", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y", "%d-%m-%Y %H:%M:%S")
+
+
+def parse_item_date(value):
+    parsed = parse_ipo_date(value)
+    if parsed:
+        return parsed
+    s = str(value).strip()
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def item_sort_key(item: dict, keys) -> str:
+    """
+    ISO timestamp so string order is chronological. Unparseable dates sort
+    below every real date, and items without any date sort last.
+    """
+    for k in keys:
+        val = item.get(k) if isinstance(item, dict) else None
+        if val:
+            parsed = parse_item_date(val)
+            return parsed.isoformat() if parsed else f"0 {val}"
+    return ""
+
+
+def section_items(section) -> list:
+    """Items of a section in any of the historical storage formats."""
+    if not section:
+        return []
+    if isinstance(section, dict):
+        if "payload" in section:
+            return section.get("payload") or []
+        if "data" in section:
+            return section.get("data") or []
+    return section if isinstance(section, list) else []
+
+
+def normalize_section(section, name: str, symbol: str = None) -> dict:
+    """
+    Canonical stored form: payload sorted newest first plus a `count`, so
+    readers can $slice a page instead of loading it all. Items are stored as
+    NSE sent them; the sort keys never leave this function.
+    """
+    keys = SECTION_SORT_KEYS[name]
+    # Sections written before sort keys stopped being stored carry a stale `sort_key`
+    items = [{k: v for k, v in x.items() if k != "sort_key"} for x in section_items(section) if isinstance(x, dict)]
+    if name == "brsr_reports" and symbol:
+        items = [x for x in items if str(x.get("symbol", "")).upper().strip() == symbol.upper().strip()]
+    items.sort(key=lambda x: item_sort_key(x, keys), reverse=True)
+
+    available = section.get("available", section.get("__available__")) if isinstance(section, dict) else None
+    return {
+        "available": bool(items) if available is None else bool(available),
+        "payload": items,
+        "source_url": section.get("source_url") if isinstance(section, dict) else None,
+        "count": len(items),
+        "sorted": True,
+    }
+
+
+def needs_normalizing(section) -> bool:
+    if not (isinstance(section, dict) and section.get("sorted")):
+        return True
+    return any(isinstance(x, dict) and "sort_key" in x for x in section.get("payload") or [])
+
+
+def backfill_sorted_sections(symbol: str = None):
+    """Rewrites existing nse_company sections into the sorted form (and drops stored sort keys)."""
+    query = {"nse_company": {"$exists": True}}
+    if symbol: query["symbol"] = symbol.upper().strip()
+    projection = {"symbol": 1, **{f"nse_company.{name}": 1 for name in SECTION_SORT_KEYS}}
+
+    count = 0
+    for doc in ipo_past_master.find(query, projection):
+        nse = doc.get("nse_company") or {}
+        updates = {
+            f"nse_company.{name}": normalize_section(nse[name], name, doc.get("symbol"))
+            for name in SECTION_SORT_KEYS
+            if name in nse and needs_normalizing(nse[name])
+        }
+        if updates:
+            ipo_past_master.update_one({"_id": doc["_id"]}, {"$set": updates})
+            count += 1
+    logging.info(f"[SECTIONS] Sorted sections for {count} companies")
+    if count:
+        bump_cache_epoch("company_sections")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-sort nse_company sections for paged reads")
+    parser.add_argument("--backfill", action="store_true", help="Sort all stored sections")
+    parser.add_argument("--symbol", type=str, help="Only this symbol")
+    args = parser.parse_args()
+
+    if args.backfill: backfill_sorted_sections(args.symbol)
+    else: parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
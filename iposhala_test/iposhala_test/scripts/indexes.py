@@ -0,0 +1,239 @@
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+try:
+    from iposhala_test.scripts import mongo
+except ImportError:
+    # Handle if run from inside scripts directory
+    import mongo
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# ---------------------------
+# Collections created with options (everything else is created on first write)
+# ---------------------------
+# One document per symbol per trading day; `ts` is the date at midnight UTC
+PRICE_BARS_TIMESERIES = {"timeField": "ts", "metaField": "symbol", "granularity": "hours"}
+
+# Capped: old events fall off on their own, and clients that were away longer
+# than the cap simply resync from /api/ipos/live and /api/gmp/
+LIVE_EVENTS_CAP_BYTES = 16 * 1024 * 1024
+
+COLLECTION_OPTIONS = {
+    "ipo_price_bars": {"timeseries": PRICE_BARS_TIMESERIES},
+    "ipo_live_events": {"capped": True, "size": LIVE_EVENTS_CAP_BYTES},
+}
+
+# ---------------------------
+# Declared indexes, per collection, with the query shapes they serve.
+# Names are fixed so re-running is a no-op and reports line up with the code.
+# ---------------------------
+INDEXES: Dict[str, List[dict]] = {
+    "ipo_past_master": [
+        {"name": "symbol", "keys": [("symbol", ASCENDING)],
+         "serves": "company / docs / detail lookups by symbol, batch $in, every pipeline upsert"},
+        {"name": "ipo_id", "keys": [("ipo_id", ASCENDING)],
+         "serves": "GET /api/ipos/{identifier} and /api/ipos/batch by ipo_id, live -> past migration"},
+        {"name": "closed_list", "keys": [("is_sme", ASCENDING), ("closed_at", DESCENDING), ("symbol", DESCENDING)],
+         "serves": "/api/ipos/closed: equality on is_sme, then a range/sort on closed_at"},
+        {"name": "security_type", "keys": [("security_type", ASCENDING)],
+         "serves": "stats counts by security_type"},
+        {"name": "nse_company_updated_at", "keys": [("nse_company_updated_at", ASCENDING)],
+         "serves": "fetch_all_nse_data stale / missing candidates"},
+        {"name": "performance_updated_at", "keys": [("performance_updated_at", ASCENDING)],
+         "serves": "run_historical_pipeline candidates ($exists: false matches the null key)"},
+        {"name": "logo_url", "keys": [("logo_url", ASCENDING)],
+         "serves": "fetch_and_save_logos candidates (missing / null logo_url)"},
+        # Not the description text itself: a B-tree over long generated prose only to find
+        # the missing ones. A partial index cannot express "missing", so a flag is indexed.
+        {"name": "has_description", "keys": [("has_description", ASCENDING)],
+         "serves": "generate_and_save_descriptions candidates (has_description $ne true)"},
+        {"name": "website", "keys": [("website", ASCENDING)],
+         "serves": "pipeline_financials companies with a website"},
+        # performance_table is no longer stored (see price_bars.py); the one-off
+        # --migrate scan does not justify an index on a large array field.
+    ],
+    "ipo_live_upcoming": [
+        {"name": "ipo_id", "keys": [("ipo_id", ASCENDING)],
+         "serves": "detail lookups by ipo_id, fetch_live_ipos upserts"},
+        {"name": "symbol", "keys": [("symbol", ASCENDING)],
+         "serves": "detail / docs lookups by symbol, fetch_nse_forthcoming upserts"},
+        {"name": "status_security_type", "keys": [("status", ASCENDING), ("security_type", ASCENDING)],
+         "serves": "/api/ipos/live and /upcoming by status, stats grouping"},
+    ],
+    "ipo_gmp": [
+        {"name": "ipo_id", "keys": [("ipo_id", ASCENDING)],
+         "serves": "fetch_and_store_gmp upserts by ipo_id"},
+        {"name": "last_updated", "keys": [("lastUpdated", DESCENDING)],
+         "serves": "/api/gmp/ sorted by lastUpdated"},
+    ],
+    "ipo_past_issue_info": [
+        {"name": "symbol", "keys": [("symbol", ASCENDING)],
+         "serves": "pipeline_documents upserts by symbol"},
+    ],
+    "ipo_price_bars": [
+        {"name": "symbol_ts", "keys": [("symbol", ASCENDING), ("ts", DESCENDING)],
+         "serves": "/api/company/{symbol}/historical range reads"},
+    ],
+    "ipo_live_events": [
+        {"name": "seq", "keys": [("seq", ASCENDING)],
+         "serves": "/api/events/live tailing and Last-Event-ID replay"},
+    ],
+    "pipeline_jobs": [
+        {"name": "active_key", "keys": [("active_key", ASCENDING)], "options": {"unique": True, "sparse": True},
+         "serves": "one queued / running job per name: concurrent triggers dedupe on insert"},
+        {"name": "status_created_at", "keys": [("status", ASCENDING), ("created_at", ASCENDING)],
+         "serves": "worker claims the oldest queued job, stale running jobs are expired"},
+    ],
+}
+
+
+def normalize_keys(keys) -> List[tuple]:
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in keys]
+
+
+def ensure_collection(name: str) -> str:
+    """Creates a collection that needs creation options; returns what happened."""
+    options = COLLECTION_OPTIONS.get(name)
+    if not options or name in mongo.db.list_collection_names():
+        return "exists"
+    try:
+        mongo.db.create_collection(name, **options)
+        return "created"
+    except (CollectionInvalid, OperationFailure) as e:
+        # e.g. time-series before MongoDB 5.0: a regular collection works with the same indexes
+        logging.warning(f"[INDEXES] Could not create {name} with {options}, using a regular collection: {e}")
+        return "fallback"
+
+
+def ensure_indexes(collections: Optional[List[str]] = None, dry_run: bool = False) -> List[dict]:
+    """
+    Brings the declared indexes into existence. Idempotent: an index that is
+    already there (by name, or the same keys under another name) is left alone;
+    a name clash with different keys is reported, never dropped.
+    """
+    results = []
+    for coll_name in collections or list(INDEXES):
+        if not dry_run:
+            ensure_collection(coll_name)
+        coll = mongo.db[coll_name]
+        existing = coll.index_information()
+        by_keys = {tuple(normalize_keys(info["key"])): name for name, info in existing.items()}
+
+        for spec in INDEXES.get(coll_name, []):
+            keys = normalize_keys(spec["keys"])
+            row = {"collection": coll_name, "index": spec["name"]}
+            if spec["name"] in existing:
+                same = normalize_keys(existing[spec["name"]]["key"]) == keys
+                row["status"] = "ok" if same else "conflict"
+            elif tuple(keys) in by_keys:
+                row["status"] = f"ok (as {by_keys[tuple(keys)]})"
+            elif dry_run:
+                row["status"] = "missing"
+            else:
+                try:
+                    coll.create_index(keys, name=spec["name"], **spec.get("options", {}))
+                    row["status"] = "created"
+                except OperationFailure as e:
+                    row["status"] = f"error: {e}"
+            results.append(row)
+    return results
+
+
+def index_usage(coll_name: str) -> Dict[str, dict]:
+    """$indexStats per index name: ops since the server (or index) started counting."""
+    usage = {}
+    for row in mongo.db[coll_name].aggregate([{"$indexStats": {}}]):
+        usage[row["name"]] = {"ops": row.get("accesses", {}).get("ops", 0), "since": row.get("accesses", {}).get("since")}
+    return usage
+
+
+def index_report(collections: Optional[List[str]] = None) -> List[dict]:
+    """
+    Declared vs present indexes with usage: "missing" (declared, not built),
+    "unused" (built, no ops since `since`), "undeclared" (built, not in INDEXES).
+    Usage counters reset on mongod restart, so read "unused" against `since`.
+    """
+    rows = []
+    for coll_name in collections or list(INDEXES):
+        declared = {spec["name"]: spec for spec in INDEXES.get(coll_name, [])}
+        present = mongo.db[coll_name].index_information()
+        # A declared index built earlier under another name (e.g. pymongo's
+        # default "status_1_security_type_1") counts as present
+        by_keys = {tuple(normalize_keys(info["key"])): name for name, info in present.items()}
+        for name, spec in declared.items():
+            alias = by_keys.get(tuple(normalize_keys(spec["keys"])))
+            if name not in present and alias:
+                present[name] = present.pop(alias)
+                spec = declared[name] = {**spec, "built_as": alias}
+        try:
+            usage = index_usage(coll_name)
+        except (OperationFailure, NotImplementedError) as e:
+            logging.warning(f"[INDEXES] $indexStats unavailable for {coll_name}: {e}")
+            usage = {}
+
+        for name in sorted(set(declared) | set(present)):
+            if name == "_id_":
+                continue
+            built_as = declared.get(name, {}).get("built_as")
+            stats = usage.get(built_as or name, {})
+            if name not in present:
+                status = "missing"
+            elif name not in declared:
+                status = "undeclared"
+            elif usage and not stats.get("ops"):
+                status = "unused"
+            else:
+                status = "ok"
+            rows.append({
+                "collection": coll_name,
+                "index": f"{name} (as {built_as})" if built_as else name,
+                "status": status,
+                "ops": stats.get("ops", ""),
+                "since": stats["since"].strftime("%Y-%m-%d %H:%M") if isinstance(stats.get("since"), datetime) else "",
+                "serves": declared.get(name, {}).get("serves", ""),
+            })
+    return rows
+
+
+def print_rows(rows: List[dict], cols: List[str]):
+    if not rows:
+        print("(nothing)")
+        return
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Declared MongoDB indexes: apply and report")
+    parser.add_argument("--apply", action="store_true", help="Create missing collections / indexes (idempotent)")
+    parser.add_argument("--dry-run", action="store_true", help="With --apply: only show what would be created")
+    parser.add_argument("--report", action="store_true", help="Missing / unused / undeclared indexes via $indexStats")
+    parser.add_argument("--collection", action="append", choices=sorted(INDEXES), help="Limit to this collection (repeatable)")
+    args = parser.parse_args()
+
+    if args.apply:
+        rows = ensure_indexes(args.collection, dry_run=args.dry_run)
+        print_rows(rows, ["collection", "index", "status"])
+        created = sum(1 for r in rows if r["status"] == "created")
+        logging.info(f"[INDEXES] {created} created, {len(rows) - created} already present or skipped")
+    if args.report:
+        print_rows(index_report(args.collection), ["collection", "index", "status", "ops", "since", "serves"])
+
+    if not (args.apply or args.report):
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
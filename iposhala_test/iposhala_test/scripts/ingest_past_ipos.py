@@ -3,6 +3,11 @@ print(">>> RUNNING ingest_past_ipos.py <<<")
 import csv
 from datetime import datetime
 from mongo import ipo_past_master
+from ipo_fields import refresh_derived_fields
+from ipo_analytics import rebuild_analytics
+from ipo_scoring import refresh_scores
+from ipo_stats import refresh_stats_snapshot
+from cache_epoch import bump_cache_epoch
 
 CSV_PATH = "data/IPO_Past_Issues_main.m.csv"
 
@@ -76,3 +81,10 @@ with open(CSV_PATH, newline="", encoding="utf-8") as f:
 
         except Exception as e:
             print(f"[ERROR] Failed for symbol {row.get('Symbol')}: {e}")
+
+# Derived closed_at / is_sme / metrics need the merged document, not just this row
+refresh_derived_fields()
+rebuild_analytics()
+refresh_scores()
+refresh_stats_snapshot()
+bump_cache_epoch("ingest_past_ipos")
@@ -0,0 +1,145 @@
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime, timezone
+
+from pymongo import DeleteMany, ReplaceOne
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+try:
+    from iposhala_test.scripts.mongo import ipo_past_master, ipo_analytics
+    from iposhala_test.scripts.cache_epoch import bump_cache_epoch
+except ImportError:
+    # Handle if run from inside scripts directory
+    from mongo import ipo_past_master, ipo_analytics
+    from cache_epoch import bump_cache_epoch
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TOTALS_ID = "totals"
+
+_GAIN = {"$ifNull": ["$metrics.listing_gain_pct", 0]}
+_POSITIVE = {"$cond": [{"$gt": [_GAIN, 0]}, 1, 0]}
+
+# Rolls the per-IPO `metrics` written by scripts/ipo_fields.py up into totals and
+# per-year buckets. Only touches a few scalar fields per document.
+ROLLUP_PIPELINE = [
+    {"$facet": {
+        "totals": [
+            {"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "sme": {"$sum": {"$cond": [{"$eq": ["$is_sme", True]}, 1, 0]}},
+                "gains": {"$sum": _GAIN},
+                "positive": {"$sum": _POSITIVE},
+            }},
+        ],
+        "yearly": [
+            {"$match": {"metrics.listing_year": {"$ne": None}}},
+            {"$group": {
+                "_id": "$metrics.listing_year",
+                "total": {"$sum": 1},
+                "gains": {"$sum": _GAIN},
+                "positive": {"$sum": _POSITIVE},
+            }},
+            {"$sort": {"_id": 1}},
+        ],
+    }},
+]
+
+
+def rollup_docs(rollup: dict) -> list:
+    """ipo_analytics documents for one ROLLUP_PIPELINE result."""
+    totals = (rollup.get("totals") or [{}])[0]
+    now = datetime.now(timezone.utc)
+    docs = [{
+        "_id": TOTALS_ID,
+        "type": "totals",
+        "total": totals.get("total", 0),
+        "sme": totals.get("sme", 0),
+        "gains": totals.get("gains", 0),
+        "positive": totals.get("positive", 0),
+        "computed_at": now,
+    }]
+    for row in rollup.get("yearly") or []:
+        docs.append({
+            "_id": f"year-{row['_id']}",
+            "type": "year",
+            "year": row["_id"],
+            "total": row["total"],
+            "gains": row["gains"],
+            "positive": row["positive"],
+            "computed_at": now,
+        })
+    return docs
+
+
+def format_overview(docs: list) -> dict:
+    """Response body of /api/analytics/overview from the ipo_analytics documents."""
+    totals = next((d for d in docs if d.get("type") == "totals"), None)
+    total_ipos = (totals or {}).get("total", 0)
+    if total_ipos == 0:
+        return {"msg": "No data"}
+
+    # Format Yearly Stats for Charts
+    formatted_yearly = []
+    for data in sorted((d for d in docs if d.get("type") == "year"), key=lambda d: d["year"]):
+        formatted_yearly.append({
+            "year": data["year"],
+            "ipos": data["total"],
+            "avg_gain": round(data["gains"] / data["total"], 2) if data["total"] > 0 else 0,
+            "win_rate": round((data["positive"] / data["total"]) * 100, 1) if data["total"] > 0 else 0
+        })
+
+    return {
+        "metrics": {
+            "total_listed": total_ipos,
+            "sme_count": totals["sme"],
+            "mainboard_count": total_ipos - totals["sme"],
+            "avg_listing_gain": round(totals["gains"] / total_ipos, 2),
+            "win_rate": round((totals["positive"] / total_ipos) * 100, 1)
+        },
+        "yearly": formatted_yearly
+    }
+
+
+def rollup_writes(docs: list) -> list:
+    """One bulk_write replacing every rollup and dropping years that no longer have IPOs."""
+    ops = [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs]
+    ops.append(DeleteMany({"_id": {"$nin": [d["_id"] for d in docs]}}))
+    return ops
+
+
+def rebuild_analytics():
+    """
+    Recomputes the ipo_analytics rollups; call after writing to ipo_past_master.
+    Failures are logged and re-raised so the calling pipeline / job fails
+    instead of leaving stale rollups behind unnoticed.
+    """
+    try:
+        rows = list(ipo_past_master.aggregate(ROLLUP_PIPELINE))
+        docs = rollup_docs(rows[0] if rows else {})
+        # Ordered: the delete only runs once every replace has succeeded
+        ipo_analytics.bulk_write(rollup_writes(docs), ordered=True)
+    except Exception as e:
+        logging.error(f"[ANALYTICS] Failed to rebuild rollups: {e}")
+        raise
+    logging.info(f"[ANALYTICS] Rebuilt {len(docs) - 1} yearly rollups")
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialized IPO analytics")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute ipo_analytics from per-IPO metrics")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_analytics()
+        bump_cache_epoch("ipo_analytics")
+    else: parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import io
+import os
+import sys
+import csv
+import json
+import argparse
+import logging
+import importlib.util
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from bson import ObjectId
+
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+try:
+    from iposhala_test.scripts.mongo import ipo_past_master, ipo_live_upcoming
+except ImportError:
+    # Handle if run from inside scripts directory
+    from mongo import ipo_past_master, ipo_live_upcoming
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FORMATS = ("ndjson", "csv", "parquet")
+
+# Export name -> collection name; "all" walks them in this order
+EXPORT_COLLECTIONS = {
+    "past": "ipo_past_master",
+    "live": "ipo_live_upcoming",
+}
+
+# Flattened columns for CSV / Parquet when none are requested
+DEFAULT_COLUMNS = [
+    "ipo_id",
+    "symbol",
+    "company_name",
+    "security_type",
+    "status",
+    "issue_start_date",
+    "issue_end_date",
+    "listing_date",
+    "price_range",
+    "issue_price",
+    "issue_size",
+    "closed_at",
+    "is_sme",
+    "metrics.issue_price_upper",
+    "metrics.open_price",
+    "metrics.listing_gain_pct",
+    "metrics.listing_year",
+    "subscription.qib",
+    "subscription.hni",
+    "subscription.retail",
+    "confidence_score",
+    "risk_level",
+]
+
+# Parquet column types; anything else is written as string
+NUMERIC_COLUMNS = {
+    "metrics.issue_price_upper",
+    "metrics.open_price",
+    "metrics.listing_gain_pct",
+    "subscription.qib",
+    "subscription.hni",
+    "subscription.retail",
+    "confidence_score",
+}
+
+SOURCE_COLUMN = "source_collection"
+
+DEFAULT_BATCH_SIZE = 1000
+# Whole documents (NDJSON without columns) run to megabytes each once
+# nse_company is populated, so their batches are capped by rows
+WHOLE_DOCUMENT_BATCH_SIZE = 50
+
+
+def parse_columns(raw: Optional[str]) -> Optional[List[str]]:
+    cols = [c.strip() for c in (raw or "").split(",") if c.strip() and not c.strip().startswith("$")]
+    return cols or None
+
+
+def effective_batch_size(columns: Optional[List[str]], batch_size: int) -> int:
+    return batch_size if columns else min(batch_size, WHOLE_DOCUMENT_BATCH_SIZE)
+
+
+def export_projection(columns: Optional[List[str]]) -> dict:
+    """Mongo projection for the requested columns (whole documents when None)."""
+    if not columns:
+        return {"_id": 0}
+    # A parent column already brings its children along
+    kept = [c for c in sorted(set(columns)) if not any(c.startswith(p + ".") for p in columns if p != c)]
+    return {"_id": 0, **{c: 1 for c in kept}}
+
+
+def get_path(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def json_default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return str(obj)
+
+
+def scalar(value):
+    """Flat cell value: dates as ISO strings, nested values as compact JSON."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=json_default, separators=(",", ":"))
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def flatten(doc: dict, columns: List[str], source: str = None) -> Dict:
+    row = {c: scalar(get_path(doc, c)) for c in columns}
+    if source is not None:
+        row[SOURCE_COLUMN] = source
+    return row
+
+
+# ---------------------------
+# Encoders: each turns a batch of documents into bytes
+# ---------------------------
+def json_line(row: dict) -> bytes:
+    return (json.dumps(row, default=json_default, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def ndjson_batch(docs: Iterable[dict], columns: Optional[List[str]], source: str,
+                 encode_line: Callable[[dict], bytes] = json_line) -> bytes:
+    rows = (flatten(d, columns, source) if columns else {**d, SOURCE_COLUMN: source} for d in docs)
+    return b"".join(encode_line(r) for r in rows)
+
+
+def csv_header(columns: List[str]) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(columns + [SOURCE_COLUMN])
+    return buf.getvalue().encode("utf-8")
+
+
+def csv_batch(docs: Iterable[dict], columns: List[str], source: str) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for d in docs:
+        row = flatten(d, columns, source)
+        writer.writerow(["" if row[c] is None else row[c] for c in columns + [SOURCE_COLUMN]])
+    return buf.getvalue().encode("utf-8")
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file object whose bytes are drained after every Parquet row group."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def parquet_available() -> bool:
+    """pyarrow is optional and only imported once a Parquet export starts."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def parquet_schema(columns: List[str]):
+    import pyarrow as pa
+
+    return pa.schema(
+        [(c, pa.float64() if c in NUMERIC_COLUMNS else pa.string()) for c in columns]
+        + [(SOURCE_COLUMN, pa.string())]
+    )
+
+
+def parquet_cell(column: str, value):
+    if value is None:
+        return None
+    if column in NUMERIC_COLUMNS:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    return value if isinstance(value, str) else str(value)
+
+
+class ParquetBatches:
+    """
+    Columnar writer: every batch becomes one Parquet row group, so only one
+    batch is ever held in memory. `write` returns the bytes produced so far.
+    """
+
+    def __init__(self, columns: List[str], sink=None):
+        if not parquet_available():
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        import pyarrow.parquet as pq
+
+        self.columns = columns
+        self.schema = parquet_schema(columns)
+        self.sink = sink or ChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema, compression="snappy")
+
+    def write(self, docs: Iterable[dict], source: str) -> bytes:
+        import pyarrow as pa
+
+        rows = [flatten(d, self.columns, source) for d in docs]
+        if rows:
+            table = pa.Table.from_pydict(
+                {c: [parquet_cell(c, r[c]) for r in rows] for c in self.columns + [SOURCE_COLUMN]},
+                schema=self.schema,
+            )
+            self.writer.write_table(table)
+        return self.drain()
+
+    def close(self) -> bytes:
+        self.writer.close()
+        return self.drain()
+
+    def drain(self) -> bytes:
+        return self.sink.drain() if isinstance(self.sink, ChunkSink) else b""
+
+
+def batched(cursor: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_to_file(out, fmt: str = "ndjson", collection: str = "all", columns: List[str] = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Streams the chosen collections into a binary file object; returns the row count."""
+    sources = list(EXPORT_COLLECTIONS) if collection == "all" else [collection]
+    collections = {"past": ipo_past_master, "live": ipo_live_upcoming}
+    if fmt != "ndjson":
+        columns = columns or DEFAULT_COLUMNS
+    batch_size = effective_batch_size(columns, batch_size)
+
+    parquet = ParquetBatches(columns, sink=out) if fmt == "parquet" else None
+    if fmt == "csv":
+        out.write(csv_header(columns))
+
+    count = 0
+    for source in sources:
+        cursor = collections[source].find({}, export_projection(columns), batch_size=batch_size)
+        for docs in batched(cursor, batch_size):
+            if fmt == "ndjson":
+                out.write(ndjson_batch(docs, columns, source))
+            elif fmt == "csv":
+                out.write(csv_batch(docs, columns, source))
+            else:
+                parquet.write(docs, source)
+            count += len(docs)
+            logging.info(f"[EXPORT] {count} rows written")
+    if parquet:
+        parquet.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the IPO universe as NDJSON, CSV or Parquet")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--collection", choices=list(EXPORT_COLLECTIONS) + ["all"], default="all")
+    parser.add_argument("--columns", type=str, help="Comma separated dotted paths (default: whole documents for NDJSON, a standard set otherwise)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--out", type=str, help="Output file (default: stdout; required for parquet)")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.out:
+        parser.error("--out is required for parquet")
+
+    columns = parse_columns(args.columns)
+    if args.out:
+        with open(args.out, "wb") as f:
+            count = export_to_file(f, args.format, args.collection, columns, args.batch_size)
+    else:
+        count = export_to_file(sys.stdout.buffer, args.format, args.collection, columns, args.batch_size)
+    logging.info(f"[EXPORT] Done: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
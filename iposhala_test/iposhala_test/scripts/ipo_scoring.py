@@ -0,0 +1,170 @@
+import os
+import re
+import sys
+import argparse
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+try:
+    from iposhala_test.scripts.mongo import ipo_live_upcoming, ipo_past_master, ipo_gmp
+    from iposhala_test.scripts.cache_epoch import bump_cache_epoch
+except ImportError:
+    # Handle if run from inside scripts directory
+    from mongo import ipo_live_upcoming, ipo_past_master, ipo_gmp
+    from cache_epoch import bump_cache_epoch
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+LOW_RISK = "Low Risk / High Reward"
+MODERATE_RISK = "Moderate"
+HIGH_RISK = "High Risk / Speculative"
+
+# Fields the scorer reads from ipo_live_upcoming / ipo_past_master documents
+SCORING_PROJECTION = {
+    "ipo_id": 1,
+    "symbol": 1,
+    "gmp": 1,
+    "issue_price": 1,
+    "price_range": 1,
+    "issue_size": 1,
+    "official_issue_size": 1,
+    "subscription": 1,
+    "issue_information.issue_price": 1,
+    "issue_information.issue_size": 1,
+    "nse_quote.security_info.issuedSize": 1,
+}
+
+
+def to_float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def upper_price(doc: dict) -> float:
+    """Upper band of the issue price, e.g. "Rs.95 to Rs.100" -> 100."""
+    info = doc.get("issue_information") or {}
+    price_str = str(doc.get("issue_price") or doc.get("price_range") or info.get("issue_price") or "0")
+    prices = [int(p) for p in re.findall(r'\d+', price_str.replace(',', ''))]
+    return float(max(prices)) if prices else 0.0
+
+
+def issue_size(doc: dict) -> float:
+    """Issue size in the same priority get_ipo displays it: official, stored, NSE quote."""
+    info = doc.get("issue_information") or {}
+    issued = ((doc.get("nse_quote") or {}).get("security_info") or {}).get("issuedSize")
+    size_str = str(doc.get("official_issue_size") or doc.get("issue_size") or info.get("issue_size") or issued or "0")
+    sizes = [float(p) for p in re.findall(r'\d+\.?\d*', size_str.replace(',', ''))]
+    return max(sizes) if sizes else 0.0
+
+
+def score_features(doc: dict, gmp=None) -> List[float]:
+    """[gmp, upper_price, qib, total_subscription, issue_size] for one IPO."""
+    sub = doc.get("subscription") or {}
+    qib = to_float(sub.get("qib"))
+    hni = to_float(sub.get("hni") or sub.get("nii"))
+    retail = to_float(sub.get("retail"))
+    return [
+        to_float(doc.get("gmp") if gmp is None else gmp),
+        upper_price(doc),
+        qib,
+        qib + hni + retail,
+        issue_size(doc),
+    ]
+
+
+def score_batch(features) -> Dict:
+    """
+    Vectorized confidence score over an (n, 5) feature matrix from score_features.
+    Starts at 50 and adds GMP premium, QIB demand, total subscription and issue
+    size adjustments, clipped to 0-100. Returns NumPy arrays.
+    """
+    # Imported here: the API loads this module at startup but rarely scores
+    import numpy as np
+
+    features = np.asarray(features, dtype=float).reshape(-1, 5)
+    gmp, price, qib, total_sub, size = features.T
+
+    gmp_pct = np.divide(gmp * 100, price, out=np.zeros_like(gmp), where=price > 0)
+    confidence = np.full(len(features), 50.0)
+    confidence += np.where(price > 0, np.select([gmp_pct > 50, gmp_pct > 20, gmp_pct > 0, gmp_pct < 0], [30, 20, 10, -20], 0), 0)
+    confidence += np.select([qib > 50, qib > 10], [20, 10], 0)
+    confidence += np.where(total_sub > 100, 10, 0)
+    # > 1000 Cr usually more stable, < 100 Cr is SME or small
+    confidence += np.select([size > 1000, (size < 100) & (size > 0)], [10, -10], 0)
+
+    scores = np.clip(confidence, 0, 100).astype(int)
+    levels = np.select([scores >= 75, scores >= 45], [LOW_RISK, MODERATE_RISK], HIGH_RISK)
+    return {"confidence_score": scores, "risk_level": levels}
+
+
+def score_ipo(doc: dict, gmp=None) -> dict:
+    """confidence_score / risk_level for a single IPO document."""
+    result = score_batch([score_features(doc, gmp)])
+    return {
+        "confidence_score": int(result["confidence_score"][0]),
+        "risk_level": str(result["risk_level"][0]),
+    }
+
+
+def gmp_lookup() -> Dict[str, float]:
+    """Latest GMP per ipo_id (the GMP pipeline stores symbol there when ipo_id is missing)."""
+    return {d["ipo_id"]: d.get("gmp") for d in ipo_gmp.find({}, {"_id": 0, "ipo_id": 1, "gmp": 1}) if d.get("ipo_id")}
+
+
+def refresh_scores(include_past: bool = True, batch_size: int = 500) -> int:
+    """
+    Re-scores every live/upcoming (and optionally past) IPO in one NumPy pass
+    per collection and persists confidence_score / risk_level.
+    """
+    gmp_by_id = gmp_lookup()
+    collections = [ipo_live_upcoming] + ([ipo_past_master] if include_past else [])
+    now = datetime.now(timezone.utc)
+
+    total = 0
+    for coll in collections:
+        docs = list(coll.find({}, SCORING_PROJECTION))
+        if not docs:
+            continue
+        features = [
+            score_features(d, gmp_by_id.get(d.get("ipo_id"), gmp_by_id.get(d.get("symbol"))))
+            for d in docs
+        ]
+        result = score_batch(features)
+
+        ops = [
+            UpdateOne({"_id": d["_id"]}, {"$set": {
+                "confidence_score": int(score),
+                "risk_level": str(level),
+                "score_updated_at": now,
+            }})
+            for d, score, level in zip(docs, result["confidence_score"], result["risk_level"])
+        ]
+        for i in range(0, len(ops), batch_size):
+            coll.bulk_write(ops[i:i + batch_size], ordered=False)
+        total += len(ops)
+
+    logging.info(f"[SCORING] Scored {total} IPOs")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute IPO confidence scores")
+    parser.add_argument("--refresh", action="store_true", help="Re-score all IPOs")
+    parser.add_argument("--live-only", action="store_true", help="Skip ipo_past_master")
+    args = parser.parse_args()
+
+    if args.refresh:
+        refresh_scores(include_past=not args.live_only)
+        bump_cache_epoch("ipo_scoring")
+    else: parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
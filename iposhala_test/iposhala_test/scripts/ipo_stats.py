@@ -0,0 +1,122 @@
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime, timezone, timedelta
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+try:
+    from iposhala_test.scripts.mongo import ipo_live_upcoming, ipo_stats
+    from iposhala_test.scripts.cache_epoch import bump_cache_epoch
+    from iposhala_test.scripts.indexes import ensure_indexes
+except ImportError:
+    # Handle if run from inside scripts directory
+    from mongo import ipo_live_upcoming, ipo_stats
+    from cache_epoch import bump_cache_epoch
+    from indexes import ensure_indexes
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+STATS_ID = "current"
+
+# Snapshots older than this are recomputed on read
+STATS_MAX_AGE = timedelta(hours=2)
+
+
+_IS_SME = {"$eq": ["$security_type", "SME"]}
+
+
+def _total(src: str, extra: dict = None) -> list:
+    match = {"src": src, **(extra or {})}
+    return [{"$match": match}, {"$group": {"_id": None, "n": {"$sum": "$n"}}}]
+
+
+def _first_or_zero(field: str) -> dict:
+    return {"$ifNull": [{"$arrayElemAt": [f"${field}.n", 0]}, 0]}
+
+
+# Runs against ipo_live_upcoming. Each collection is reduced to a handful of
+# grouped rows server-side, then one $facet shapes the response: one round trip.
+STATS_PIPELINE = [
+    {"$group": {"_id": {"status": "$status", "sme": _IS_SME}, "n": {"$sum": 1}}},
+    {"$set": {"src": "live"}},
+    {"$unionWith": {"coll": "ipo_past_master", "pipeline": [
+        {"$group": {"_id": {"sme": _IS_SME}, "n": {"$sum": 1}}},
+        {"$set": {"src": "past"}},
+    ]}},
+    {"$unionWith": {"coll": "ipo_gmp", "pipeline": [
+        {"$count": "n"},
+        {"$set": {"src": "gmp"}},
+    ]}},
+    {"$facet": {
+        "upcoming": _total("live", {"_id.status": "UPCOMING"}),
+        "current": _total("live", {"_id.status": "LIVE"}),
+        "listed": _total("past"),
+        "sme_live": _total("live", {"_id.sme": True}),
+        "sme_past": _total("past", {"_id.sme": True}),
+        "gmp": _total("gmp"),
+    }},
+    {"$project": {
+        "upcoming": _first_or_zero("upcoming"),
+        "current": _first_or_zero("current"),
+        "listed": _first_or_zero("listed"),
+        "sme": {"$add": [_first_or_zero("sme_live"), _first_or_zero("sme_past")]},
+        "gmp": _first_or_zero("gmp"),
+    }},
+]
+
+STATS_FIELDS = ("upcoming", "current", "listed", "sme", "gmp")
+
+
+def shape_stats(doc: dict) -> dict:
+    doc = doc or {}
+    return {k: int(doc.get(k) or 0) for k in STATS_FIELDS}
+
+
+def is_fresh(snapshot: dict) -> bool:
+    computed_at = (snapshot or {}).get("computed_at")
+    if not computed_at:
+        return False
+    if computed_at.tzinfo is None:
+        computed_at = computed_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - computed_at < STATS_MAX_AGE
+
+
+def compute_ipo_stats() -> dict:
+    rows = list(ipo_live_upcoming.aggregate(STATS_PIPELINE))
+    return shape_stats(rows[0] if rows else None)
+
+
+def refresh_stats_snapshot():
+    """Recomputes the counts the home page shows; pipelines call this after writing."""
+    try:
+        stats = compute_ipo_stats()
+        ipo_stats.update_one(
+            {"_id": STATS_ID},
+            {"$set": {**stats, "computed_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        return stats
+    except Exception as e:
+        logging.warning(f"[STATS] Failed to refresh stats snapshot: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IPO stats snapshot maintenance")
+    parser.add_argument("--refresh", action="store_true", help="Recompute the stats snapshot")
+    parser.add_argument("--index", action="store_true", help="Create status / security_type indexes")
+    args = parser.parse_args()
+
+    if args.index: ensure_indexes(["ipo_live_upcoming", "ipo_past_master"])
+    if args.refresh:
+        logging.info(f"[STATS] {refresh_stats_snapshot()}")
+        bump_cache_epoch("ipo_stats")
+
+    if not (args.index or args.refresh):
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
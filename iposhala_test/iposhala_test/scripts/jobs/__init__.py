@@ -0,0 +1,30 @@
+"""
+Pipeline jobs. Each job is a module in this package exposing `run()`; the
+registry maps job names to module paths so callers (the API, cron, the CLI)
+can trigger a pipeline without importing its scraper stack (Selenium,
+webdriver_manager, BeautifulSoup) until the job actually runs.
+
+    python -m iposhala_test.scripts.jobs gmp
+"""
+import importlib
+import logging
+from typing import Any, Dict
+
+JOBS: Dict[str, str] = {
+    "gmp": "iposhala_test.scripts.jobs.fetch_gmp",
+    "live_ipos": "iposhala_test.scripts.jobs.fetch_live_ipos",
+    "nse_upcoming": "iposhala_test.scripts.jobs.fetch_nse_upcoming",
+    "nse_company_dynamic": "iposhala_test.scripts.jobs.update_nse_company_dynamic",
+}
+
+
+class UnknownJob(KeyError):
+    pass
+
+
+def run_job(name: str, **kwargs) -> Any:
+    """Imports the job's module on first use and runs it in the calling thread."""
+    if name not in JOBS:
+        raise UnknownJob(name)
+    logging.info(f"[JOBS] Running {name}")
+    return importlib.import_module(JOBS[name]).run(**kwargs)
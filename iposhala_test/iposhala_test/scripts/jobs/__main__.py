@@ -0,0 +1,17 @@
+import argparse
+import logging
+
+from iposhala_test.scripts.jobs import JOBS, run_job
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a pipeline job by name")
+    parser.add_argument("job", choices=sorted(JOBS))
+    args = parser.parse_args()
+    run_job(args.job)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+from iposhala_test.scripts.pipeline_gmp import fetch_and_store_gmp
+
+def run():
+    # Selenium scrape of GMP data; returns the matched rows
+    return fetch_and_store_gmp()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,8 @@
+from iposhala_test.scripts.pipeline_market_data import fetch_live_ipos
+
+def run():
+    # NSE current issues -> ipo_live_upcoming, then sweep closed ones
+    fetch_live_ipos()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,8 @@
+from iposhala_test.scripts.pipeline_nse_upcoming import fetch_nse_forthcoming
+
+def run():
+    # Selenium scrape of NSE forthcoming issues
+    fetch_nse_forthcoming()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,149 @@
+"""
+Mongo-backed queue for pipeline jobs (collection `pipeline_jobs`). API
+processes enqueue and read status; `python -m iposhala_test.scripts.jobs.worker`
+claims and runs jobs in its own process.
+
+A queued or running job holds `active_key` (its name), which is unique, so
+concurrent triggers of the same job collapse into one run.
+"""
+import socket
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from iposhala_test.scripts import mongo
+from iposhala_test.scripts.indexes import ensure_indexes
+from iposhala_test.scripts.jobs import JOBS, UnknownJob
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+# A running job whose lease is not renewed in time is taken to have lost its
+# worker and marked failed; live workers renew every LEASE_RENEW_INTERVAL
+JOB_LEASE = timedelta(minutes=5)
+LEASE_RENEW_INTERVAL = timedelta(minutes=1)
+
+_indexes_ready = False
+
+
+def jobs_collection():
+    global _indexes_ready
+    if not _indexes_ready:
+        # The unique active_key index is what makes dedupe safe across processes
+        ensure_indexes(["pipeline_jobs"])
+        _indexes_ready = True
+    return mongo.pipeline_jobs
+
+
+def now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_job(name: str, params: Dict[str, Any] = None) -> Tuple[dict, bool]:
+    """
+    Queues `name` unless a run is already queued or running; returns
+    (job, created). A trigger that finds an active run gets that run's job.
+    """
+    if name not in JOBS:
+        raise UnknownJob(name)
+    coll = jobs_collection()
+    job = {
+        "name": name,
+        "params": params or {},
+        "status": QUEUED,
+        "active_key": name,
+        "created_at": now(),
+        "requested_by": socket.gethostname(),
+    }
+    for _ in range(3):
+        try:
+            coll.insert_one(job)
+            logging.info(f"[JOBS] Queued {name} as {job['_id']}")
+            return job, True
+        except DuplicateKeyError:
+            job.pop("_id", None)
+            active = coll.find_one({"active_key": name})
+            if active:
+                return active, False
+            # The active run finished between the insert and the lookup: retry
+    raise RuntimeError(f"Could not enqueue {name}")
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    try:
+        oid = ObjectId(job_id)
+    except (InvalidId, TypeError):
+        return None
+    return jobs_collection().find_one({"_id": oid})
+
+
+def claim_next_job(worker_id: str) -> Optional[dict]:
+    """Atomically moves the oldest queued job to running for this worker."""
+    started = now()
+    return jobs_collection().find_one_and_update(
+        {"status": QUEUED},
+        {"$set": {"status": RUNNING, "worker": worker_id, "started_at": started, "lease_until": started + JOB_LEASE}},
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def owned_by(job: dict) -> dict:
+    """Filter matching the job only while it is still running under the worker that claimed it."""
+    return {"_id": job["_id"], "status": RUNNING, "worker": job.get("worker")}
+
+
+def renew_lease(job: dict) -> bool:
+    """Pushes lease_until out by JOB_LEASE; False once the job was expired or finished elsewhere."""
+    res = jobs_collection().update_one(owned_by(job), {"$set": {"lease_until": now() + JOB_LEASE}})
+    return res.matched_count == 1
+
+
+def finish_job(job: dict, result: Any = None, error: str = None) -> bool:
+    """
+    Records the outcome and releases the job's active_key for the next trigger.
+    False (nothing written) when the job is no longer this worker's to finish.
+    """
+    res = jobs_collection().update_one(
+        owned_by(job),
+        {
+            "$set": {
+                "status": FAILED if error else SUCCEEDED,
+                "finished_at": now(),
+                "result": result,
+                "error": error,
+            },
+            "$unset": {"active_key": "", "lease_until": ""},
+        },
+    )
+    return res.matched_count == 1
+
+
+def expire_stale_jobs() -> int:
+    """Fails running jobs whose worker died (lease passed) so triggers are not blocked forever."""
+    res = jobs_collection().update_many(
+        {"status": RUNNING, "lease_until": {"$lt": now()}},
+        {"$set": {"status": FAILED, "finished_at": now(), "error": "worker lost (lease expired)"},
+         "$unset": {"active_key": "", "lease_until": ""}},
+    )
+    if res.modified_count:
+        logging.warning(f"[JOBS] Expired {res.modified_count} stale running jobs")
+    return res.modified_count
+
+
+def shape_job(job: dict) -> dict:
+    """Public view of a job document for the API."""
+    return {
+        "job_id": str(job["_id"]),
+        "name": job.get("name"),
+        "status": job.get("status"),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+        "result": job.get("result"),
+        "error": job.get("error"),
+    }
@@ -1,8 +1,8 @@
-from iposhala_test.scripts.fetch_nse_company_info_into_mongo import main
+from iposhala_test.scripts.pipeline_market_data import fetch_all_nse_data
 
-def run():
-    # run full update
-    main(limit=None)
+def run(limit=None, force=False):
+    # NSE company sections (announcements, actions, reports, ...) for past IPOs due a refresh
+    fetch_all_nse_data(limit=limit, force=force)
 
 if __name__ == "__main__":
     run()
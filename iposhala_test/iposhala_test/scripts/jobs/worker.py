@@ -0,0 +1,94 @@
+import os
+import time
+import socket
+import argparse
+import logging
+import threading
+import traceback
+
+from iposhala_test.scripts.jobs import run_job
+from iposhala_test.scripts.jobs.job_queue import (
+    LEASE_RENEW_INTERVAL, claim_next_job, finish_job, expire_stale_jobs, renew_lease,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+POLL_INTERVAL = 2.0
+
+
+def job_result(value):
+    """What is stored on the job document: a count plus the rows for list results."""
+    if isinstance(value, list):
+        return {"count": len(value), "data": value}
+    if value is None or isinstance(value, (int, float, str, bool, dict)):
+        return value
+    return str(value)
+
+
+class LeaseKeeper:
+    """Renews a running job's lease from a background thread until the job returns."""
+
+    def __init__(self, job: dict, interval: float = LEASE_RENEW_INTERVAL.total_seconds()):
+        self.job = job
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"lease-{job['_id']}", daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                if not renew_lease(self.job):
+                    logging.warning(f"[WORKER] Lost the lease on {self.job['name']} ({self.job['_id']})")
+                    return
+            except Exception as e:
+                # Transient Mongo error: the next renewal still lands well inside the lease
+                logging.warning(f"[WORKER] Could not renew lease on {self.job['_id']}: {e}")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+
+def run_one(worker_id: str) -> bool:
+    """Claims and runs one queued job; False when the queue is empty."""
+    expire_stale_jobs()
+    job = claim_next_job(worker_id)
+    if not job:
+        return False
+    logging.info(f"[WORKER] {worker_id} running {job['name']} ({job['_id']})")
+    started = time.perf_counter()
+    try:
+        with LeaseKeeper(job):
+            result = run_job(job["name"], **(job.get("params") or {}))
+        finished = finish_job(job, result=job_result(result))
+        logging.info(f"[WORKER] {job['name']} succeeded in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        logging.error(f"[WORKER] {job['name']} failed: {e}\n{traceback.format_exc()}")
+        finished = finish_job(job, error=str(e) or type(e).__name__)
+    if not finished:
+        logging.warning(f"[WORKER] {job['name']} ({job['_id']}) was expired while running; outcome not recorded")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued pipeline jobs (one at a time per worker)")
+    parser.add_argument("--once", action="store_true", help="Drain the queue and exit")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL, help="Seconds between queue polls when idle")
+    args = parser.parse_args()
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logging.info(f"[WORKER] {worker_id} started")
+    while True:
+        ran = run_one(worker_id)
+        if not ran:
+            if args.once:
+                break
+            time.sleep(args.poll)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+try:
+    from iposhala_test.scripts.mongo import ipo_live_events, cache_epoch
+    from iposhala_test.scripts.indexes import ensure_indexes
+except ImportError:
+    # Handle if run from inside scripts directory
+    from mongo import ipo_live_events, cache_epoch
+    from indexes import ensure_indexes
+
+# Counter document (in cache_epoch) handing out event sequence numbers
+SEQ_ID = "live_events"
+
+# Event types: "live" / "gmp" carry changed fields; "closed" (moved to the past
+# master) and "removed" (withdrawn upcoming issue) tell clients to drop the row.
+# Fields whose changes are pushed to live pages, per event type
+LIVE_FIELDS = ["status", "subscription", "price_range", "issue_size", "issue_start_date", "issue_end_date"]
+GMP_FIELDS = ["gmp", "issuePrice", "estimatedListingPrice", "expectedGainPercent"]
+
+_collection_ready = False
+
+
+def ensure_live_events_collection():
+    """Creates ipo_live_events as a capped collection with its seq index (scripts/indexes.py)."""
+    global _collection_ready
+    ensure_indexes(["ipo_live_events"])
+    _collection_ready = True
+
+
+def field_delta(before: Optional[dict], after: dict, fields: List[str]) -> Dict:
+    """Watched fields of `after` that differ from `before` (all present ones for a new doc)."""
+    before = before or {}
+    return {f: after[f] for f in fields if f in after and after[f] != before.get(f)}
+
+
+def live_event(event_type: str, doc: dict, changes: Dict) -> Dict:
+    return {
+        "type": event_type,
+        "ipo_id": doc.get("ipo_id"),
+        "symbol": doc.get("symbol"),
+        "changes": changes,
+    }
+
+
+def publish_live_events(source: str, events: List[Dict]) -> int:
+    """
+    Records per-IPO deltas for the API's SSE channel (/api/events/live). Each
+    API process tails ipo_live_events and fans the events out to its
+    connected clients. Like bump_cache_epoch, never fails the pipeline.
+    """
+    events = [e for e in events if e.get("changes") or e.get("type") in ("closed", "removed")]
+    if not events:
+        return 0
+    try:
+        if not _collection_ready:
+            ensure_live_events_collection()
+        counter = cache_epoch.find_one_and_update(
+            {"_id": SEQ_ID},
+            {"$inc": {"seq": len(events)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        first = counter["seq"] - len(events) + 1
+        now = datetime.now(timezone.utc)
+        ipo_live_events.insert_many([
+            {**e, "seq": first + i, "source": source, "at": now} for i, e in enumerate(events)
+        ])
+        logging.info(f"[LIVE EVENTS] Published {len(events)} events from {source}")
+        return len(events)
+    except Exception as e:
+        logging.warning(f"[LIVE EVENTS] Failed to publish events from {source}: {e}")
+        return 0
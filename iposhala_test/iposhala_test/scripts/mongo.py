@@ -1,5 +1,6 @@
-
 import os
+import logging
+import threading
 from pymongo import MongoClient
 from dotenv import load_dotenv
 
@@ -10,19 +11,60 @@ load_dotenv(os.path.join(BASE_DIR, ".env"))
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("DB_NAME")
 
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
+# Module attributes resolved lazily by __getattr__ below; importing this
+# module never connects. `from ...mongo import ipo_gmp` still works.
+COLLECTIONS = (
+    "ipo_past_master",
+    "ipo_past_issue_info",
+    "ipo_live_upcoming",
+    "ipo_master",
+    "ipo_gmp",
+    "cache_epoch",
+    "ipo_stats",
+    "ipo_analytics",
+    "ipo_price_bars",
+    "ipo_live_events",
+    "pipeline_jobs",
+)
+# Attribute name -> collection name where they differ
+COLLECTION_ALIASES = {
+    "users_collection": "users",
+    "watchlist_collection": "watchlist",
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> MongoClient:
+    """
+    Process-wide MongoClient, created on first use. Construction does not
+    block: server selection happens on the first operation.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MongoClient(MONGO_URI)
+                logging.debug(f"[MONGO] Client created for database {DB_NAME}")
+    return _client
+
+
+def get_db():
+    return get_client()[DB_NAME]
+
 
-ipo_past_master = db["ipo_past_master"]
-ipo_past_issue_info = db["ipo_past_issue_info"]
-ipo_live_upcoming = db["ipo_live_upcoming"]
-ipo_master = db["ipo_master"]
-ipo_gmp = db["ipo_gmp"]
-users_collection = db["users"]
-watchlist_collection = db["watchlist"]
+def get_collection(name: str):
+    return get_db()[name]
 
 
-print("MONGO_URI =", MONGO_URI)
-print("DB_NAME =", DB_NAME)
-print("CLIENT ADDRESS =", client.address)
-print("DB USED =", db.name)
+def __getattr__(name: str):
+    if name == "client":
+        return get_client()
+    if name == "db":
+        return get_db()
+    if name in COLLECTIONS:
+        return get_collection(name)
+    if name in COLLECTION_ALIASES:
+        return get_collection(COLLECTION_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
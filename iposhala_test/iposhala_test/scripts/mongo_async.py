@@ -0,0 +1,51 @@
+import logging
+import threading
+from typing import Optional, Sequence
+
+from pymongo import AsyncMongoClient, monitoring
+
+from iposhala_test.scripts.mongo import MONGO_URI, DB_NAME, COLLECTIONS, COLLECTION_ALIASES
+
+# Non-blocking twin of mongo.py for the FastAPI routes, with the same lazy
+# attributes (client, db, ipo_past_master, ...). The client is created on
+# first attribute access and connects on the first awaited operation, on the
+# server's event loop.
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client(event_listeners: Optional[Sequence[monitoring.CommandListener]] = None) -> AsyncMongoClient:
+    """
+    The shared client. Listeners can only be attached when it is created, so
+    callers that pass event_listeners must run before anything touches a
+    collection (the API server does so before importing its routes).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AsyncMongoClient(MONGO_URI, event_listeners=list(event_listeners or []))
+                return _client
+    if event_listeners:
+        logging.warning("[MONGO] Async client already created; event listeners not attached")
+    return _client
+
+
+def get_db():
+    return get_client()[DB_NAME]
+
+
+def get_collection(name: str):
+    return get_db()[name]
+
+
+def __getattr__(name: str):
+    if name == "client":
+        return get_client()
+    if name == "db":
+        return get_db()
+    if name in COLLECTIONS:
+        return get_collection(name)
+    if name in COLLECTION_ALIASES:
+        return get_collection(COLLECTION_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -15,6 +15,7 @@ from dotenv import load_dotenv
 import sys
 sys.path.append(os.getcwd())
 from iposhala_test.scripts.mongo import ipo_past_master
+from iposhala_test.scripts.cache_epoch import bump_cache_epoch
 from iposhala_test.scrapers.nse_company_dynamic import selenium_fetch_shareholding_pattern
 
 logging.basicConfig(
@@ -139,6 +140,7 @@ def fetch_and_save_logos(limit=50, symbol=None, force=False):
         if logo:
             logging.info(f"  [LOGOS] Found for {sym}: {logo}")
             ipo_past_master.update_one({"symbol": sym}, {"$set": {"logo_url": logo}})
+    bump_cache_epoch("pipeline_company_info")
 
 # ==========================================
 # DESCRIPTIONS ENGINE
@@ -166,11 +168,22 @@ def fetch_company_desc(company_name):
     except: pass
     return ""
 
+def sync_description_flags():
+    """Sets has_description on documents that got a description without it (older writes)."""
+    res = ipo_past_master.update_many(
+        {"has_description": {"$ne": True}, "description": {"$exists": True, "$nin": [None, ""]}},
+        {"$set": {"has_description": True}},
+    )
+    if res.modified_count:
+        logging.info(f"[DESCRIPTIONS] Flagged {res.modified_count} existing descriptions")
+
 def generate_and_save_descriptions(limit=50, symbol=None, force=False):
     if not SERPER_API_KEY:
         logging.warning("[DESCRIPTIONS] SERPER_API_KEY missing. Skipping descriptions.")
         return
-    query = {} if force else {"$or": [{"description": {"$exists": False}}, {"description": ""}]}
+    # Candidates come from the has_description index (scripts/indexes.py), not the text
+    sync_description_flags()
+    query = {} if force else {"has_description": {"$ne": True}}
     if symbol: query["symbol"] = symbol
     companies = list(ipo_past_master.find(query).limit(limit))
     logging.info(f"[DESCRIPTIONS] Found {len(companies)} candidates")
@@ -183,8 +196,9 @@ def generate_and_save_descriptions(limit=50, symbol=None, force=False):
                 desc = future.result()
                 if desc:
                     logging.info(f"  [DESCRIPTIONS] Found for {comp['symbol']} ({len(desc)} chars)")
-                    ipo_past_master.update_one({"symbol": comp['symbol']}, {"$set": {"description": desc}})
+                    ipo_past_master.update_one({"symbol": comp['symbol']}, {"$set": {"description": desc, "has_description": True}})
             except: pass
+    bump_cache_epoch("pipeline_company_info")
 
 # ==========================================
 # SHAREHOLDING ENGINE
@@ -207,6 +221,7 @@ def fetch_and_save_shareholding(limit=50, symbol=None, force=False):
             time.sleep(1)
         except Exception as e:
             logging.error(f"  [SHAREHOLDING] Failed for {sym}: {str(e)}")
+    bump_cache_epoch("pipeline_company_info")
 
 # ==========================================
 # CLI ROUTER
@@ -9,6 +9,10 @@ from datetime import datetime, timezone
 sys.path.append(os.getcwd())
 try:
     from iposhala_test.scripts.mongo import ipo_past_master, ipo_past_issue_info
+    from iposhala_test.scripts.ipo_fields import derive_fields
+    from iposhala_test.scripts.ipo_analytics import rebuild_analytics
+    from iposhala_test.scripts.ipo_stats import refresh_stats_snapshot
+    from iposhala_test.scripts.cache_epoch import bump_cache_epoch
 except ImportError:
     pass
 
@@ -67,6 +71,10 @@ def ingest_documents_from_csv():
                     updated += 1
                     
     logging.info(f"Processed {count} rows. Updated documents for {updated} IPO records.")
+    if updated:
+        # Upserts can register new symbols, which moves the listed / sme counts
+        refresh_stats_snapshot()
+        bump_cache_epoch("pipeline_documents")
     return True
 
 def restore_database_from_csv():
@@ -95,7 +103,7 @@ def restore_database_from_csv():
                 
             additional_docs = {mongo_key: clean(row.get(csv_col)) for csv_col, mongo_key in list(DOC_MAP.items())[6:] if clean(row.get(csv_col))}
             
-            docs.append({
+            doc = {
                 "symbol": sym.upper(),
                 "company_name": clean(row.get("COMPANY NAME")),
                 "security_type": clean(row.get("SECURITY TYPE")),
@@ -108,11 +116,16 @@ def restore_database_from_csv():
                 "additional_docs": additional_docs,
                 "created_at": datetime.now(timezone.utc),
                 "source": "csv_restore"
-            })
+            }
+            doc.update(derive_fields(doc))
+            docs.append(doc)
             
     if docs:
         res = ipo_past_master.insert_many(docs, ordered=False)
         logging.info(f"✅ Successfully completed recovery. Registered {len(res.inserted_ids)} base entity records.")
+        rebuild_analytics()
+        refresh_stats_snapshot()
+        bump_cache_epoch("pipeline_documents")
         return True
     return False
 
@@ -13,6 +13,8 @@ import sys
 # Add project root to path
 sys.path.append(os.getcwd())
 from iposhala_test.scripts.mongo import ipo_past_master
+from iposhala_test.scripts.company_sections import normalize_section
+from iposhala_test.scripts.cache_epoch import bump_cache_epoch
 
 # Setup logging
 logging.basicConfig(
@@ -178,10 +180,10 @@ def process_and_save_reports(symbol, website, reports):
             
     update_fields = {}
     if annual_reports:
-        update_fields["nse_company.annual_reports"] = {
+        update_fields["nse_company.annual_reports"] = normalize_section({
             "__available__": True,
             "data": annual_reports 
-        }
+        }, "annual_reports")
     if financial_results:
          update_fields["nse_company.financial_results"] = {
             "__available__": True,
@@ -244,6 +246,7 @@ def main():
         if driver:
             try: driver.quit()
             except: pass
+        bump_cache_epoch("pipeline_financials")
 
 if __name__ == "__main__":
     main()
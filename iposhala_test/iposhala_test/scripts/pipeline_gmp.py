@@ -2,7 +2,6 @@ import os
 import sys
 import re
 import requests
-import time
 import logging
 from bs4 import BeautifulSoup
 from datetime import datetime, timezone
@@ -11,12 +10,22 @@ from datetime import datetime, timezone
 sys.path.append(os.getcwd())
 try:
     from iposhala_test.scripts.mongo import ipo_past_master, ipo_live_upcoming, ipo_gmp
+    from iposhala_test.scripts.cache_epoch import bump_cache_epoch
+    from iposhala_test.scripts.ipo_stats import refresh_stats_snapshot
+    from iposhala_test.scripts.ipo_scoring import refresh_scores
+    from iposhala_test.scripts.live_events import GMP_FIELDS, field_delta, live_event, publish_live_events
     from iposhala_test.scrapers.nse_company_dynamic import get_driver
+    from iposhala_test.scrapers.http_fixtures import upstream_pause
 except ImportError:
     # Handle if run from inside scripts directory
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from mongo import ipo_past_master, ipo_live_upcoming, ipo_gmp
+    from cache_epoch import bump_cache_epoch
+    from ipo_stats import refresh_stats_snapshot
+    from ipo_scoring import refresh_scores
+    from live_events import GMP_FIELDS, field_delta, live_event, publish_live_events
     from scrapers.nse_company_dynamic import get_driver
+    from scrapers.http_fixtures import upstream_pause
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -47,7 +56,7 @@ def fetch_and_store_gmp():
     try:
         driver = get_driver(headless=True)
         driver.get(url)
-        time.sleep(5)  # Wait for table to load
+        upstream_pause(5)  # Wait for table to load
         
         html = driver.page_source
         soup = BeautifulSoup(html, 'html.parser')
@@ -80,6 +89,8 @@ def fetch_and_store_gmp():
         all_ipos = live_ipos + past_ipos
 
         matched_data = []
+        # ipo_id -> symbol of the matched IPO; live events are subscribed to by symbol
+        matched_symbols = {}
         for scraped in scraped_data:
             normalized_scraped = normalize_name(scraped["companyName"])
             
@@ -91,6 +102,7 @@ def fetch_and_store_gmp():
             if matched_ipo:
                 ipo_id = matched_ipo.get("ipo_id") or matched_ipo.get("symbol")
                 if ipo_id:
+                    matched_symbols[ipo_id] = matched_ipo.get("symbol")
                     matched_data.append({
                         "ipo_id": ipo_id,
                         "companyName": scraped["companyName"],
@@ -103,6 +115,8 @@ def fetch_and_store_gmp():
 
         # Upsert matched data into GMP collection and maintain historical timeline
         today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        before = {d.get("ipo_id"): d for d in ipo_gmp.find({}, {"_id": 0, "ipo_id": 1, **{f: 1 for f in GMP_FIELDS}})}
+        events = []
         
         for data in matched_data:
             # We want to push the daily GMP snapshot to gmp_history
@@ -123,8 +137,17 @@ def fetch_and_store_gmp():
                 },
                 upsert=True
             )
+            events.append(live_event(
+                "gmp",
+                {"ipo_id": data["ipo_id"], "symbol": matched_symbols.get(data["ipo_id"])},
+                field_delta(before.get(data["ipo_id"]), data, GMP_FIELDS),
+            ))
 
         logging.info(f"Successfully updated {len(matched_data)} GMP records.")
+        publish_live_events("pipeline_gmp", events)
+        refresh_scores()
+        refresh_stats_snapshot()
+        bump_cache_epoch("pipeline_gmp")
         return matched_data
 
     except Exception as e:
@@ -11,6 +11,8 @@ import pandas as pd
 sys.path.append(os.getcwd())
 try:
     from iposhala_test.scripts.mongo import ipo_past_master
+    from iposhala_test.scripts.cache_epoch import bump_cache_epoch
+    from iposhala_test.scripts.price_bars import ensure_price_bars_collection, write_bars
 except ImportError:
     pass
 
@@ -54,9 +56,11 @@ def fetch_yfinance_historical(symbol, period="2y"):
 
 def run_historical_pipeline(limit=None, symbols=None, force=False):
     """
-    Iterate over companies in MongoDB and attach full historical OHLCV profiles.
+    Iterate over companies in MongoDB and store full historical OHLCV profiles
+    as daily bars in ipo_price_bars.
     """
-    query = {"performance_table": {"$exists": False}} if not force else {}
+    ensure_price_bars_collection()
+    query = {"performance_updated_at": {"$exists": False}} if not force else {}
     if symbols: query["symbol"] = {"$in": symbols}
     
     companies = list(ipo_past_master.find(query, {"symbol": 1}).limit(limit if limit else 0))
@@ -69,14 +73,18 @@ def run_historical_pipeline(limit=None, symbols=None, force=False):
         
         perf_data = fetch_yfinance_historical(sym)
         if perf_data:
+            n = write_bars(sym, perf_data)
             ipo_past_master.update_one(
                 {"symbol": sym},
-                {"$set": {
-                    "performance_table": perf_data,
-                    "performance_updated_at": datetime.now(timezone.utc)
-                }}
+                {
+                    "$set": {
+                        "price_bar_count": n,
+                        "performance_updated_at": datetime.now(timezone.utc)
+                    },
+                    "$unset": {"performance_table": ""}
+                }
             )
-            logging.info(f"  [SUCCESS] -> Hydrated {len(perf_data)} daily records into MongoDB")
+            logging.info(f"  [SUCCESS] -> Hydrated {n} daily records into MongoDB")
             count += 1
         else:
             logging.info(f"  [FAILED] -> No Yahoo Finance match located.")
@@ -84,6 +92,9 @@ def run_historical_pipeline(limit=None, symbols=None, force=False):
         time.sleep(0.5)
         
     logging.info(f"Finished. Successfully extracted data for {count}/{len(companies)} companies.")
+    if count:
+        # Drops the API's cached weekly/monthly bars
+        bump_cache_epoch("pipeline_historical")
 
 def main():
     parser = argparse.ArgumentParser(description="Unified Historical Data Extraction Pipeline")
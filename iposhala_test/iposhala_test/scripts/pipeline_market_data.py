@@ -1,8 +1,6 @@
 import os
 import sys
-import time
 import argparse
-import requests
 import logging
 from datetime import datetime, date, timezone, timedelta
 from typing import Dict, Any, List
@@ -10,12 +8,20 @@ from typing import Dict, Any, List
 # Add project root to sys.path
 sys.path.append(os.getcwd())
 from iposhala_test.scripts.mongo import ipo_past_master, ipo_live_upcoming
+from iposhala_test.scripts.ipo_fields import derive_fields
+from iposhala_test.scripts.ipo_analytics import rebuild_analytics
+from iposhala_test.scripts.company_sections import normalize_section
+from iposhala_test.scripts.cache_epoch import bump_cache_epoch
+from iposhala_test.scripts.ipo_stats import refresh_stats_snapshot
+from iposhala_test.scripts.ipo_scoring import refresh_scores
+from iposhala_test.scripts.live_events import LIVE_FIELDS, field_delta, live_event, publish_live_events
 from iposhala_test.scrapers.nse_company_dynamic import (
     fetch_announcements, fetch_corporate_actions, fetch_annual_reports,
     fetch_brsr_reports, fetch_board_meetings, fetch_event_calendar,
     selenium_fetch_financial_results, selenium_fetch_shareholding_pattern,
     fetch_ipo_detail
 )
+from iposhala_test.scrapers.http_fixtures import fixture_session, upstream_pause
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -104,10 +110,13 @@ def fetch_live_ipos():
     urls = [
         "https://www.nseindia.com/api/ipo-current-issue"
     ]
-    session = requests.Session()
+    session = fixture_session()
     session.get("https://www.nseindia.com", headers=HEADERS)
     
     count, today = 0, date.today()
+    # Previous values of the pushed fields, to publish only what changed
+    before = {d.get("ipo_id"): d for d in ipo_live_upcoming.find({}, {"_id": 0, "ipo_id": 1, **{f: 1 for f in LIVE_FIELDS}})}
+    events = []
     for url in urls:
         try:
             response = session.get(url, headers=HEADERS)
@@ -171,6 +180,7 @@ def fetch_live_ipos():
                     {"$set": payload},
                     upsert=True
                 )
+                events.append(live_event("live", {"ipo_id": ipo_id, "symbol": symbol_str}, field_delta(before.get(ipo_id), payload, LIVE_FIELDS)))
                 count += 1
         except Exception as e:
             logging.error(f"[LIVE IPOS] Failed fetching {url}: {e}")
@@ -178,10 +188,24 @@ def fetch_live_ipos():
     logging.info(f"[LIVE IPOS] Inserted/Updated {count} records")
     
     # Sweep expired IPOs into past master after fetching the latest
-    sweep_expired_live_ipos()
+    closed = sweep_expired_live_ipos()
+    events.extend(closed)
+    publish_live_events("pipeline_market_data", events)
+    refresh_scores()
+    refresh_stats_snapshot()
+    try:
+        # Raises on failure so the job is marked failed; the writes above still get their epoch bump
+        if closed:
+            rebuild_analytics()
+    finally:
+        bump_cache_epoch("pipeline_market_data")
 
 def sweep_expired_live_ipos():
-    """Finds LIVE/UPCOMING IPOs whose end date has passed, and moves them to PAST MASTER."""
+    """
+    Finds LIVE/UPCOMING IPOs whose end date has passed, and moves them to PAST MASTER.
+    Returns the "closed" live events for the moved IPOs; the caller rebuilds
+    the analytics rollups when any were moved.
+    """
     today = datetime.now(timezone.utc)
     today_naive = datetime.now()
     # Give it a 1-day grace period to ensure timezone safety
@@ -191,10 +215,10 @@ def sweep_expired_live_ipos():
     expired_ipos = [doc for doc in all_live if isinstance(doc.get("issue_end_date"), datetime) and doc.get("issue_end_date") < cutoff]
 
     if not expired_ipos:
-        return
+        return []
         
     logging.info(f"[LIVE IPOS] Found {len(expired_ipos)} expired IPOs to transition to CLOSED.")
-    migrated = 0
+    migrated, closed = 0, []
     for doc in expired_ipos:
         symbol = doc.get("symbol")
         if not symbol: continue
@@ -226,6 +250,9 @@ def sweep_expired_live_ipos():
             
         if doc.get("documents"):
             historical_payload["documents"] = doc.get("documents")
+
+        # Normalized closed_at / is_sme / metrics for the closed list and analytics
+        historical_payload.update(derive_fields(historical_payload))
         
         # Upsert into past master so it appears in the Closed IPOs list
         ipo_past_master.update_one(
@@ -236,9 +263,11 @@ def sweep_expired_live_ipos():
         
         # Remove from live holding tank
         ipo_live_upcoming.delete_one({"_id": doc["_id"]})
+        closed.append(live_event("closed", doc, {"status": "CLOSED"}))
         migrated += 1
         
     logging.info(f"[LIVE IPOS] Successfully migrated {migrated} closed IPOs to historical pool.")
+    return closed
 
 
 def wrap_section(data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
@@ -272,11 +301,12 @@ def fetch_nse_data(symbol: str, force: bool = False):
     for name, func in data_sources:
         try:
             raw = func(symbol)
-            result[name] = wrap_section(raw, symbol)
-            time.sleep(1)
+            # Stored pre-sorted with a count so the API can $slice pages
+            result[name] = normalize_section(wrap_section(raw, symbol), name, symbol)
+            upstream_pause(1)
         except Exception as e:
             errors.append(f"Failed {name}: {str(e)}")
-            result[name] = {"available": False, "payload": [], "source_url": None}
+            result[name] = normalize_section({"available": False, "payload": [], "source_url": None}, name)
             
     payload = {
         "nse_company_updated_at": datetime.now(timezone.utc),
@@ -293,7 +323,8 @@ def fetch_all_nse_data(limit=None, force=False):
     
     for idx, sym in enumerate(symbols):
         fetch_nse_data(sym, force)
-        time.sleep(2)
+        upstream_pause(2)
+    bump_cache_epoch("pipeline_market_data")
 
 def main():
     parser = argparse.ArgumentParser()
@@ -307,7 +338,9 @@ def main():
 
     if args.all or args.live: fetch_live_ipos()
     if args.all or args.nse:
-        if args.symbol: fetch_nse_data(args.symbol, args.force)
+        if args.symbol:
+            fetch_nse_data(args.symbol, args.force)
+            bump_cache_epoch("pipeline_market_data")
         else: fetch_all_nse_data(args.limit, args.force)
     
     if not any([args.all, args.live, args.nse]):
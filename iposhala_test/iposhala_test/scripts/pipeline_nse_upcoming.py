@@ -1,4 +1,3 @@
-import time
 import logging
 import sys
 import os
@@ -13,7 +12,12 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 sys.path.append(os.getcwd())
 from iposhala_test.scripts.mongo import ipo_live_upcoming
+from iposhala_test.scripts.cache_epoch import bump_cache_epoch
+from iposhala_test.scripts.ipo_stats import refresh_stats_snapshot
+from iposhala_test.scripts.ipo_scoring import refresh_scores
+from iposhala_test.scripts.live_events import LIVE_FIELDS, field_delta, live_event, publish_live_events
 from iposhala_test.scrapers.nse_company_dynamic import fetch_ipo_detail
+from iposhala_test.scrapers.http_fixtures import fixture_driver, upstream_pause
 import re
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -70,8 +74,8 @@ def fetch_nse_forthcoming():
     options.add_argument('--disable-blink-features=AutomationControlled')
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36")
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    # Real Chrome, or a recorded / replayed page source (scrapers/http_fixtures.py)
+    driver = fixture_driver(lambda: webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options))
 
     # Prevent detection
     driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
@@ -83,19 +87,20 @@ def fetch_nse_forthcoming():
     })
 
     scraped_symbols = []
+    events = []
 
     try:
         url = "https://www.nseindia.com/market-data/all-upcoming-issues-ipo"
         logging.info(f"Loading NSE Upcoming IPOs: {url}")
         driver.get(url)
-        time.sleep(5)
+        upstream_pause(5)
         
         try:
             tab = WebDriverWait(driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'UPCOMING ISSUES') or contains(text(), 'Upcoming Issues')]"))
             )
             tab.click()
-            time.sleep(3)
+            upstream_pause(3)
         except Exception as e:
             logging.error(f"Failed to click Upcoming Issues tab: {e}")
             return
@@ -118,6 +123,7 @@ def fetch_nse_forthcoming():
             
         rows = tbodies[0].find_elements(By.TAG_NAME, "tr")
         logging.info(f"Found {len(rows)} Upcoming IPO rows.")
+        before = {d.get("symbol"): d for d in ipo_live_upcoming.find({}, {"_id": 0, "ipo_id": 1, "symbol": 1, "source": 1, **{f: 1 for f in LIVE_FIELDS}})}
         
         for row in rows:
             cols = row.find_elements(By.TAG_NAME, "td")
@@ -188,6 +194,8 @@ def fetch_nse_forthcoming():
                     },
                     upsert=True
                 )
+                prev = before.get(symbol)
+                events.append(live_event("live", {"ipo_id": (prev or {}).get("ipo_id", ipo_id), "symbol": symbol}, field_delta(prev, update_data, LIVE_FIELDS)))
                 logging.info(f"Updated Upcoming IPO: {company} ({symbol})")
 
         # Cleanup: Remove IPOs that are stuck in UPCOMING but vanish from the list.
@@ -200,6 +208,16 @@ def fetch_nse_forthcoming():
             })
             if deleted_res.deleted_count > 0:
                 logging.info(f"Cleaned up {deleted_res.deleted_count} stale Upcoming IPOs from DB.")
+                events.extend(
+                    live_event("removed", d, {}) for sym, d in before.items()
+                    if sym not in scraped_symbols and d.get("source") == "pipeline_nse_upcoming" and d.get("status") == "UPCOMING"
+                )
+
+        publish_live_events("pipeline_nse_upcoming", events)
+
+        refresh_scores(include_past=False)
+        refresh_stats_snapshot()
+        bump_cache_epoch("pipeline_nse_upcoming")
 
     except Exception as e:
         logging.error(f"Error scraping NSE Forthcoming: {e}")
@@ -0,0 +1,137 @@
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+try:
+    from iposhala_test.scripts.mongo import ipo_past_master, ipo_price_bars
+    from iposhala_test.scripts.cache_epoch import bump_cache_epoch
+    from iposhala_test.scripts.indexes import ensure_indexes
+except ImportError:
+    # Handle if run from inside scripts directory
+    from mongo import ipo_past_master, ipo_price_bars
+    from cache_epoch import bump_cache_epoch
+    from indexes import ensure_indexes
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# API interval -> pandas resample rule
+INTERVAL_RULES = {
+    "1w": "W",
+    "1m": "MS",
+}
+
+BAR_FIELDS = ["date", "open", "high", "low", "close", "volume"]
+
+# Returned to API callers in the old performance_table row shape
+BAR_PROJECTION = {"_id": 0, **{f: 1 for f in BAR_FIELDS}}
+
+
+def resample_bars(rows: List[Dict], interval: str) -> List[Dict]:
+    """
+    Downsamples daily OHLCV rows (performance_table format) to weekly/monthly bars:
+    open=first, high=max, low=min, close=last, volume=sum. Each bar is dated by
+    its first trading day; output is newest first like performance_table.
+    """
+    if interval not in INTERVAL_RULES or not rows:
+        return rows
+
+    # Imported here: the API loads this module at startup, pandas only on resampling
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    for col in BAR_FIELDS:
+        if col not in df.columns:
+            df[col] = 0 if col == "volume" else None
+    df = df[BAR_FIELDS]
+    df["ts"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["ts"]).sort_values("ts").set_index("ts")
+
+    bars = df.resample(INTERVAL_RULES[interval]).agg({
+        "date": "first",
+        "open": "first",
+        "high": "max",
+        "low": "min",
+        "close": "last",
+        "volume": "sum",
+    }).dropna(subset=["date"])
+
+    bars["volume"] = bars["volume"].astype("int64")
+    return bars.iloc[::-1].to_dict("records")
+
+
+def ensure_price_bars_collection():
+    """
+    Creates ipo_price_bars as a time-series collection (MongoDB 5.0+) plus its
+    symbol_ts range index (declared in scripts/indexes.py). Older servers get a
+    regular collection with the same index.
+    """
+    ensure_indexes(["ipo_price_bars"])
+
+
+def bar_docs(symbol: str, rows: List[Dict]) -> List[Dict]:
+    docs = []
+    for r in rows:
+        try:
+            ts = datetime.strptime(str(r.get("date"))[:10], "%Y-%m-%d")
+        except ValueError:
+            continue
+        docs.append({"symbol": symbol, "ts": ts, **{f: r.get(f) for f in BAR_FIELDS}})
+    return docs
+
+
+def write_bars(symbol: str, rows: List[Dict]) -> int:
+    """Replaces a symbol's stored daily bars with `rows` (performance_table format)."""
+    docs = bar_docs(symbol, rows)
+    # Time-series collections allow deletes filtered on the metaField
+    ipo_price_bars.delete_many({"symbol": symbol})
+    if docs:
+        ipo_price_bars.insert_many(docs, ordered=False)
+    return len(docs)
+
+
+def migrate_performance_tables(symbol: str = None) -> int:
+    """Moves embedded performance_table arrays out of ipo_past_master into ipo_price_bars."""
+    ensure_price_bars_collection()
+    query = {"performance_table": {"$exists": True}}
+    if symbol: query["symbol"] = symbol.upper().strip()
+
+    count = 0
+    for doc in ipo_past_master.find(query, {"symbol": 1, "performance_table": 1, "performance_updated_at": 1}):
+        rows = doc.get("performance_table") or []
+        n = write_bars(doc["symbol"], rows)
+        ipo_past_master.update_one(
+            {"_id": doc["_id"]},
+            {
+                "$set": {"price_bar_count": n, "performance_updated_at": doc.get("performance_updated_at") or datetime.utcnow()},
+                "$unset": {"performance_table": ""},
+            }
+        )
+        count += 1
+    logging.info(f"[PRICE BARS] Migrated performance_table for {count} companies")
+    if count:
+        bump_cache_epoch("price_bars")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily price bars maintenance")
+    parser.add_argument("--index", action="store_true", help="Create the ipo_price_bars time-series collection and index")
+    parser.add_argument("--migrate", action="store_true", help="Move embedded performance_table arrays into ipo_price_bars")
+    parser.add_argument("--symbol", type=str, help="Only this symbol")
+    args = parser.parse_args()
+
+    if args.index: ensure_price_bars_collection()
+    if args.migrate: migrate_performance_tables(args.symbol)
+
+    if not (args.index or args.migrate):
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
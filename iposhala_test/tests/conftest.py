@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests import the app as `iposhala_test.*`, like the scripts run from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Clients are lazy and never connect unless a test awaits a query
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "iposhala_tests")
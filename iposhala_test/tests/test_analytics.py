@@ -0,0 +1,63 @@
+import pytest
+from pymongo import DeleteMany, ReplaceOne
+
+from iposhala_test.scripts import ipo_analytics
+
+ROLLUP = {
+    "totals": [{"_id": None, "total": 3, "sme": 1, "gains": 30.0, "positive": 2}],
+    "yearly": [{"_id": 2023, "total": 1, "gains": -5.0, "positive": 0}, {"_id": 2024, "total": 2, "gains": 35.0, "positive": 2}],
+}
+
+
+class FakeMaster:
+    def __init__(self, error=None):
+        self.error = error
+
+    def aggregate(self, pipeline):
+        if self.error:
+            raise self.error
+        return iter([ROLLUP])
+
+
+class FakeAnalytics:
+    def __init__(self):
+        self.calls = []
+
+    def bulk_write(self, ops, ordered=True):
+        self.calls.append((ops, ordered))
+
+
+def test_rebuild_writes_every_rollup_in_one_bulk(monkeypatch):
+    analytics = FakeAnalytics()
+    monkeypatch.setattr(ipo_analytics, "ipo_past_master", FakeMaster())
+    monkeypatch.setattr(ipo_analytics, "ipo_analytics", analytics)
+
+    docs = ipo_analytics.rebuild_analytics()
+
+    assert [d["_id"] for d in docs] == ["totals", "year-2023", "year-2024"]
+    (ops, ordered), = analytics.calls
+    assert ordered
+    assert [type(op) for op in ops] == [ReplaceOne, ReplaceOne, ReplaceOne, DeleteMany]
+    assert ops[-1]._filter == {"_id": {"$nin": ["totals", "year-2023", "year-2024"]}}
+
+
+def test_rebuild_failure_is_raised(monkeypatch):
+    analytics = FakeAnalytics()
+    monkeypatch.setattr(ipo_analytics, "ipo_past_master", FakeMaster(RuntimeError("boom")))
+    monkeypatch.setattr(ipo_analytics, "ipo_analytics", analytics)
+
+    with pytest.raises(RuntimeError):
+        ipo_analytics.rebuild_analytics()
+    assert analytics.calls == []
+
+
+def test_format_overview():
+    overview = ipo_analytics.format_overview(ipo_analytics.rollup_docs(ROLLUP))
+    assert overview["metrics"] == {
+        "total_listed": 3, "sme_count": 1, "mainboard_count": 2, "avg_listing_gain": 10.0, "win_rate": 66.7,
+    }
+    assert overview["yearly"] == [
+        {"year": 2023, "ipos": 1, "avg_gain": -5.0, "win_rate": 0.0},
+        {"year": 2024, "ipos": 2, "avg_gain": 17.5, "win_rate": 100.0},
+    ]
+    assert ipo_analytics.format_overview([]) == {"msg": "No data"}
@@ -0,0 +1,91 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from iposhala_test.api.routes import company, ipos
+from iposhala_test.api.routes.company import batch_symbols, normalize_quote
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+def matches(doc, query):
+    if "$or" in query:
+        return any(matches(doc, q) for q in query["$or"])
+    return all(doc.get(field) in cond["$in"] for field, cond in query.items())
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return Cursor([dict(d) for d in self.docs if matches(d, query)])
+
+
+PAST = [
+    {"ipo_id": "abc-ltd", "symbol": "ABC", "confidence_score": 80, "risk_level": "Low Risk"},
+    {"ipo_id": "xyz-ltd", "symbol": "XYZ", "confidence_score": 40, "risk_level": "High Risk", "nse_quote": {"price_info": {"lastPrice": 12}}},
+]
+LIVE = [{"ipo_id": "new-ltd", "symbol": "NEW", "price_range": "Rs.10 to Rs.12", "status": "LIVE"}]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    past, live = FakeCollection(PAST), FakeCollection(LIVE)
+    monkeypatch.setattr(ipos, "ipo_past_master", past)
+    monkeypatch.setattr(ipos, "ipo_live_upcoming", live)
+    monkeypatch.setattr(company, "ipo_past_master", past)
+    app = FastAPI()
+    app.include_router(ipos.router)
+    app.include_router(company.router)
+    return TestClient(app), past, live
+
+
+def test_batch_symbols_normalizes_and_dedupes():
+    assert batch_symbols([" abc", "ABC", "", "xyz ", "  "]) == ["ABC", "XYZ"]
+
+
+def test_ipo_batch_keys_by_identifier_with_nulls(client):
+    client, past, live = client
+    res = client.post("/api/ipos/batch", json={"identifiers": ["abc-ltd", "XYZ", "new", "missing", "abc-ltd"]})
+    assert res.status_code == 200
+    body = res.json()
+
+    assert list(body) == ["abc-ltd", "XYZ", "new", "missing"]
+    assert body["abc-ltd"]["symbol"] == "ABC"
+    assert body["XYZ"]["ipo_id"] == "xyz-ltd"
+    assert body["new"]["status"] == "LIVE" and body["new"]["issue_price"] == "Rs.10 to Rs.12"
+    assert body["missing"] is None
+    # One query per collection; live is only asked for what past did not have
+    assert len(past.queries) == 1 and len(live.queries) == 1
+    assert live.queries[0]["$or"][0]["ipo_id"]["$in"] == ["new", "missing"]
+
+
+def test_quote_batch(client):
+    client, past, _ = client
+    body = client.post("/api/company/batch/quote", json={"symbols": ["xyz", "ABC", "nope"]}).json()
+    assert body == {
+        "XYZ": normalize_quote(PAST[1]["nse_quote"]),
+        "ABC": normalize_quote({}),
+        "NOPE": None,
+    }
+    assert len(past.queries) == 1
+
+
+@pytest.mark.parametrize("path, key", [
+    ("/api/ipos/batch", "identifiers"),
+    ("/api/company/batch/quote", "symbols"),
+    ("/api/company/batch/tabs", "symbols"),
+])
+def test_batch_size_limits(client, path, key):
+    client, _, _ = client
+    assert client.post(path, json={key: []}).status_code == 422
+    assert client.post(path, json={key: [f"S{i}" for i in range(ipos.MAX_BATCH + 1)]}).status_code == 422
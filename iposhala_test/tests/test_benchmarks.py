@@ -0,0 +1,67 @@
+import random
+from datetime import datetime
+
+import pytest
+from starlette.routing import Match
+
+from iposhala_test.benchmarks.bench_api_load import ROUTES, SECTION_SIZES, synthetic_ipo
+from iposhala_test.benchmarks.common import percentile, print_table, summarize
+from iposhala_test.scripts.ipo_fields import derive_fields
+from iposhala_test.scripts.price_bars import resample_bars
+
+
+def test_percentile_and_summarize():
+    latencies = [i / 1000 for i in range(1, 101)]
+    assert percentile(latencies, 50) == 0.05
+    assert percentile(latencies, 99) == 0.099
+    assert percentile([], 95) == 0.0
+    assert summarize("closed", latencies, 4, 2.0) == {
+        "name": "closed", "requests": 104, "errors": 4, "rps": 50.0,
+        "p50_ms": 50.0, "p95_ms": 95.0, "p99_ms": 99.0,
+    }
+
+
+def test_print_table_aligns_columns(capsys):
+    print_table([{"name": "search c=16", "rps": 1200.5}, {"name": "closed", "rps": 9}], ["name", "rps"])
+    assert capsys.readouterr().out.splitlines() == [
+        "name         rps   ",
+        "search c=16  1200.5",
+        "closed       9     ",
+    ]
+
+
+@pytest.fixture(scope="module")
+def universe():
+    rng = random.Random(1)
+    return [synthetic_ipo(rng, i, bar_days=30) for i in range(20)]
+
+
+def test_synthetic_ipos_go_through_the_deploy_steps(universe):
+    for doc in universe:
+        fields = derive_fields(doc)
+        assert fields["closed_at"] == datetime.strptime(doc["issue_information"]["issue_end_date"], "%d-%b-%Y")
+        assert fields["is_sme"] == (doc["security_type"] == "SME")
+        assert fields["metrics"]["listing_year"] == doc["listing_date"][-4:]
+
+        rows = doc["performance_table"]
+        assert len(rows) == 30
+        assert [r["date"] for r in rows] == sorted((r["date"] for r in rows), reverse=True)
+        assert all(r["low"] <= min(r["open"], r["close"]) and r["high"] >= max(r["open"], r["close"]) for r in rows)
+        assert resample_bars(rows, "1w")
+        assert {n: len(doc["nse_company"][n]["data"]) for n in SECTION_SIZES} == SECTION_SIZES
+
+
+def test_routes_resolve_on_the_api(universe):
+    from iposhala_test.api.server import app
+
+    symbols = [d["symbol"] for d in universe]
+    u = {
+        "symbols": symbols,
+        "years": {d["symbol"]: d["ipo_id"].rsplit("-", 1)[-1] for d in universe},
+        "queries": ["bhar", symbols[0][:5].lower()],
+    }
+    for name, build in ROUTES.items():
+        for path in build(u):
+            scope = {"type": "http", "method": "GET", "path": path.split("?")[0]}
+            assert any(route.matches(scope)[0] == Match.FULL for route in app.routes), (name, path)
+    assert ROUTES["ipo_detail"](u)[0] == f"/api/ipos/{universe[0]['ipo_id']}"
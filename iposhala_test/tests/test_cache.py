@@ -0,0 +1,101 @@
+import time
+import asyncio
+
+from iposhala_test.api.cache import ResponseCache
+
+
+def test_get_or_compute_counts_hits_and_misses():
+    cache = ResponseCache(maxsize=2)
+    # Skip the cache_epoch poll; there is no Mongo here
+    cache._epoch_checked_at = time.monotonic()
+    computed = []
+
+    async def compute():
+        computed.append(1)
+        return {"rows": [1, 2]}
+
+    async def main():
+        return [await cache.get_or_compute(("historical", "ABC", "1w"), compute) for _ in range(3)]
+
+    assert asyncio.run(main()) == [{"rows": [1, 2]}] * 3
+    assert len(computed) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.size == 1
+
+
+def test_size_is_bounded_by_maxsize():
+    cache = ResponseCache(maxsize=2)
+    for i in range(5):
+        cache.set(("k", i), i)
+    assert cache.size == 2
+    assert cache.get(("k", 0)) is None and cache.get(("k", 4)) == 4
+
+
+class FakeEpochs:
+    def __init__(self, epoch):
+        self.epoch = epoch
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return {"epoch": self.epoch}
+
+
+def test_epoch_bump_clears_cache_and_notifies_listeners(monkeypatch):
+    from iposhala_test.api import cache
+
+    epochs = FakeEpochs(1)
+    monkeypatch.setattr(cache, "cache_epoch", epochs)
+    monkeypatch.setattr(cache, "EPOCH_POLL_INTERVAL", 0)
+    response = ResponseCache()
+    notified = []
+    response.add_listener(lambda: notified.append(True))
+
+    async def main():
+        await response.sync_epoch()
+        response.set(("k",), "v")
+        await response.sync_epoch()
+        kept = response.get(("k",))
+        epochs.epoch = 2
+        await response.sync_epoch()
+        return kept
+
+    assert asyncio.run(main()) == "v"
+    assert response.get(("k",)) is None
+    assert response.epoch == 2
+    assert notified == [True]
+
+
+def test_epoch_is_polled_at_most_once_per_interval(monkeypatch):
+    from iposhala_test.api import cache
+
+    epochs = FakeEpochs(1)
+    monkeypatch.setattr(cache, "cache_epoch", epochs)
+    response = ResponseCache()
+
+    async def main():
+        for _ in range(10):
+            await response.sync_epoch()
+
+    asyncio.run(main())
+    assert epochs.reads == 1
+
+
+def test_cached_keys_on_route_params(monkeypatch):
+    from iposhala_test.api import cache
+
+    monkeypatch.setattr(cache.response_cache, "_epoch_checked_at", time.monotonic())
+    cache.response_cache.clear()
+    calls = []
+
+    @cache.cached()
+    async def route(type: str = None, limit: int = None):
+        calls.append((type, limit))
+        return [type, limit]
+
+    async def main():
+        return [await route(type="sme", limit=5), await route(limit=5, type="sme"), await route(type="main", limit=5)]
+
+    assert asyncio.run(main()) == [["sme", 5], ["sme", 5], ["main", 5]]
+    assert calls == [("sme", 5), ("main", 5)]
+    cache.response_cache.clear()
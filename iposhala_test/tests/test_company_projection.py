@@ -0,0 +1,82 @@
+import pytest
+from fastapi import HTTPException
+
+from iposhala_test.api.routes.company import LIGHT_PROFILE_EXCLUDE, MAX_FIELDS, company_projection, parse_field_list
+
+
+def test_parse_field_list_collapses_children_into_parents():
+    assert parse_field_list("nse_company.announcements, nse_company,company_name,company_name", "fields") == [
+        "company_name", "nse_company",
+    ]
+
+
+def test_parse_field_list_keeps_siblings_with_shared_prefix():
+    assert parse_field_list("nse_quote,nse_quote_updated_at", "fields") == ["nse_quote", "nse_quote_updated_at"]
+
+
+def test_parse_field_list_empty():
+    assert parse_field_list(None, "fields") == []
+    assert parse_field_list(" , ", "fields") == []
+
+
+@pytest.mark.parametrize("raw", ["$where", "a..b", "nse_company.$", "a b"])
+def test_parse_field_list_rejects_invalid_paths(raw):
+    with pytest.raises(HTTPException) as e:
+        parse_field_list(raw, "fields")
+    assert e.value.status_code == 400
+
+
+def test_parse_field_list_limits_paths():
+    with pytest.raises(HTTPException) as e:
+        parse_field_list(",".join(f"f{i}" for i in range(MAX_FIELDS + 1)), "fields")
+    assert e.value.status_code == 400
+
+
+def test_projection_fields_always_include_symbol():
+    assert company_projection("company_name", None, "light") == {"_id": 0, "company_name": 1, "symbol": 1}
+
+
+def test_projection_symbol_child_does_not_collide():
+    assert company_projection("symbol.x,company_name", None, "light") == {"_id": 0, "company_name": 1, "symbol": 1}
+
+
+def test_projection_light_profile_excludes_heavy_parts():
+    projection = company_projection(None, "gmp_history,nse_quote.info", "light")
+    assert projection == {"_id": 0, **{p: 0 for p in sorted(set(LIGHT_PROFILE_EXCLUDE) | {"nse_quote.info"})}}
+
+
+def test_projection_full_profile():
+    assert company_projection(None, None, "full") == {"_id": 0}
+    assert company_projection(None, "nse_company", "full") == {"_id": 0, "nse_company": 0}
+
+
+def test_projection_fields_and_exclude_are_exclusive():
+    with pytest.raises(HTTPException) as e:
+        company_projection("company_name", "nse_company", "light")
+    assert e.value.status_code == 400
+
+
+def test_projection_refused_by_mongo_is_a_400(monkeypatch):
+    import asyncio
+    from pymongo.errors import OperationFailure
+    from iposhala_test.api.routes import company
+
+    async def fetch(symbol, projection):
+        raise OperationFailure("Path collision at a.b", code=31250, details={"errmsg": "Path collision at a.b"})
+
+    monkeypatch.setattr(company, "fetch", fetch)
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(company.company_full("ABC", fields="a.b", exclude=None, profile="light"))
+    assert e.value.status_code == 400
+    assert "Path collision" in e.value.detail
+
+
+def test_parse_query_date():
+    from datetime import datetime
+    from iposhala_test.api.routes.company import parse_query_date
+
+    assert parse_query_date(None, "from") is None
+    assert parse_query_date("2024-02-29", "from") == datetime(2024, 2, 29)
+    with pytest.raises(HTTPException) as e:
+        parse_query_date("2024-02-30", "to")
+    assert e.value.status_code == 400
@@ -0,0 +1,35 @@
+from iposhala_test.api.routes.company import unpack_section_pages
+from iposhala_test.scripts.company_sections import needs_normalizing, normalize_section
+
+ANNOUNCEMENTS = [
+    {"desc": "old", "an_dt": "01-Jan-2023 10:00:00"},
+    {"desc": "undated"},
+    {"desc": "new", "an_dt": "05-Mar-2024 09:30:00"},
+]
+
+
+def test_normalize_section_sorts_without_storing_sort_keys():
+    section = normalize_section({"available": True, "data": ANNOUNCEMENTS}, "announcements")
+
+    assert [x["desc"] for x in section["payload"]] == ["new", "old", "undated"]
+    assert all("sort_key" not in x for x in section["payload"])
+    assert section["count"] == 3 and section["sorted"] is True
+
+
+def test_normalize_section_drops_stored_sort_keys():
+    legacy = {"sorted": True, "payload": [dict(x, sort_key="stale") for x in ANNOUNCEMENTS]}
+
+    assert needs_normalizing(legacy)
+    section = normalize_section(legacy, "announcements")
+    assert all("sort_key" not in x for x in section["payload"])
+    assert not needs_normalizing(section)
+
+
+def test_unsorted_sections_are_paged_without_sort_keys():
+    row = {"symbol": "ABC", "sections": {"announcements": {"sorted": False, "raw": {"data": ANNOUNCEMENTS}}}}
+
+    _, pages = unpack_section_pages(row, {"announcements": 2})
+    items, count = pages["announcements"]
+    assert [x["desc"] for x in items] == ["new", "old"]
+    assert all("sort_key" not in x for x in items)
+    assert count == 3
@@ -0,0 +1,71 @@
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from iposhala_test.api.compression import MINIMUM_SIZE, CompressionMiddleware, compress, negotiate
+
+BIG = [{"symbol": f"SYM{i}", "name": "Example Industries Limited"} for i in range(100)]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/big")
+    async def big():
+        return BIG
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b"x" * MINIMUM_SIZE * 2]), media_type="text/plain")
+
+    @app.get("/binary")
+    async def binary():
+        return PlainTextResponse("x" * MINIMUM_SIZE * 2, media_type="application/pdf")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("identity", ""),
+    (None, ""),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header) == expected
+
+
+@pytest.mark.parametrize("encoding, decompress", [("br", brotli.decompress), ("gzip", gzip.decompress)])
+def test_compress(encoding, decompress):
+    body = b'{"symbol": "ABC"}' * 100
+    assert decompress(compress(body, encoding)) == body
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_large_json_is_compressed(client, encoding):
+    res = client.get("/big", headers={"Accept-Encoding": encoding})
+    assert res.headers["content-encoding"] == encoding
+    assert res.headers["vary"] == "Accept-Encoding"
+    raw = client.get("/big", headers={"Accept-Encoding": "identity"}).content
+    assert len(raw) >= MINIMUM_SIZE
+    # httpx decodes gzip / br transparently
+    assert res.content == raw
+    assert int(res.headers["content-length"]) < len(raw)
+
+
+@pytest.mark.parametrize("path", ["/small", "/stream", "/binary"])
+def test_small_streamed_and_binary_pass_through(client, path):
+    res = client.get(path, headers={"Accept-Encoding": "br, gzip"})
+    assert res.status_code == 200
+    assert "content-encoding" not in res.headers
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from iposhala_test.api.cache import response_cache
+from iposhala_test.api.conditional import ConditionalGetMiddleware, etag_matches, is_validated
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+    app = FastAPI()
+    app.add_middleware(ConditionalGetMiddleware)
+
+    @app.get("/api/ipos/live")
+    async def live(type: str = None):
+        calls.append(type)
+        return [{"symbol": "ABC"}]
+
+    @app.get("/api/ipos/missing")
+    async def missing():
+        raise HTTPException(status_code=404)
+
+    @app.get("/health/live")
+    async def health():
+        return {"ok": True}
+
+    # Skip the cache_epoch poll; there is no Mongo here
+    monkeypatch.setattr(response_cache, "_epoch", 7)
+    monkeypatch.setattr(response_cache, "_epoch_checked_at", time.monotonic())
+    return TestClient(app), calls
+
+
+def test_etag_and_304(client):
+    client, calls = client
+    first = client.get("/api/ipos/live")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert etag.startswith('W/"7-')
+    assert first.headers["cache-control"] == "no-cache"
+
+    again = client.get("/api/ipos/live", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    # The route did not run for the 304
+    assert calls == [None]
+
+
+def test_etag_varies_with_query_and_epoch(client, monkeypatch):
+    client, _ = client
+    etag = client.get("/api/ipos/live").headers["etag"]
+    assert client.get("/api/ipos/live?type=sme").headers["etag"] != etag
+    assert client.get("/api/ipos/live?type=sme", headers={"If-None-Match": etag}).status_code == 200
+
+    monkeypatch.setattr(response_cache, "_epoch", 8)
+    assert client.get("/api/ipos/live", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_no_validators_on_errors_other_paths_or_unknown_epoch(client, monkeypatch):
+    client, _ = client
+    assert "etag" not in client.get("/api/ipos/missing").headers
+    assert "etag" not in client.get("/health/live").headers
+
+    monkeypatch.setattr(response_cache, "_epoch", None)
+    assert "etag" not in client.get("/api/ipos/live").headers
+
+
+def test_etag_matches():
+    assert etag_matches('W/"7-abc"', 'W/"7-abc"')
+    assert etag_matches('"x", "7-abc"', 'W/"7-abc"')
+    assert etag_matches("*", 'W/"7-abc"')
+    assert not etag_matches('W/"6-abc"', 'W/"7-abc"')
+    assert not etag_matches(None, 'W/"7-abc"')
+
+
+def test_is_validated():
+    assert is_validated("/api/company/ABC/tabs")
+    assert not is_validated("/api/ipos/debug/x")
+    assert not is_validated("/api/export/")
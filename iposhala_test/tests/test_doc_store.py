@@ -0,0 +1,57 @@
+import os
+import time
+
+from iposhala_test.api.doc_store import DocumentStore
+
+
+def age(store, url, seconds):
+    path = store._paths(store.key(url))[0]
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def wait_for_eviction(store):
+    if store._evict_thread:
+        store._evict_thread.join(5)
+
+
+def test_size_is_scanned_once_then_tracked(tmp_path, monkeypatch):
+    store = DocumentStore(root=str(tmp_path), max_bytes=10 ** 6)
+    scans = []
+    scan = store._scan
+    monkeypatch.setattr(store, "_scan", lambda: scans.append(1) or scan())
+
+    for i in range(5):
+        store.put(f"https://example.com/{i}.pdf", [b"x" * 100], "application/pdf")
+    store.put("https://example.com/0.pdf", [b"x" * 40], "application/pdf")
+
+    assert len(scans) == 1
+    assert store.total_bytes() == 440
+    assert store._evict_thread is None
+
+
+def test_eviction_drops_oldest_but_spares_recent_and_committed(tmp_path):
+    store = DocumentStore(root=str(tmp_path), max_bytes=250, grace_seconds=60)
+    for i in range(3):
+        store.put(f"https://example.com/{i}.pdf", [b"x" * 100], "application/pdf")
+        age(store, f"https://example.com/{i}.pdf", 3600 - i)
+    wait_for_eviction(store)
+
+    # 0.pdf is the least recently used, 3.pdf is the one being committed
+    store.put("https://example.com/3.pdf", [b"x" * 100], "application/pdf")
+    wait_for_eviction(store)
+
+    assert store.get("https://example.com/0.pdf") is None
+    assert store.get("https://example.com/1.pdf") is None
+    assert store.get("https://example.com/2.pdf") is not None
+    assert store.get("https://example.com/3.pdf") is not None
+    assert store.total_bytes() == 200
+
+
+def test_oversized_document_survives_its_own_commit(tmp_path):
+    store = DocumentStore(root=str(tmp_path), max_bytes=50, grace_seconds=0)
+    meta = store.put("https://example.com/big.pdf", [b"x" * 100], "application/pdf")
+    wait_for_eviction(store)
+
+    assert os.path.exists(meta["path"])
+    assert store.get("https://example.com/big.pdf")["size"] == 100
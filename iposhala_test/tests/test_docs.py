@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from iposhala_test.api.doc_store import DocumentStore
+from iposhala_test.api.routes import docs
+
+
+URL = "https://nsearchives.nseindia.com/content/ipo/RHP_ABC.pdf"
+BODY = [b"%PDF-1.7 ", b"page one ", b"page two"]
+
+
+class FakeUpstream:
+    headers = {"Content-Type": "application/pdf"}
+
+    def __init__(self):
+        self.closed = False
+
+    async def aiter_bytes(self, chunk_size=None):
+        for chunk in BODY:
+            yield chunk
+
+    async def aclose(self):
+        self.closed = True
+
+
+def request():
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+
+async def read(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = DocumentStore(root=str(tmp_path), max_bytes=10 ** 6)
+    opened = []
+
+    async def open_upstream(url):
+        opened.append(url)
+        return FakeUpstream()
+
+    monkeypatch.setattr(docs, "doc_store", store)
+    monkeypatch.setattr(docs, "open_upstream", open_upstream)
+    # Replaced per test by run(): the semaphore must belong to the test's loop
+    monkeypatch.setattr(docs, "download_slots", None)
+    store.opened = opened
+    return store
+
+
+def run(coro_fn):
+    async def scenario():
+        docs.download_slots = asyncio.Semaphore(docs.MAX_CONCURRENT_DOWNLOADS)
+        return await coro_fn()
+    return asyncio.run(scenario())
+
+
+def test_lock_entries_are_dropped_once_unused():
+    async def scenario():
+        first = docs.DownloadLock.for_url(URL)
+        assert await first.acquire(1)
+        second = docs.DownloadLock.for_url(URL)
+        waiter = asyncio.create_task(second.acquire(1))
+        await asyncio.sleep(0)
+        first.release()
+        assert await waiter
+        assert list(docs.download_locks.values()) == [second]
+        second.release()
+        return dict(docs.download_locks)
+
+    assert asyncio.run(scenario()) == {}
+
+
+def test_lock_wait_times_out():
+    async def scenario():
+        holder = docs.DownloadLock.for_url(URL)
+        await holder.acquire(1)
+        waiter = docs.DownloadLock.for_url(URL)
+        acquired = await waiter.acquire(0.01)
+        users = holder.users
+        holder.release()
+        return acquired, users, dict(docs.download_locks)
+
+    acquired, users, left = asyncio.run(scenario())
+    assert acquired is False
+    assert users == 1
+    assert left == {}
+
+
+def test_download_is_stored_then_served_from_store(store):
+    async def scenario():
+        body = await read(await docs.serve_doc(request(), URL, "ABC_rhp"))
+        again = await docs.serve_doc(request(), URL, "ABC_rhp")
+        return body, again
+
+    body, again = run(scenario)
+    assert body == b"".join(BODY)
+    assert again.path == store.get(URL)["path"]
+    assert store.opened == [URL]
+    assert docs.download_locks == {}
+
+
+def test_slow_first_viewer_does_not_block_others(store, monkeypatch):
+    monkeypatch.setattr(docs, "DOWNLOAD_LOCK_TIMEOUT", 0.01)
+
+    async def scenario():
+        # First viewer holds the URL's lock until its body is read
+        first = await docs.serve_doc(request(), URL, "ABC_rhp")
+        second = await docs.serve_doc(request(), URL, "ABC_rhp")
+        proxied = await read(second)
+        stored_before_first = store.get(URL)
+        stored = await read(first)
+        return proxied, stored_before_first, stored
+
+    proxied, stored_before_first, stored = run(scenario)
+    assert proxied == stored == b"".join(BODY)
+    # Only the lock holder writes the store
+    assert stored_before_first is None
+    assert store.get(URL)["size"] == len(b"".join(BODY))
+    assert docs.download_locks == {}
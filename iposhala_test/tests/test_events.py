@@ -0,0 +1,66 @@
+import asyncio
+
+from iposhala_test.api.events import LiveEventBroker
+
+
+def tailers():
+    return [t for t in asyncio.all_tasks() if t.get_coro().__name__ == "_tail" and not t.done()]
+
+
+def test_concurrent_subscribes_share_one_tailer():
+    async def scenario():
+        broker = LiveEventBroker()
+        polls = []
+
+        async def latest_seq():
+            # Slow first read: every subscribe lands while it is in flight
+            await asyncio.sleep(0.05)
+            return 7
+
+        async def poll():
+            polls.append(broker._last_seq)
+
+        broker.latest_seq = latest_seq
+        broker.poll = poll
+
+        subs = await asyncio.gather(*(broker.subscribe() for _ in range(50)))
+        await asyncio.sleep(0.1)
+        running = tailers()
+        last_seq = broker._last_seq
+
+        await broker.close()
+        await asyncio.sleep(0)
+        return len(subs), len(running), last_seq, tailers()
+
+    subscribed, running, last_seq, left = asyncio.run(scenario())
+    assert subscribed == 50
+    assert running == 1
+    assert last_seq == 7
+    assert left == []
+
+
+def test_tailer_restarts_after_going_idle():
+    async def scenario():
+        broker = LiveEventBroker()
+
+        async def latest_seq():
+            return 0
+
+        async def poll():
+            pass
+
+        broker.latest_seq = latest_seq
+        broker.poll = poll
+
+        sub = await broker.subscribe()
+        first = broker._task
+        broker.unsubscribe(sub)
+        await asyncio.sleep(0)
+        await first
+        await broker.subscribe()
+        second = broker._task
+        await broker.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first is not second
@@ -0,0 +1,24 @@
+import orjson
+from datetime import datetime
+
+from iposhala_test.scripts.ipo_export import (
+    DEFAULT_BATCH_SIZE, WHOLE_DOCUMENT_BATCH_SIZE, SOURCE_COLUMN, effective_batch_size, ndjson_batch,
+)
+from iposhala_test.api.routes.export import orjson_line
+
+
+def test_whole_document_batches_are_capped():
+    assert effective_batch_size(None, DEFAULT_BATCH_SIZE) == WHOLE_DOCUMENT_BATCH_SIZE
+    assert effective_batch_size(None, 10) == 10
+    assert effective_batch_size(["symbol"], DEFAULT_BATCH_SIZE) == DEFAULT_BATCH_SIZE
+
+
+def test_ndjson_batch_with_orjson_lines():
+    docs = [{"symbol": "ABC", "closed_at": datetime(2024, 1, 2)}, {"symbol": "XYZ", "closed_at": None}]
+    lines = ndjson_batch(docs, None, "past", orjson_line).splitlines()
+    assert [orjson.loads(l) for l in lines] == [
+        {"symbol": "ABC", "closed_at": "2024-01-02T00:00:00", SOURCE_COLUMN: "past"},
+        {"symbol": "XYZ", "closed_at": None, SOURCE_COLUMN: "past"},
+    ]
+    # The stdlib encoder (CLI) writes the same rows
+    assert [orjson.loads(l) for l in ndjson_batch(docs, None, "past").splitlines()] == [orjson.loads(l) for l in lines]
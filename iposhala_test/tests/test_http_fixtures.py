@@ -0,0 +1,132 @@
+import time
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import NoSuchElementException
+
+from iposhala_test.scrapers.http_fixtures import (
+    RECORD, REPLAY, FixtureMiss, RecordingDriver, ReplayDriver, find_nodes, fixture_driver, fixture_session,
+    fixtures, upstream_pause, use_fixtures,
+)
+
+URL = "https://www.nseindia.com/api/ipo-current-issue"
+PAGE = """
+<html><body>
+  <table id="gmp"><tr class="row live"><td>ABC Ltd</td><td>₹ 45</td></tr><tr class="row"><td>XYZ</td><td>-</td></tr></table>
+  <button>Load More</button><a href="/next">Next page</a>
+</body></html>
+"""
+
+
+def upstream_response(adapter, request, **kwargs):
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.headers["content-type"] = "application/json"
+    response._content = '[{"symbol": "ABC", "companyName": "Ä Ltd"}]'.encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = request.url
+    return response
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    fixtures.reset_stats()
+    yield
+    fixtures.reset_stats()
+
+
+def test_inactive_session_uses_the_default_adapter():
+    assert type(fixture_session().get_adapter(URL)) is HTTPAdapter
+
+
+def test_record_then_replay_http(tmp_path, monkeypatch):
+    monkeypatch.setattr(HTTPAdapter, "send", upstream_response)
+    with use_fixtures(RECORD, str(tmp_path)):
+        recorded = fixture_session().get(URL).json()
+    assert len(list(tmp_path.iterdir())) == 1
+
+    monkeypatch.setattr(HTTPAdapter, "send", lambda *a, **k: pytest.fail("replay went to the network"))
+    with use_fixtures(REPLAY, str(tmp_path)):
+        res = fixture_session().get(URL)
+        assert res.status_code == 200
+        assert res.headers["Content-Type"] == "application/json"
+        assert res.json() == recorded == [{"symbol": "ABC", "companyName": "Ä Ltd"}]
+
+        with pytest.raises(FixtureMiss):
+            fixture_session().get(URL + "?index=sme")
+        # Scrapers catching requests errors handle a miss like an outage
+        assert issubclass(FixtureMiss, requests.ConnectionError)
+    assert fixtures.stats == {"http": 3, "pages": 0, "misses": 1}
+    assert not fixtures.active
+
+
+def test_configure_validates():
+    with pytest.raises(ValueError):
+        fixtures.configure("rewind", "/tmp/x")
+    with pytest.raises(ValueError):
+        fixtures.configure(REPLAY)
+
+
+def test_find_nodes():
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(PAGE, "html.parser")
+    assert len(find_nodes(soup, "tag name", "tr")) == 2
+    assert find_nodes(soup, "id", "gmp")[0].name == "table"
+    assert [n.get_text() for n in find_nodes(soup, "css selector", "tr.live td")] == ["ABC Ltd", "₹ 45"]
+    assert [n.name for n in find_nodes(soup, "xpath", "//*[contains(text(), 'Load More') or contains(text(), 'Next')]")] == ["button", "a"]
+    assert [n.name for n in find_nodes(soup, "xpath", "//table[contains(text(), 'ABC')]")] == []
+    with pytest.raises(ValueError):
+        find_nodes(soup, "link text", "Next")
+
+
+class FakeChrome:
+    def __init__(self):
+        self.page_source = None
+
+    def get(self, url):
+        self.page_source = PAGE
+
+    def get_cookies(self):
+        return [{"name": "nsit", "value": "abc"}]
+
+    def find_elements(self, by, value):
+        return []
+
+    def set_page_load_timeout(self, seconds):
+        self.timeout = seconds
+
+
+def test_record_then_replay_pages(tmp_path):
+    with use_fixtures(RECORD, str(tmp_path)):
+        driver = fixture_driver(FakeChrome)
+        assert isinstance(driver, RecordingDriver)
+        driver.set_page_load_timeout(30)
+        driver.get("https://www.investorgain.com/report/live-ipo-gmp/331/")
+        driver.find_elements("tag name", "tr")
+
+    with use_fixtures(REPLAY, str(tmp_path)):
+        driver = fixture_driver(lambda: pytest.fail("replay started Chrome"))
+        assert isinstance(driver, ReplayDriver)
+        driver.get("https://www.investorgain.com/report/live-ipo-gmp/331/")
+        assert driver.get_cookies() == [{"name": "nsit", "value": "abc"}]
+
+        table = driver.find_element("id", "gmp")
+        rows = table.find_elements("css selector", "tr")
+        assert [r.text for r in rows] == ["ABC Ltd ₹ 45", "XYZ -"]
+        assert rows[0].get_attribute("class") == "row live"
+        with pytest.raises(NoSuchElementException):
+            driver.find_element("id", "missing")
+        with pytest.raises(FixtureMiss):
+            driver.get("https://www.investorgain.com/report/live-ipo-gmp/332/")
+    assert fixtures.stats == {"http": 0, "pages": 3, "misses": 1}
+
+
+def test_upstream_pause_is_skipped_when_replaying(tmp_path, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    upstream_pause(2)
+    with use_fixtures(REPLAY, str(tmp_path)):
+        upstream_pause(2)
+    assert sleeps == [2]
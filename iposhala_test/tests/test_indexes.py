@@ -0,0 +1,82 @@
+import pytest
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from iposhala_test.scripts import indexes, mongo
+from iposhala_test.scripts.indexes import INDEXES, ensure_indexes, normalize_keys
+
+
+class FakeCollection:
+    def __init__(self, info=None, fail=False):
+        self.info = info or {"_id_": {"key": [("_id", 1)]}}
+        self.fail = fail
+        self.created = []
+
+    def index_information(self):
+        return self.info
+
+    def create_index(self, keys, name, **options):
+        if self.fail:
+            raise OperationFailure("too many indexes")
+        self.created.append((name, keys, options))
+
+
+class FakeDb(dict):
+    def __missing__(self, name):
+        return self.setdefault(name, FakeCollection())
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDb()
+    monkeypatch.setattr(mongo, "db", db, raising=False)
+    monkeypatch.setattr(indexes, "ensure_collection", lambda name: "exists")
+    return db
+
+
+def statuses(results):
+    return {r["index"]: r["status"] for r in results}
+
+
+def test_declared_index_names_are_unique():
+    for specs in INDEXES.values():
+        assert len({s["name"] for s in specs}) == len(specs)
+
+
+def test_normalize_keys():
+    assert normalize_keys({"a": 1.0, "b": -1, "c": "text"}.items()) == [("a", 1), ("b", -1), ("c", "text")]
+
+
+def test_creates_missing_indexes_with_options(db):
+    results = ensure_indexes(["pipeline_jobs"])
+    assert statuses(results) == {"active_key": "created", "status_created_at": "created"}
+    assert db["pipeline_jobs"].created[0] == ("active_key", [("active_key", ASCENDING)], {"unique": True, "sparse": True})
+
+
+def test_existing_indexes_are_left_alone(db):
+    db["ipo_gmp"] = FakeCollection({
+        "ipo_id": {"key": [("ipo_id", 1.0)]},
+        # Same keys under the name an older deploy gave it
+        "lastUpdated_-1": {"key": [("lastUpdated", -1)]},
+    })
+    assert statuses(ensure_indexes(["ipo_gmp"])) == {"ipo_id": "ok", "last_updated": "ok (as lastUpdated_-1)"}
+    assert db["ipo_gmp"].created == []
+
+
+def test_name_clash_is_reported_not_replaced(db):
+    db["ipo_gmp"] = FakeCollection({"ipo_id": {"key": [("ipo_id", DESCENDING)]}})
+    assert statuses(ensure_indexes(["ipo_gmp"]))["ipo_id"] == "conflict"
+    assert [name for name, _, _ in db["ipo_gmp"].created] == ["last_updated"]
+
+
+def test_dry_run_reports_without_creating(db, monkeypatch):
+    monkeypatch.setattr(indexes, "ensure_collection", lambda name: pytest.fail("dry run created a collection"))
+    results = ensure_indexes(dry_run=True)
+    assert {r["status"] for r in results} == {"missing"}
+    assert len(results) == sum(len(specs) for specs in INDEXES.values())
+    assert all(c.created == [] for c in db.values())
+
+
+def test_create_failure_is_reported(db):
+    db["ipo_price_bars"] = FakeCollection(fail=True)
+    assert statuses(ensure_indexes(["ipo_price_bars"]))["symbol_ts"].startswith("error: too many indexes")
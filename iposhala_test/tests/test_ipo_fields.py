@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from iposhala_test.scripts.ipo_fields import closed_date_source, derive_fields, parse_ipo_date
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("22-Oct-2024", datetime(2024, 10, 22)),
+    ("22-Oct-24", datetime(2024, 10, 22)),
+    ("2024-10-22", datetime(2024, 10, 22)),
+    ("22-10-2024", datetime(2024, 10, 22)),
+    ("October 22, 2024", datetime(2024, 10, 22)),
+    ("2024-10-22T09:15:00.250", datetime(2024, 10, 22, 9, 15, 0, 250000)),
+    (datetime(2024, 10, 22, tzinfo=timezone.utc), datetime(2024, 10, 22)),
+    ("-", None),
+    ("", None),
+    ("soon", None),
+])
+def test_parse_ipo_date(raw, expected):
+    assert parse_ipo_date(raw) == expected
+
+
+def test_closed_date_source_priority():
+    quote = {"nse_quote": {"metadata": {"listingDate": "30-Oct-2024"}}}
+    assert closed_date_source({"issue_information": {"issue_end_date": "22-Oct-2024"}, "issue_end_date": "x", **quote}) == "22-Oct-2024"
+    assert closed_date_source({"issue_end_date": "23-Oct-2024", **quote}) == "23-Oct-2024"
+    assert closed_date_source(quote) == "30-Oct-2024"
+    assert closed_date_source({}) is None
+
+
+def test_derive_fields_closed_at_and_metrics():
+    doc = {
+        "symbol": "ABC",
+        "security_type": "SME",
+        "price_range": "Rs.95 to Rs.100",
+        "listing_date": "29-Oct-2024",
+        "issue_information": {"issue_end_date": "24-Oct-2024"},
+        "nse_quote": {"price_info": {"open": "125.5"}},
+    }
+    fields = derive_fields(doc)
+
+    assert fields["closed_at"] == datetime(2024, 10, 24)
+    assert fields["is_sme"] is True
+    assert fields["metrics"] == {
+        "issue_price_upper": 100.0, "open_price": 125.5, "listing_gain_pct": 25.5, "listing_year": "2024",
+    }
+
+
+def test_derive_fields_without_dates_or_prices():
+    fields = derive_fields({"symbol": "XYZ"})
+    assert fields["closed_at"] is None
+    assert fields["is_sme"] is False
+    assert fields["metrics"]["listing_gain_pct"] == 0 and fields["metrics"]["listing_year"] is None
+
+
+def test_closed_cursor_round_trip():
+    from iposhala_test.api.server import decode_closed_cursor, encode_closed_cursor
+
+    closed_at = datetime(2024, 10, 24, 0, 0)
+    assert decode_closed_cursor(encode_closed_cursor(closed_at, "ABC|X")) == (closed_at, "ABC|X")
+    with pytest.raises(HTTPException) as e:
+        decode_closed_cursor("not-a-cursor")
+    assert e.value.status_code == 400
@@ -0,0 +1,101 @@
+import time
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from iposhala_test.scripts import ipo_stats
+from iposhala_test.scripts.ipo_stats import STATS_FIELDS, STATS_ID, STATS_PIPELINE, is_fresh, shape_stats
+
+AGGREGATED = {"upcoming": 3, "current": 2, "listed": 1500, "sme": 610, "gmp": 40}
+
+
+def test_pipeline_projects_every_stats_field():
+    assert set(STATS_PIPELINE[-1]["$project"]) == set(STATS_FIELDS)
+
+
+def test_shape_stats():
+    assert shape_stats({**AGGREGATED, "_id": STATS_ID, "computed_at": datetime.now()}) == AGGREGATED
+    assert shape_stats(None) == {k: 0 for k in STATS_FIELDS}
+    assert shape_stats({"listed": 7.0, "sme": None}) == {"upcoming": 0, "current": 0, "listed": 7, "sme": 0, "gmp": 0}
+
+
+def test_is_fresh():
+    now = datetime.now(timezone.utc)
+    assert is_fresh({"computed_at": now})
+    # Mongo hands back naive UTC datetimes
+    assert is_fresh({"computed_at": now.replace(tzinfo=None) - timedelta(minutes=5)})
+    assert not is_fresh({"computed_at": now - ipo_stats.STATS_MAX_AGE - timedelta(seconds=1)})
+    assert not is_fresh({})
+    assert not is_fresh(None)
+
+
+class FakeStats:
+    def __init__(self):
+        self.updates = []
+
+    def update_one(self, query, update, upsert=False):
+        self.updates.append((query, update, upsert))
+
+
+class FakeLive:
+    def aggregate(self, pipeline):
+        assert pipeline is STATS_PIPELINE
+        return iter([dict(AGGREGATED)])
+
+
+def test_refresh_stats_snapshot_writes_shaped_counts(monkeypatch):
+    stats = FakeStats()
+    monkeypatch.setattr(ipo_stats, "ipo_stats", stats)
+    monkeypatch.setattr(ipo_stats, "ipo_live_upcoming", FakeLive())
+
+    assert ipo_stats.refresh_stats_snapshot() == AGGREGATED
+    (query, update, upsert), = stats.updates
+    assert query == {"_id": STATS_ID} and upsert
+    assert {k: update["$set"][k] for k in STATS_FIELDS} == AGGREGATED
+    assert is_fresh(update["$set"])
+
+
+class AsyncStats:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    async def find_one(self, query):
+        return self.snapshot
+
+
+class AsyncLive:
+    def __init__(self):
+        self.aggregations = 0
+
+    async def aggregate(self, pipeline):
+        self.aggregations += 1
+
+        class Cursor:
+            async def to_list(self, length):
+                return [dict(AGGREGATED)]
+        return Cursor()
+
+
+@pytest.mark.parametrize("computed_at, aggregations", [
+    (datetime.now(timezone.utc), 0),
+    (datetime.now(timezone.utc) - timedelta(hours=3), 1),
+])
+def test_stats_route_uses_fresh_snapshot_else_aggregates(monkeypatch, computed_at, aggregations):
+    from iposhala_test.api import server
+    from iposhala_test.api.cache import response_cache
+
+    live = AsyncLive()
+    snapshot = {"_id": STATS_ID, **{k: v + 1 for k, v in AGGREGATED.items()}, "computed_at": computed_at}
+    monkeypatch.setattr(server, "ipo_stats", AsyncStats(snapshot))
+    monkeypatch.setattr(server, "ipo_live_upcoming", live)
+    response_cache.clear()
+    # Skip the cache_epoch poll; there is no Mongo here
+    monkeypatch.setattr(response_cache, "_epoch_checked_at", time.monotonic())
+
+    body = asyncio.run(server.get_ipo_stats())
+
+    assert set(body) == set(STATS_FIELDS)
+    assert body == (shape_stats(snapshot) if aggregations == 0 else AGGREGATED)
+    assert live.aggregations == aggregations
+    response_cache.clear()
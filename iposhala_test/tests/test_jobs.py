@@ -0,0 +1,59 @@
+import importlib
+
+import pytest
+
+from iposhala_test.scripts.jobs import JOBS, UnknownJob, run_job
+
+
+@pytest.mark.parametrize("name", sorted(JOBS))
+def test_registered_jobs_import(name):
+    assert callable(importlib.import_module(JOBS[name]).run)
+
+
+def test_unknown_job():
+    with pytest.raises(UnknownJob):
+        run_job("no_such_job")
+
+
+@pytest.fixture
+def jobs_client(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from iposhala_test.api.routes import jobs
+
+    queued = []
+
+    def enqueue(name):
+        queued.append(name)
+        return {"_id": "job-1", "name": name, "status": "queued"}, True
+
+    monkeypatch.setattr(jobs, "enqueue_job", enqueue)
+    monkeypatch.setattr(jobs, "shape_job", lambda job: dict(job))
+    monkeypatch.setattr(jobs, "JOBS_ADMIN_TOKEN", "s3cret")
+    app = FastAPI()
+    app.include_router(jobs.router)
+    return TestClient(app), queued
+
+
+def test_public_job_needs_no_token(jobs_client):
+    client, queued = jobs_client
+    assert client.post("/api/jobs/gmp").status_code == 202
+    assert queued == ["gmp"]
+
+
+def test_other_jobs_need_the_admin_token(jobs_client):
+    client, queued = jobs_client
+    assert client.post("/api/jobs/nse_company_dynamic").status_code == 403
+    assert client.post("/api/jobs/nse_company_dynamic", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.post("/api/jobs/nse_company_dynamic", headers={"X-Admin-Token": "s3cret"}).status_code == 202
+    assert client.post("/api/jobs/no_such_job", headers={"X-Admin-Token": "s3cret"}).status_code == 404
+    assert queued == ["nse_company_dynamic"]
+
+
+def test_admin_jobs_disabled_without_configured_token(jobs_client, monkeypatch):
+    from iposhala_test.api.routes import jobs
+
+    client, queued = jobs_client
+    monkeypatch.setattr(jobs, "JOBS_ADMIN_TOKEN", None)
+    assert client.post("/api/jobs/nse_company_dynamic", headers={"X-Admin-Token": ""}).status_code == 403
+    assert queued == []
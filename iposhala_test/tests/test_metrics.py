@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from iposhala_test.api import metrics
+from iposhala_test.api.cache import response_cache
+from iposhala_test.api.metrics import (
+    CallbackMetric, Counter, Histogram, MetricsMiddleware, Registry, cache_lookups, current_request,
+    mongo_command_metrics, upstream_label,
+)
+from iposhala_test.api.nse_client import quote_cache
+from iposhala_test.api.routes.metrics import cache_hit_ratios
+
+
+def test_counter_and_histogram_render():
+    registry = Registry()
+    hits = registry.register(Counter("hits_total", "Hits", ("cache",)))
+    latency = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+    hits.inc(cache='say "hi"')
+    hits.inc(2, cache='say "hi"')
+    latency.observe(0.1, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+
+    assert registry.render().splitlines() == [
+        "# HELP hits_total Hits",
+        "# TYPE hits_total counter",
+        'hits_total{cache="say \\"hi\\""} 3.0',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.6',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_failing_callback_renders_header_only():
+    def broken():
+        raise RuntimeError("gone")
+
+    assert CallbackMetric("queue_size", "Queue", (), broken).render() == ["# HELP queue_size Queue", "# TYPE queue_size gauge"]
+
+
+@pytest.mark.parametrize("path, label", [
+    ("/", "warm_up"),
+    ("/api/quote-equity", "/api/quote-equity"),
+    ("/content/equities/IPO/ABC/rhp.pdf", "document"),
+])
+def test_upstream_label(path, label):
+    assert upstream_label(path) == label
+
+
+def test_cache_hit_ratios(monkeypatch):
+    monkeypatch.setattr(response_cache, "hits", 3)
+    monkeypatch.setattr(response_cache, "misses", 1)
+    monkeypatch.setattr(quote_cache, "hits", 0)
+    monkeypatch.setattr(quote_cache, "stale_hits", 1)
+    monkeypatch.setattr(quote_cache, "misses", 1)
+    monkeypatch.setattr(cache_lookups, "_values", {("company_doc", "hit"): 0.0, ("search", "proxied"): 4.0})
+
+    assert cache_hit_ratios() == {("response",): 0.75, ("nse_quote",): 0.5, ("search",): 0.0}
+
+
+def test_middleware_times_by_route_template_and_counts_mongo(monkeypatch):
+    durations = Histogram("d", "", ("method", "route", "status"))
+    commands = Histogram("c", "", ("route",), buckets=metrics.COUNT_BUCKETS)
+    monkeypatch.setattr(metrics, "http_request_duration", durations)
+    monkeypatch.setattr(metrics, "request_mongo_commands", commands)
+    monkeypatch.setattr(metrics, "request_mongo_duration", Histogram("s", "", ("route",)))
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/api/company/{symbol}")
+    async def company(symbol: str):
+        # What pymongo publishes for two finds on the request's task
+        for _ in range(2):
+            mongo_command_metrics.succeeded(SimpleNamespace(duration_micros=1500, command_name="find"))
+        return {"symbol": symbol, "tracked": current_request.get() is not None}
+
+    client = TestClient(app)
+    assert client.get("/api/company/ABC").json()["tracked"]
+    client.get("/api/company/XYZ")
+    client.get("/nowhere")
+    client.get("/health/live")
+
+    routes = {key: entry[0] for key, entry in durations._values.items()}
+    assert set(routes) == {("GET", "/api/company/{symbol}", "200"), ("GET", "unmatched", "404")}
+    assert sum(routes[("GET", "/api/company/{symbol}", "200")]) == 2
+    # Two commands per company request land in the "2" bucket
+    counts = commands._values[("/api/company/{symbol}",)][0]
+    assert counts[metrics.COUNT_BUCKETS.index(2)] == 2
@@ -0,0 +1,51 @@
+import logging
+
+import pytest
+from pymongo import AsyncMongoClient, monitoring
+
+from iposhala_test.scripts import mongo, mongo_async
+
+
+class Listener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """A module with no client yet; whatever the test creates is dropped afterwards."""
+    monkeypatch.setattr(mongo_async, "_client", None)
+    return mongo_async
+
+
+def test_client_is_created_on_first_access_and_shared(fresh):
+    assert fresh._client is None
+    client = fresh.client
+    assert isinstance(client, AsyncMongoClient)
+    assert fresh.get_client() is client
+    assert fresh.db.name == mongo.DB_NAME
+
+
+def test_collections_and_aliases_resolve_lazily(fresh):
+    assert fresh.ipo_past_master.name == "ipo_past_master"
+    assert fresh.users_collection.name == "users"
+    assert fresh.watchlist_collection.name == "watchlist"
+    with pytest.raises(AttributeError):
+        fresh.not_a_collection
+
+
+def test_listeners_attach_only_on_creation(fresh, caplog):
+    listener = Listener()
+    client = fresh.get_client(event_listeners=[listener])
+    assert client.options.event_listeners == [listener]
+
+    with caplog.at_level(logging.WARNING):
+        assert fresh.get_client(event_listeners=[Listener()]) is client
+    assert "event listeners not attached" in caplog.text
+    assert client.options.event_listeners == [listener]
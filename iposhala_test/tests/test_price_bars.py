@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta
+
+from iposhala_test.scripts import price_bars
+from iposhala_test.scripts.price_bars import bar_docs, resample_bars
+
+
+def daily_rows(start: date, end: date) -> list:
+    """Weekday OHLCV rows, newest first like performance_table; prices follow the day of month."""
+    rows, day = [], start
+    while day <= end:
+        if day.weekday() < 5:
+            d = day.day
+            rows.append({"date": day.isoformat(), "open": d, "high": d + 1, "low": d - 1, "close": d + 0.5, "volume": 100})
+        day += timedelta(days=1)
+    return rows[::-1]
+
+
+def test_weekly_bars():
+    rows = daily_rows(date(2024, 1, 1), date(2024, 1, 12))
+    assert resample_bars(rows, "1w") == [
+        {"date": "2024-01-08", "open": 8, "high": 13, "low": 7, "close": 12.5, "volume": 500},
+        {"date": "2024-01-01", "open": 1, "high": 6, "low": 0, "close": 5.5, "volume": 500},
+    ]
+
+
+def test_monthly_bars_are_dated_by_first_trading_day():
+    # 1 Jun 2024 is a Saturday
+    rows = daily_rows(date(2024, 5, 29), date(2024, 6, 5))
+    assert resample_bars(rows, "1m") == [
+        {"date": "2024-06-03", "open": 3, "high": 6, "low": 2, "close": 5.5, "volume": 300},
+        {"date": "2024-05-29", "open": 29, "high": 32, "low": 28, "close": 31.5, "volume": 300},
+    ]
+
+
+def test_gaps_and_bad_rows_are_skipped():
+    rows = daily_rows(date(2024, 1, 1), date(2024, 1, 3)) + daily_rows(date(2024, 1, 29), date(2024, 1, 29))
+    rows.append({"date": "not a date", "open": 1, "high": 1, "low": 1, "close": 1, "volume": 1})
+    bars = resample_bars(rows, "1w")
+    # No empty weeks in between
+    assert [b["date"] for b in bars] == ["2024-01-29", "2024-01-01"]
+    assert bars[1]["volume"] == 300
+
+
+def test_daily_and_empty_pass_through():
+    rows = daily_rows(date(2024, 1, 1), date(2024, 1, 3))
+    assert resample_bars(rows, "1d") is rows
+    assert resample_bars([], "1w") == []
+
+
+class FakeBars:
+    def __init__(self):
+        self.docs = []
+
+    def delete_many(self, query):
+        self.docs = [d for d in self.docs if d["symbol"] != query["symbol"]]
+
+    def insert_many(self, docs, ordered=True):
+        self.docs.extend(docs)
+
+
+class FakeMaster:
+    def __init__(self, docs):
+        self.docs = docs
+        self.updates = []
+
+    def find(self, query, projection=None):
+        return [d for d in self.docs if "performance_table" in d and query.get("symbol", d["symbol"]) == d["symbol"]]
+
+    def update_one(self, query, update):
+        self.updates.append((query, update))
+
+
+def test_bar_docs_key_rows_by_day():
+    rows = [{"date": "2024-01-02T00:00:00", "open": 1, "close": 2}, {"date": "02/01/2024", "open": 1}]
+    assert bar_docs("ABC", rows) == [{
+        "symbol": "ABC", "ts": datetime(2024, 1, 2),
+        "date": "2024-01-02T00:00:00", "open": 1, "high": None, "low": None, "close": 2, "volume": None,
+    }]
+
+
+def test_write_bars_replaces_a_symbols_bars(monkeypatch):
+    bars = FakeBars()
+    monkeypatch.setattr(price_bars, "ipo_price_bars", bars)
+    price_bars.write_bars("ABC", daily_rows(date(2024, 1, 1), date(2024, 1, 5)))
+    price_bars.write_bars("XYZ", daily_rows(date(2024, 1, 1), date(2024, 1, 1)))
+    assert price_bars.write_bars("ABC", daily_rows(date(2024, 1, 8), date(2024, 1, 9))) == 2
+
+    assert sorted((d["symbol"], d["date"]) for d in bars.docs) == [
+        ("ABC", "2024-01-08"), ("ABC", "2024-01-09"), ("XYZ", "2024-01-01"),
+    ]
+
+
+def test_migrate_moves_performance_table_out(monkeypatch):
+    bars = FakeBars()
+    master = FakeMaster([
+        {"_id": 1, "symbol": "ABC", "performance_table": daily_rows(date(2024, 1, 1), date(2024, 1, 3))},
+        {"_id": 2, "symbol": "NEW"},
+    ])
+    monkeypatch.setattr(price_bars, "ipo_price_bars", bars)
+    monkeypatch.setattr(price_bars, "ipo_past_master", master)
+    monkeypatch.setattr(price_bars, "ensure_price_bars_collection", lambda: None)
+    monkeypatch.setattr(price_bars, "bump_cache_epoch", lambda source: None)
+
+    assert price_bars.migrate_performance_tables() == 1
+    assert len(bars.docs) == 3
+    (query, update), = master.updates
+    assert query == {"_id": 1}
+    assert update["$unset"] == {"performance_table": ""}
+    assert update["$set"]["price_bar_count"] == 3
@@ -0,0 +1,35 @@
+import time
+import asyncio
+import logging
+
+from iposhala_test.api import nse_client
+from iposhala_test.api.nse_client import QuoteCache
+
+
+class FailingClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_json(self, path, params=None):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+
+def test_failed_background_refresh_is_logged_once(caplog):
+    async def main():
+        client = FailingClient()
+        cache = QuoteCache(client)
+        stale = time.monotonic() - (nse_client.QUOTE_TTL + 1)
+        cache._entries["ABC"] = (stale, {"price": 1})
+
+        results = [await cache.get("ABC") for _ in range(20)]
+        await asyncio.sleep(0.05)
+        return client, results
+
+    with caplog.at_level(logging.WARNING):
+        client, results = asyncio.run(main())
+
+    assert results == [{"price": 1}] * 20
+    assert client.calls == 1
+    assert len([r for r in caplog.records if "Refresh failed" in r.message]) == 1
@@ -0,0 +1,55 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import orjson
+from bson import ObjectId
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from iposhala_test.api.responses import FastJSONResponse, FastJSONRoute
+
+
+def test_renders_mongo_and_numpy_types():
+    oid = ObjectId()
+    body = FastJSONResponse({
+        "_id": oid,
+        "at": datetime(2024, 10, 22, 9, 15),
+        "day": date(2024, 10, 22),
+        "price": Decimal("101.5"),
+        "score": np.float64(0.5),
+        "tags": {"sme"},
+        1: b"raw",
+    }).body
+    assert orjson.loads(body) == {
+        "_id": str(oid),
+        "at": "2024-10-22T09:15:00",
+        "day": "2024-10-22",
+        "price": 101.5,
+        "score": 0.5,
+        "tags": ["sme"],
+        "1": "raw",
+    }
+
+
+def test_route_keeps_status_code_and_headers():
+    router = APIRouter(route_class=FastJSONRoute)
+
+    @router.post("/jobs", status_code=202)
+    async def trigger(response: Response):
+        response.headers["X-Job"] = "gmp"
+        return {"_id": ObjectId("0123456789abcdef01234567")}
+
+    @router.get("/sync")
+    def sync():
+        return [1, 2]
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    res = client.post("/jobs")
+    assert res.status_code == 202
+    assert res.headers["x-job"] == "gmp"
+    assert res.json() == {"_id": "0123456789abcdef01234567"}
+    assert client.get("/sync").json() == [1, 2]
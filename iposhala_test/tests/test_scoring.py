@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from iposhala_test.scripts.ipo_scoring import HIGH_RISK, LOW_RISK, MODERATE_RISK, score_batch, score_features, score_ipo
+
+
+def scalar_score(gmp, price, qib, total_sub, size):
+    """The per-request rules get_ipo used before scoring moved to score_batch."""
+    confidence = 50
+    if price > 0:
+        gmp_pct = (gmp / price) * 100
+        if gmp_pct > 50:
+            confidence += 30
+        elif gmp_pct > 20:
+            confidence += 20
+        elif gmp_pct > 0:
+            confidence += 10
+        elif gmp_pct < 0:
+            confidence -= 20
+    if qib > 50:
+        confidence += 20
+    elif qib > 10:
+        confidence += 10
+    if total_sub > 100:
+        confidence += 10
+    if size > 1000:
+        confidence += 10
+    elif size < 100 and size > 0:
+        confidence -= 10
+    score = min(100, max(0, confidence))
+    level = LOW_RISK if score >= 75 else MODERATE_RISK if score >= 45 else HIGH_RISK
+    return score, level
+
+
+# Rule boundaries: premium exactly 0 / 20 / 50 %, qib 10 / 50, subscription 100, size 0 / 100 / 1000
+EDGES = [
+    [0, 100, 0, 0, 0],
+    [20, 100, 10, 100, 100],
+    [50, 100, 50, 100.5, 1000],
+    [50.01, 100, 50.01, 101, 1000.01],
+    [-5, 100, 0, 0, 99.99],
+    [10, 0, 0, 0, 0],
+]
+
+
+def test_score_batch_matches_scalar_rules():
+    rng = random.Random(7)
+    features = EDGES + [
+        [rng.uniform(-50, 150), rng.choice([0, 10, 100, 950]), rng.uniform(0, 200), rng.uniform(0, 400), rng.uniform(0, 3000)]
+        for _ in range(500)
+    ]
+    result = score_batch(features)
+    expected = [scalar_score(*f) for f in features]
+
+    assert [int(s) for s in result["confidence_score"]] == [e[0] for e in expected]
+    assert [str(level) for level in result["risk_level"]] == [e[1] for e in expected]
+
+
+def test_score_features_reads_document_fields():
+    doc = {
+        "price_range": "Rs.95 to Rs.1,100",
+        "subscription": {"qib": "60.5", "nii": "20", "retail": None},
+        "issue_information": {"issue_size": "1,250.75 Cr"},
+    }
+    assert score_features(doc, gmp="330") == [330.0, 1100.0, 60.5, 80.5, 1250.75]
+    assert score_features({"gmp": "n/a"}) == [0.0, 0.0, 0.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize("doc, gmp, expected", [
+    ({"issue_price": "100", "subscription": {"qib": 80, "retail": 40}, "issue_size": "2000"}, 60, (100, LOW_RISK)),
+    ({"issue_price": "100", "issue_size": "50"}, -10, (20, HIGH_RISK)),
+    ({}, None, (50, MODERATE_RISK)),
+])
+def test_score_ipo(doc, gmp, expected):
+    assert score_ipo(doc, gmp) == {"confidence_score": expected[0], "risk_level": expected[1]}
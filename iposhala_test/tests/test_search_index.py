@@ -0,0 +1,48 @@
+from iposhala_test.api.search_index import SearchIndex
+
+PAST = [
+    {"ipo_id": "infy-1993", "symbol": "INFY", "company_name": "Infosys Limited"},
+    {"ipo_id": "ossys-2021", "symbol": "OSSYS", "company_name": "Os Sys Ltd"},
+    {"ipo_id": "tatamotors-1998", "symbol": "TATAMOTORS", "company_name": "Tata Motors Limited"},
+    {"ipo_id": "tatamtrdvr-2008", "symbol": "TATAMTRDVR", "company_name": "Tata Motors DVR"},
+    {"ipo_id": "motherson-1993", "symbol": "MOTHERSON", "company_name": "Samvardhana Motherson International"},
+]
+LIVE = [{"ipo_id": "tata-2025", "symbol": "TATA", "company_name": "Tata Capital", "status": "LIVE"}]
+
+
+def index() -> SearchIndex:
+    idx = SearchIndex()
+    idx.build(LIVE, PAST)
+    return idx
+
+
+def symbols(results):
+    return [r["symbol"] for r in results]
+
+
+def test_exact_symbol_then_symbol_prefix_then_name_prefix():
+    assert symbols(index().search("tata")) == ["TATA", "TATAMTRDVR", "TATAMOTORS"]
+
+
+def test_word_prefix_before_infix():
+    # "mot" starts a word in both Tata Motors names and MOTHERSON's symbol
+    assert symbols(index().search("mot"))[0] == "MOTHERSON"
+    assert set(symbols(index().search("mot"))) == {"MOTHERSON", "TATAMOTORS", "TATAMTRDVR"}
+
+
+def test_mid_word_infix_beats_fuzzy():
+    # "osys" only occurs inside "infosys"; "os sys" shares trigrams but is no substring
+    assert symbols(index().search("osys")) == ["INFY", "OSSYS"]
+
+
+def test_symbol_infix():
+    assert symbols(index().search("mtrd")) == ["TATAMTRDVR"]
+
+
+def test_fuzzy_tolerates_typos():
+    assert symbols(index().search("infosis"))[0] == "INFY"
+
+
+def test_short_and_empty_queries():
+    assert index().search("x") == []
+    assert symbols(index().search("fy")) == ["INFY"]